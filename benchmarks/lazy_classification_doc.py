@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark the import time saved by building the classification docs on demand.
+
+Each module is imported in a fresh interpreter and then its ``__doc__`` is read.
+The import alone is what production code pays now, the import plus the ``__doc__``
+read is what every import used to pay when the classification tables were appended
+at import time.
+
+Run from the top of the repository::
+
+    python benchmarks/lazy_classification_doc.py [--runs N]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = ["jgt_common", "jgt_common.http_helpers"]
+
+TIMING_CODE = """
+import sys, time
+start = time.perf_counter()
+import {module}
+imported = time.perf_counter()
+sys.modules[{module!r}].__doc__
+print(imported - start, time.perf_counter() - imported)
+"""
+
+
+def time_import_ms(module, runs):
+    """
+    Time importing ``module``, then reading its ``__doc__``, in fresh interpreters.
+
+    Returns:
+        tuple: median milliseconds for the import, and for the ``__doc__`` read.
+
+    """
+    code = TIMING_CODE.format(module=module)
+    timings = [
+        subprocess.check_output([sys.executable, "-c", code], cwd=PROJECT_ROOT).split()
+        for _ in range(runs)
+    ]
+    return tuple(
+        statistics.median(float(timing[index]) for timing in timings) * 1000
+        for index in range(2)
+    )
+
+
+def main():
+    """Print a table of lazy vs. eager classification doc import times."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=20, help="imports per timing")
+    args = parser.parse_args()
+
+    print(
+        "{:<26} {:>10} {:>10} {:>10}".format("module", "lazy ms", "eager ms", "saved")
+    )
+    for module in MODULES:
+        import_ms, doc_ms = time_import_ms(module, args.runs)
+        print(
+            "{:<26} {:>10.2f} {:>10.2f} {:>9.0f}%".format(
+                module,
+                import_ms,
+                import_ms + doc_ms,
+                100 * doc_ms / (import_ms + doc_ms),
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
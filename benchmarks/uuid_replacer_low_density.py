@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Benchmark ``UUIDLineReplacer`` on log lines that mostly have no UUIDs in them.
+
+The log is synthetic but shaped like our service logs: a timestamp, a level,
+a logger name with hyphens in it, and some words, with a UUID on only
+a small fraction of the lines.
+The prefiltered replacer is compared with running the full UUID regex
+on every line, which is what the replacer used to do.
+
+Run from the top of the repository::
+
+    python benchmarks/uuid_replacer_low_density.py [--lines N] [--density D]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jgt_common.uuid_replacer import (  # noqa: E402
+    UUID_ISOLATED_MATCHER,
+    UUIDLineReplacer,
+)
+
+WORDS = (
+    "the request user-agent handler cache-miss retry connection pool worker "
+    "timeout GET POST /api/v2/items status=200 latency_ms x-request-id"
+).split()
+
+
+def synthetic_log(line_count, density, seed=0):
+    """Return ``line_count`` log lines, about ``density`` of them with a UUID."""
+    rng = random.Random(seed)
+    lines = []
+    for index in range(line_count):
+        words = " ".join(rng.choice(WORDS) for _ in range(rng.randint(5, 30)))
+        if rng.random() < density:
+            words += " id={}".format(uuid.UUID(int=rng.getrandbits(128)))
+        lines.append(
+            "2019-05-20 19:28:{:02d},{:03d} INFO [worker-{}] {}\n".format(
+                index % 60, index % 1000, index % 8, words
+            )
+        )
+    return lines
+
+
+class FullRegexReplacer(UUIDLineReplacer):
+    """The replacer without the prefilter, running the UUID regex on every line."""
+
+    def __call__(self, line):
+        """Replace all found UUIDs with markers."""
+        return UUID_ISOLATED_MATCHER.sub(
+            lambda match: self._marker_for(match.group()), line
+        )
+
+
+def lines_per_second(replacer, lines):
+    """Return how many lines per second ``replacer`` processes."""
+    start = time.perf_counter()
+    for line in lines:
+        replacer(line)
+    return len(lines) / (time.perf_counter() - start)
+
+
+def main():
+    """Print the throughput with and without the prefilter."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lines", type=int, default=200000, help="lines of log")
+    parser.add_argument(
+        "--density", type=float, default=0.01, help="fraction of lines with a UUID"
+    )
+    args = parser.parse_args()
+
+    lines = synthetic_log(args.lines, args.density)
+    megabytes = sum(map(len, lines)) / 1e6
+    print("{} lines, {:.1f} MB".format(len(lines), megabytes))
+    print("{:<12} {:>14} {:>10}".format("replacer", "lines/s", "MB/s"))
+    for name, replacer_class in [
+        ("full regex", FullRegexReplacer),
+        ("prefilter", UUIDLineReplacer),
+    ]:
+        rate = lines_per_second(replacer_class(), lines)
+        print(
+            "{:<12} {:>14,.0f} {:>10.1f}".format(
+                name, rate, rate * megabytes / len(lines)
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Generate the ``assert_`` module from the ``check`` module.
+
+Each public function in ``check`` becomes a function of the same name and signature
+in ``assert_``, with the check's body inlined: passing returns ``None``,
+and failing asserts with the check's message.
+This avoids both building ``assert_`` at import time
+and a wrapper frame around every assertion.
+
+Regenerate ``assert_`` after changing ``check``::
+
+    python -m jgt_common._assert_codegen
+
+``tests/test_asserts.py`` fails if the two modules are out of sync.
+"""
+
+import ast
+import builtins
+import inspect
+import os
+
+from . import check
+
+MESSAGE_NAME = "message"
+"""Local variable name that the inlined checks put their failure messages in."""
+
+HEADER = '''\
+"""Convenience functions for doing asserts with helpful names and helpful messages."""
+
+# NOTE TO IMPLEMENTORS:
+# This module depends on the contracts described in our sibling module ``check``.
+# In the spirit of DRY, please see that module for details.
+#
+# Everything after ``assert_if_truthy`` is GENERATED from ``check`` by running
+# ``python -m jgt_common._assert_codegen``. Do not edit it by hand, change ``check``
+# and regenerate this module instead.
+
+from functools import wraps as _wraps
+
+{imports}
+
+
+# Used internally, but there is no reason to prevent it from being used externally.
+def assert_if_truthy(fun):
+    """(Decorator) Assert if fun returns a truthy value (error indicator)."""
+
+    @_wraps(fun)
+    def wrapper(*args, **kwargs):
+        result = fun(*args, **kwargs)
+        assert not result, result
+
+    return wrapper
+'''
+
+
+def _is_exported_name(name):
+    """Is ``name`` something that check wants exported."""
+    # If ``check`` ever switches to using the ``__all__`` mechanism, update this code:
+    return not name.startswith("_")
+
+
+def _check_functions(check_tree):
+    """Return the ``ast.FunctionDef`` of each exported function in ``check``."""
+    return [
+        node
+        for node in check_tree.body
+        if isinstance(node, ast.FunctionDef) and _is_exported_name(node.name)
+    ]
+
+
+def _asserter_lines(return_node, lines, is_last_statement):
+    """
+    Return the source lines that replace a check function's ``return`` statement.
+
+    Returning the empty string (passing) becomes a plain ``return``,
+    returning anything else becomes an ``assert`` on that message.
+    """
+    indent = " " * return_node.col_offset
+    value = return_node.value
+    if isinstance(value, ast.Constant) and value.value == "":
+        return [indent + "return\n"]
+    value_lines = lines[value.lineno - 1 : value.end_lineno]
+    value_lines[0] = "{}{} = {}".format(
+        indent, MESSAGE_NAME, value_lines[0][value.col_offset :]
+    )
+    value_lines.append("{0}assert not {1}, {1}\n".format(indent, MESSAGE_NAME))
+    if not is_last_statement:
+        value_lines.append(indent + "return\n")
+    return value_lines
+
+
+def _asserter_source(function_node, lines):
+    """Return the source of the assert version of a check ``ast.FunctionDef``."""
+    used_names = {
+        node.id for node in ast.walk(function_node) if isinstance(node, ast.Name)
+    }
+    if MESSAGE_NAME in used_names:
+        raise ValueError(
+            "check.{} already uses the name {!r}".format(
+                function_node.name, MESSAGE_NAME
+            )
+        )
+    # Work from the bottom up so that line numbers of the nodes still to be
+    # replaced stay valid.
+    original_length = len(lines)
+    lines = lines[:]
+    returns = [node for node in ast.walk(function_node) if isinstance(node, ast.Return)]
+    for return_node in sorted(returns, key=lambda node: node.lineno, reverse=True):
+        lines[return_node.lineno - 1 : return_node.end_lineno] = _asserter_lines(
+            return_node, lines, return_node is function_node.body[-1]
+        )
+    docstring = function_node.body[0]
+    for index in range(docstring.lineno - 1, docstring.end_lineno):
+        lines[index] = lines[index].replace("Check", "Assert")
+    end_lineno = function_node.end_lineno + len(lines) - original_length
+    return "".join(lines[function_node.lineno - 1 : end_lineno])
+
+
+def _global_names_used(function_nodes):
+    """Return the ``check`` module level names that the functions refer to."""
+    local_names = set()
+    loaded_names = set()
+    for function_node in function_nodes:
+        for node in ast.walk(function_node):
+            if isinstance(node, ast.arg):
+                local_names.add(node.arg)
+            elif isinstance(node, ast.Name):
+                if isinstance(node.ctx, ast.Store):
+                    local_names.add(node.id)
+                else:
+                    loaded_names.add(node.id)
+    return sorted(
+        name
+        for name in loaded_names - local_names
+        if name in vars(check) and not hasattr(builtins, name)
+    )
+
+
+def render():
+    """Return the source code for the ``assert_`` module."""
+    check_source = inspect.getsource(check)
+    check_lines = check_source.splitlines(keepends=True)
+    function_nodes = _check_functions(ast.parse(check_source))
+    exported = {node.name for node in function_nodes}
+    global_names = _global_names_used(function_nodes)
+    # Any check function used by another check must not resolve to its asserter.
+    shadowed = [name for name in global_names if name in exported]
+    if shadowed:
+        raise ValueError(
+            "check functions call other check functions: {}".format(shadowed)
+        )
+
+    imports = "from .check import {}".format(", ".join(global_names))
+    functions = [_asserter_source(node, check_lines) for node in function_nodes]
+    return "\n\n".join([HEADER.format(imports=imports)] + functions)
+
+
+def main():
+    """Write the generated ``assert_`` module next to ``check``."""
+    source = render()
+    try:
+        import black
+    except ImportError:
+        # The pre-commit black hook will format it instead.
+        pass
+    else:
+        source = black.format_str(source, mode=black.FileMode())
+    assert_path = os.path.join(os.path.dirname(check.__file__), "assert_.py")
+    with open(assert_path, "w") as assert_file:
+        assert_file.write(source)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,753 @@
+"""Lightweight general helper functions and classes."""
+
+import itertools as _itertools
+from math import nan
+
+from ._classify import _adopt_into_package, classify
+
+
+class_lookup = {}
+"""
+This dictionary is to allow code that needs to have very late binding of a class
+to look up the class here, and code that needs to control another module's use of a
+late bound class to set it in this dictionary.
+
+Code accessing this dictionary should use ``.get()`` with a default value so that
+`this` module doesn't have to import lots of things here to set up all the defaults.
+Code accessing this dictionary should publish which key(s) it will be using so that
+modules wishing to retarget those classes will know which keys to set.
+
+Code setting values in this dictionary so do so `before` importing modules that
+will use that value. Setting values in this dictionary is only needed when the
+default values need to be changed.
+
+(Motivation: the requests client logging code needs to be able to use a custom
+class instead of just ``requests.Session`` when being used by testing code
+with the Locust test runner, and it uses this dictionary to accomplish this.)
+
+"""
+
+
+# Don't require user/embedder of this to use re.IGNORECASE
+HEX_DIGIT_RE = r"[\da-fA-F]"
+"""Regular expression for matching a single hex digit."""
+
+
+def re_for_hex_digits(length):
+    """Return regular expression for matching exactly ``length`` hex digits."""
+    return HEX_DIGIT_RE + "{" + str(length) + "}"
+
+
+UUID_BASIC_RE = "-".join(map(re_for_hex_digits, [8, 4, 4, 4, 12]))
+"""
+Regular expression (RE) for matching UUID string forms.
+
+This RE is not anchored, or delimited, for maximum reuse.
+"""
+
+
+UUID_ISOLATED_RE = r"\b{}\b".format(UUID_BASIC_RE)
+"""RE for matching an UUID that is not part of a larger "word"."""
+
+
+@classify("misc")
+def no_op(*args, **kwargs):
+    """Reusable no-op function."""
+    pass
+
+
+@classify("misc")
+def always_true(*args, **kwargs):
+    """Return True regardless of any provided arguments."""
+    return True
+
+
+@classify("misc")
+def always_false(*args, **kwargs):
+    """Return False regardless of any provided arguments."""
+    return False
+
+
+@classify("misc")
+def identity(x, *args):
+    """
+    Build simple identity function based on provided parameters.
+
+    A single parameter is returned as is, multiple parameters are returned as a tuple.
+
+    From https://stackoverflow.com/questions/8748036/is-there-a-builtin-identity-function-in-python  # noqa: E501
+    Not the top voted answer, but it handles both single and multiple parameters.
+    """
+    return (x,) + args if args else x
+
+
+@classify("misc", "string")
+def format_if(format_str, content):
+    """
+    Return a message string with a formatted value if any content value is present.
+
+    Useful for error-checking scenarios where you want a prepared error message
+    if failures are present (passed in via content), or no message if no failures.
+
+    Args:
+        format_str (str): A message string with a single format brace to be filled
+        content (str): A value to be filled into the format_str if present
+
+    Returns:
+        str: either the format_str with content included if content present,
+        or an empty string if no content.
+
+    """
+    return format_str.format(content) if content else ""
+
+
+@classify("misc")
+def default_if_none(value, default):
+    """
+    Return ``default if value is None else value``.
+
+    Use because:
+      * no chance of the value stutter being mistyped, speeds up code reading time.
+      * easier to read when value or default are complex expressions.
+      * can save having to create local variable(s) to shorten the
+        ``if .. is None ...`` form.
+
+    """
+    return default if value is None else value
+
+
+@classify("sequence")
+def no_nones(iterable):
+    """Return a list of the non-None values in iterable."""
+    return [x for x in iterable if x is not None]
+
+
+@classify("sequence")
+def truths_from(iterable):
+    """Return a list of the truthy values in iterable."""
+    return list(filter(None, iterable))
+
+
+@classify("sequence")
+def padded_list(iterable, size, padding=None):
+    """
+    Generate a fixed-length list from an iterable, padding as needed.
+
+    Args:
+        iterable (iterable): Any iterable that needs padding
+        size (int): The length for the returned list
+        padding: Any value that should be used to pad an iterable that is too short
+
+    Returns:
+        list: The iterable parameter converted to a list, up to size, padded as needed.
+
+    """
+    return list(
+        _itertools.islice(_itertools.chain(iterable, _itertools.repeat(padding)), size)
+    )
+
+
+def _python_2_or_3_base_str_type():
+    try:
+        return basestring
+    except NameError:
+        return str
+
+
+@classify("misc", "sequence")
+def is_iterable(item):
+    """
+    Return True if item is iterable, False otherwise, using an iter(item) test.
+
+    From the Python documentation for class :py:class:`collections.abc.Iterable`:
+
+        Checking isinstance(obj, Iterable) detects classes that are registered as
+        Iterable or that have an __iter__() method, but it does not detect classes that
+        iterate with the __getitem__() method.
+        *The only reliable way to determine whether an object is iterable is to call
+        iter(obj)*.
+    """
+    try:
+        iter(item)
+        return True
+    except TypeError:
+        return False
+
+
+@classify("sequence")
+def list_from(item):
+    """
+    Generate a list from a single item or an iterable.
+
+    Any item that is "false-y", will result in an empty list. Strings and dictionaries
+    will be treated as single items, and not iterable.
+
+    Args:
+        item: A single item or an iterable.
+
+    Returns:
+        list: A list from the item.
+
+    Examples:
+        >>> list_from(None)
+        []
+        >>> list_from('abcd')
+        ['abcd']
+        >>> list_from(1234)
+        [1234]
+        >>> list_from({'abcd': 1234})
+        [{'abcd': 1234}]
+        >>> list_from(['abcd', 1234])
+        ['abcd', 1234]
+        >>> list_from({'abcd', 1234})
+        ['abcd', 1234]
+
+    """
+    if not item:
+        return []
+    if isinstance(item, (_python_2_or_3_base_str_type(), dict)) or not is_iterable(
+        item
+    ):
+        return [item]
+    return list(item)
+
+
+@classify("sequence", "string")
+def string_to_list(source, sep=",", maxsplit=-1, chars=None):
+    """``.split()`` a string into a list and ``.strip()`` each piece.
+
+    For handling lists of things, from config files, etc.
+
+    Args:
+        source (str): the source string to process
+        sep (str, optional): The ``.split`` ``sep`` (separator) to use.
+        maxsplit (int, optional): The ``.split`` ``maxsplit`` parameter to use.
+        chars (str, optional): The ``.strip`` ``chars`` parameter to use.
+
+    """
+    return [item.strip(chars) for item in source.split(sep, maxsplit)]
+
+
+@classify("dict", "filter")
+def filter_dict(a_dict, keep_key=always_true, keep_value=always_true):
+    """
+    Filter a dictionary based on truthiness.
+
+    Return a new dict based on keeping only those keys _and_ values whose function
+    returns True.
+
+    Args:
+        a_dict (dict): A dictionary to filter values from.
+        keep_key (function): Return True if the key is to be kept.
+        keep_value (function): Return True if the value is to be kept.
+
+    Returns:
+        dict: A new dictionary with only the desired key, value pairs.
+
+    """
+    return {k: v for k, v in a_dict.items() if keep_key(k) and keep_value(v)}
+
+
+@classify("dict", "filter")
+def dict_strip_value(a_dict, value=None):
+    """
+    Return a new dict based on stripping out any key with the given value.
+
+    Note:
+        The default value ``None`` is chosen because it is a common case.
+        Unlike other functions, value ``None`` is literally the value ``None``.
+
+    Args:
+        a_dict (dict): A dictionary to strip values from.
+        value: Any value that should be stripped from the dictionary.
+
+    Returns:
+        dict: A new dictionary without key/value pairs for the given value.
+
+    """
+    return filter_dict(a_dict, keep_value=lambda v: v != value)
+
+
+@classify("dict", "filter")
+def dict_transform(a_dict, key_transform=identity, value_transform=identity):
+    """
+    Return a new dict based on transforming the keys and/or values of ``a_dict``.
+
+    Args:
+        a_dict (dict): the source dictionary to process
+        key_transform (function): Takes a key and returns a new key to use.
+        value_transform (function): Takes a value and returns a new value to use.
+
+    Returns:
+        dict: A new dictionary with keys and values as transformed.
+
+    """
+    return {key_transform(k): value_transform(v) for k, v in a_dict.items()}
+
+
+@classify("dict", "filter")
+def dict_from(iterable, key_transform=identity, value_transform=identity):
+    """
+    Build a new dict based on turning values from an iterable into key/value pairs.
+
+    Example:
+        A common use case would be to build a dict from a list of values,
+        using the list values as keys,
+        and building dict values as a transform from the list values.::
+
+            > l = [1, 2, 3, 4, 5]
+            > result = dict_from(l, value_transform=lambda n: n**2)
+            # {1: 1, 2: 4, 3: 9, 4: 16, 5: 25}
+
+    Args:
+        iterable (iterable): the source for the dictionary to be created
+        key_transform (function): Takes a key and returns a new key to use.
+        value_transform (function): Take a value and returns a new value to use.
+
+    Returns:
+        dict: A new dictionary with key and values as transformed.
+
+    """
+    return {key_transform(x): value_transform(x) for x in iterable}
+
+
+@classify("sequence")
+def index_or_default(a_list, value, default=-1):
+    """
+    Return the index of a value from a list, or a default if not found.
+
+    Args:
+        a_list (list): A list from which to find the index
+        value (any): the list item whose index is sought
+        default (any): the value to return if the value is not in the list
+
+    Returns:
+        int,any: an index value (int) for the list item, or default value (any)
+
+    """
+    return a_list.index(value) if value in a_list else default
+
+
+@classify("dict")
+def must_get_key(a_dict, key):
+    """
+    Either return the value for the key, or raise an exception.
+
+    The exception will indicate what the valid keys are.
+    Inspired by Gherkin steps so that a typo in the Gherkin
+    will result in a more helpful error message than the stock KeyError.
+
+    Args:
+        a_dict (dict): Dictionary with the values
+        key (str): The key whose value is desired
+
+    Returns:
+        The value found on the key
+
+    Raises:
+        KeyError: if the given key is not present in the dictionary.
+
+    """
+    if key not in a_dict:
+        raise KeyError(
+            "{} is not one of: {}".format(key, ", ".join(sorted(map(str, a_dict))))
+        )
+    return a_dict[key]
+
+
+@classify("dict")
+def must_get_keys(a_dict, *keys):
+    """
+    Either return the value found for the keys provided, or raise an exception.
+
+    Args:
+        a_dict (dict): Dictionary with the values
+        keys (str): The key or keys whose value is desired
+
+    Returns:
+        The value found on the final key
+
+    Raises:
+        KeyError: if any of the given keys are not present in the dictionary.
+
+    """
+    for key in keys:
+        a_dict = must_get_key(a_dict, key)
+    return a_dict
+
+
+@classify("misc")
+def fib_or_max(fib_number_index, max_number=None):
+    """
+    Get the nth Fibonacci number or max_number, which ever is smaller.
+
+    This can be used for retrying failed operations with progressively longer
+    gaps between retries, cap'd at the max_number paraemter if given.
+    """
+    current, next_ = 0, 1
+    for _ in range(fib_number_index):
+        current, next_ = next_, current + next_
+        if max_number and current > max_number:
+            return max_number
+    return current
+
+
+@classify("misc", "sequence")
+def accumulator_for(fun):
+    """
+    Accumulate the results of calling fun into a unique list, returning that list.
+
+    Everytime the decorated function is called, its results are appended
+    to a list, and that list is returned instead.
+    Each invocation of this function results in a wrapper that uses its own
+    unique list.
+
+    NOTE: If you use this is as a decorator on a function definition,
+    ALL invocations of the function will accumulate into a single list.
+    This is probably not what you want.
+
+    The intent is to use this decorator "as needed"::
+
+        def get_thing_when_stable():
+            '''
+            Get a thing when the API returns a stable result.
+
+            A stable result is when 3 consecutive payloads match.
+            If no stable result is achieved, an IncompleteAtTimeoutException exception
+            is raised.
+            '''
+            results = check_until(accumulator_for(api_get_thing), last_3_payloads_equal)
+            return get_thing_from_payload(results[-1])
+
+    """
+    # NOTE: Not using wrapt; it would add another level of nesting / complexity,
+    #       for dynamic run-time wrapping of a function.
+    #       If we find that this is used for decorating function definitions,
+    #       this decision about using wrapt can be changed without affecting
+    #       the users of this function.
+
+    results_list = []
+
+    def wrapped_fun(*args, **kwargs):
+        results_list.append(fun(*args, **kwargs))
+        return results_list
+
+    return wrapped_fun
+
+
+@classify("sequence")
+def only_item_of(item_sequence, label=""):
+    """Assert item_sequence has only one item, and return that item."""
+    label = label or item_sequence.__class__.__name__
+    assert len(item_sequence) == 1, '{} was not of length 1: "{}"'.format(
+        label, item_sequence
+    )
+    return item_sequence[0]
+
+
+@classify("sequence", "class")
+class NotEmptyList(list):
+    """
+    A list that fails to iterate if it is empty.
+
+    Iterating on this list will fail if the list is empty.
+    This simplifies code from having to check for empty lists everywhere.
+    Empty lists are a problem because ``for`` loop bodies don't execute on empyt lists.
+    thus any checks/tests/etc in a loop body would not run.
+    In a testing context, the loop would "succeed" by not doing anything
+    (it would fail to have checked anything) and that would be a false-positive.
+    """
+
+    @staticmethod
+    def error_on_empty():
+        """Is called to return the error message when the NotEmptyList is empty."""
+        return "list is empty!"
+
+    def __iter__(self):
+        """
+        Iterate only if not empty.
+
+        Any loops that check items in the list could fail to fail for empty
+        lists becuase the loop body would never execute.
+        Help our clients by asserting if the list is empty so they don't have to.
+        """
+        assert self, self.error_on_empty()
+        return super(NotEmptyList, self).__iter__()
+
+
+@classify("sequence", "class")
+class CommonAttributeList(list):
+    """
+    A list for similar objects that can be operated on as a group.
+
+    Accessing an attribute on this list instead
+    returns a list of that attribute's value from each member.
+    (unless the attribute is defined here or in the base class)
+    If any member of this list does not have that attribute, ``AttributeError`` is
+    raised.
+
+    Setting an attribute on this list instead sets the attribute on each member.
+    """
+
+    def __getattr__(self, name):
+        """Get the named attribute from all items in the list."""
+        try:
+            return [getattr(x, name) for x in self]
+        except AttributeError:
+            message = 'Attribute "{}" not present on all list items.'
+            raise AttributeError(message.format(name))
+
+    def __setattr__(self, name, value):
+        """On each item, set the give attribute to the given value."""
+        for item in self:
+            setattr(item, name, value)
+
+    def update_all(self, **kwargs):
+        """Update all attributes based on the provided kwargs."""
+        for key, value in kwargs.items():
+            setattr(self, key, value)
+
+
+@classify("requests", "class")
+class ResponseInfo(object):
+    """
+    Keep track of needed info about test operation responses (or any info really).
+
+    Originally created to augment/track info about ``requests'`` responses, it's not
+    limited or bounded by that use case.
+    Please read ``response`` more generally as any kind of object useful for catpuring
+    some kind of response from the system under test.
+    In addition, arbitrary other attributes can be set on this object.
+    To make that easier, ``kwargs`` is processed as attribute / value pairs to be set on
+    the object, for whatever attributes make sense for your application.
+
+    Sometimes this object is keeping track of a response that is needed,
+    but isn't available yet.
+    In these cases, ``response_callback`` can be set to a parameter-less function that
+    can be called to obtain the response when the ``response_data`` property is used.
+
+    For ease of use, when the data is buried in the response or otherwise needs to be
+    decoded, ``response_data_extract`` can be used. It should take one parameter (the
+    response) and return the desired data from it. This function should not have any
+    side-effects. ``response_data_extract`` is also used by the ``response_data``
+    property, see that property documentation for details.
+
+    Args:
+        response (any, optional): Whatever kind of response object needs tracking.
+        description (str, optional): Description of this particular response.
+        response_callback (function w/no parameters, optional):
+            A callback to use in place of the ``response`` field.
+        response_data_extract (function w/1 parameter, optional):
+            A callback used to extract wanted data from the response.
+        kwargs (dict, optional): any additional attributes to set on this object,
+            based on the name/value pairs in kwargs.
+
+    """
+
+    def __init__(
+        self,
+        response=None,
+        description=None,
+        response_callback=None,
+        response_data_extract=None,
+        **kwargs,
+    ):
+
+        super(ResponseInfo, self).__init__()
+
+        self.response = response
+        self.description = description
+        self.response_callback = response_callback
+        self.response_data_extract = response_data_extract
+        for key, value in kwargs.items():
+            setattr(self, key, value)
+
+    def run_response_callback(self):
+        """Run the ``response_callback``, if any, and set ``response`` to the result.
+
+        Set ``response_callback`` to None so iit isn't run more than once.
+        """
+        if self.response_callback:
+            self.response = self.response_callback()
+            self.response_callback = None
+
+    @property
+    def response_data(self):
+        """
+        Property that returns the data from a response.
+
+        1. If ``response_callback`` is set, that is used to obtain the response,
+           otherwise the ``response`` attribute is used.
+           If the ``response_callback`` is called,
+           it's result is assigned to the ``.response`` attribute and
+           the ``response_callback`` attribute is set to None.
+           This is to prevent the callback from being invoked more than once.
+        2. If ``response_data_extract`` is set, it is called on the response
+           from step 1, and it's return value is the value of this property.
+           Otherwise the result of step 1 is returned as is.
+           Note that in this step the ``.response`` attribute is not changed,
+           the ``response_data_extract`` callback is expected to have no side-effects.
+        """
+        self.run_response_callback()
+        if self.response_data_extract:
+            return self.response_data_extract(self.response)
+        return self.response
+
+
+@classify("requests", "class")
+class ResponseList(NotEmptyList, CommonAttributeList):
+    """
+    A list specialized for testing, w/ResponseInfo object items.
+
+    To best understand this class, it is important to have
+    a strong understanding of :py:class:`CommonAttributeList` and
+    :py:class:`ResponseInfo`.
+    The common workflow for ``ResponseList`` relies greatly on those other connected
+    pieces.
+
+    For example, you might utilize this class in a ways such as this::
+
+        >>> responses = ResponseList()
+        >>> responses.build_and_set(response=client.get_thing())
+        >>>
+        >>> # All the `.response` fields, see `CommonAttributeList`
+        >>> for response in responses.response:
+        ...     assert response.json()["thing"]
+        >>>
+        >>>
+        >>> responses.set(
+        ...     ResponseInfo(response=client.get_thing(param),
+                             description=f"Getting {param}...")
+        ...     for param in my_params
+        ... )
+    """
+
+    def set(self, resp):  # noqa: A003
+        """
+        Clear and set the contents of this list to single object / iterator of objects.
+
+        Generators will be converted into a list to allow access more than once.
+
+        This method can be handy/useful when transforming this list's contents
+        from one form to another, such as:
+
+        >>> x = CommonAttributeList()
+        >>> ...
+        >>> x.set(transform(thing, doo_dad) for thing in x)
+        """
+        self[:] = list_from(resp)
+
+    @property
+    def single_item(self):
+        """Property - Assert this list has one item, and return that item."""
+        return only_item_of(self)
+
+    def build_and_set(self, *args, **kwargs):
+        """
+        Create object and then set it on the list.
+
+        Create ResponseInfo object with args & kwargs, then ``.set`` it on this
+        ResponseList.
+        """
+        self.set(ResponseInfo(*args, **kwargs))
+
+    def run_response_callbacks(self):
+        """Call ``run_response_callback`` on each item of this ReponseList."""
+        for resp_info in self:
+            resp_info.run_response_callback()
+
+
+@classify("misc", "class")
+class Flag(object):
+    """
+    A settable, nameable Boolean flag.
+
+    Instances can be used in a boolean context (if/while/etc.)
+
+    Call the instance to set a new value, returning the previous value.
+
+    ``.value`` to access the value.
+    ``.name`` to access the name.
+
+    Motivation:
+    Importing a boolean value from another module makes a new binding;
+    changing the imported binding does not change the imported-from-modules value.
+    Additionally, this gives you a nice named value for str() and repr(),
+    and a clean way to handle assigning new values and toggling existing values.
+
+    Typical use might be::
+
+        limit_thing = Flag(initial_value=False, name="Limit size of thing")
+
+    In the Command line processing code::
+
+        limit_thing(args.limit_thing)
+
+    Off in some module::
+
+        def do_thing():
+            ...
+            loop_size = LIMITED_SIZE if limit_thing else MAX_SIZE
+            ...
+
+    Use an instance of this class where you want semantic control over code
+    without having to expose implementation details of that code
+    to the control point;
+    keeping the determination of, say, "running smoke tests,"
+    or "running in a deployment pipeline," or "running in a PR checker,"
+    separate from how the code will react to that condition.
+    """
+
+    def __init__(self, initial_value=False, name="Flag"):
+        self._value = bool(initial_value)
+        self._name = name
+
+    def __call__(self, new_value):  # noqa: D102
+        old_value, self._value = self._value, bool(new_value)
+        return old_value
+
+    def toggle(self):
+        """Flip to the opposite value, return the old value."""
+        return self(not self)
+
+    @property
+    def value(self):  # noqa: D102
+        return self._value
+
+    @property
+    def name(self):  # noqa: D102
+        return self._name
+
+    def __str__(self):  # noqa: D105
+        return f"{self.name}->{self.value}"
+
+    def __repr__(self):  # noqa: D105
+        return (
+            f"<{self.__class__.__name__}"
+            f"(initial_value={self.value}, name={self.name!r})>"
+        )
+
+    def __bool__(self):
+        """
+        Instances are useable in boolean contexts.
+
+        See https://docs.python.org/3/reference/datamodel.html#object.__bool__
+        """
+        return self.value
+
+
+@classify("misc")
+def percent_diff(a, b, precision=2):
+    """Get percentage difference, out to ``precision`` places."""
+    if a == b:
+        return 0
+    elif a == 0 or b == 0:
+        return nan
+    # It is debatable whether this is the correct choice for determining
+    # relative difference. min(), max(), and the mean all have a case to be made for
+    # them, both with and without abs(). See, e.g.:
+    # https://en.wikipedia.org/wiki/Relative_change_and_difference#Definitions
+    return round(abs((a - b) / max(abs(a), abs(b))) * 100, precision)
+
+
+_adopt_into_package(globals())
@@ -0,0 +1,233 @@
+"""Classification of helpers into documentation categories."""
+
+from collections import defaultdict
+import sys as _sys
+import types as _types
+
+
+_CLASSIFICATION_ATTRIBUTE = "classify_data"
+"""Attribute used to store classification data on functions and classes."""
+
+
+_CLASSIFIED_ITEMS = defaultdict(dict)
+"""Every classified item, by module: ``{module name: {item name: item}}``."""
+
+_CLASSIFIED_BY_CATEGORY = defaultdict(lambda: defaultdict(dict))
+"""Classified items by module and category: ``{module: {category: {name: item}}}``."""
+
+
+def _register(target):
+    """Add ``target`` to the classification registry under its current module."""
+    module_name = getattr(target, "__module__", None)
+    name = getattr(target, "__name__", None)
+    if module_name is None or name is None:
+        return
+    _unregister(target, module_name)
+    _CLASSIFIED_ITEMS[module_name][name] = target
+    for category in getattr(target, _CLASSIFICATION_ATTRIBUTE):
+        _CLASSIFIED_BY_CATEGORY[module_name][category][name] = target
+
+
+def _unregister(target, module_name):
+    """Remove ``target`` from the registry for ``module_name``, if it is there."""
+    name = getattr(target, "__name__", None)
+    if _CLASSIFIED_ITEMS.get(module_name, {}).get(name) is not target:
+        return False
+    del _CLASSIFIED_ITEMS[module_name][name]
+    categories = _CLASSIFIED_BY_CATEGORY[module_name]
+    for category, items in list(categories.items()):
+        if items.get(name) is target:
+            del items[name]
+        if not items:
+            del categories[category]
+    return True
+
+
+def classify(*args):
+    """Add glossary subject category classification meta-data to it's target."""
+
+    def classifier(target):
+        setattr(target, _CLASSIFICATION_ATTRIBUTE, args)
+        _register(target)
+        return target
+
+    return classifier
+
+
+# classify itself deserves to be classified.
+# Since it can't be used as a regular decorator on itself, handle it here:
+classify = classify("doc", "meta-data")(classify)
+
+
+SINGLE_QUOTE = "'"
+DOUBLE_QUOTE = '"'
+
+
+@classify("doc")
+def first_line_of_doc_string(thing):
+    """
+    Get the first non-empty line of the doc string for thing, if there is one.
+
+    If thing is a class and has no doc string,
+    return the first line of the __init__ method doc string if there is one.
+    """
+
+    doc_string = getattr(thing, "__doc__", None)
+    if doc_string is None:
+        __init__method = getattr(thing, "__init__", None)
+        if __init__method:
+            return first_line_of_doc_string(__init__method)
+        return ""
+    doc_string_lines = list(filter(None, doc_string.splitlines()))
+    return doc_string_lines[0].strip()
+
+
+@classify("doc", "meta-data")
+def classified_items(for_module, category=None):
+    """
+    Return the items in ``for_module`` that were classified with :py:func:`classify`.
+
+    The items are recorded as they are decorated,
+    so no scan of the module's namespace is needed.
+
+    Args:
+        for_module (str): The name of the module whose items are wanted.
+        category (str, optional): Only return the items classified in this category.
+
+    Returns:
+        dict: A new dictionary mapping item names to the classified items.
+
+    """
+    if category is None:
+        return dict(_CLASSIFIED_ITEMS.get(for_module, {}))
+    return dict(_CLASSIFIED_BY_CATEGORY.get(for_module, {}).get(category, {}))
+
+
+@classify("doc")
+def build_classification_rst_string(from_dict, for_module, category_name_mappings):
+    """
+    Create rST for all the classified items in from_dict that are part of for_module.
+
+    Example:
+        __doc__ += build_classification_rst_string(globals(), __name__, <category
+                   mappings dict>)
+
+        The ``for_module`` parameter is needed because often ``globals()``
+        contains symbols imported from other modules not be documented here.
+
+    Args:
+        from_dict (dict): A dictionary of name to function/class mappings,
+            such as from locals() or globals()
+        for_module (str): The module for which rST documentation is desired.
+        category_name_mappings (str): Map from the short hand names used in the
+            :py:func:`classify` decorator to the desired category table label.
+
+    Returns:
+        str: multiline rST string.
+
+    """
+    classification_mapping = defaultdict(list)
+    # Only the items registered by ``classify`` for the module need to be looked at,
+    # rather than everything in ``from_dict``.
+    for name, item in sorted(_CLASSIFIED_ITEMS.get(for_module, {}).items()):
+        if from_dict.get(name) is not item or item.__module__ != for_module:
+            continue
+        classify_data = getattr(item, _CLASSIFICATION_ATTRIBUTE)
+        # The built-in csv module doesn't expose any way to quote CSV data without
+        # writing it to a file, and certainly not in rST's csv table format, so we
+        # protect the CSV here with a simple quote-mark replacement if/until a better
+        # csv option comes along.
+        csv_line = '   :py:func:`{}`, "{}"'.format(
+            name, first_line_of_doc_string(item).replace(DOUBLE_QUOTE, SINGLE_QUOTE)
+        )
+        for group in classify_data:
+            classification_mapping[group].append(csv_line)
+    if not classification_mapping:
+        return "<NO classifications were found>"
+    result = "\n\n"
+    for category, items in sorted(classification_mapping.items()):
+        result += ".. csv-table:: {}\n".format(category_name_mappings[category])
+        result += "   :widths: auto\n"
+        result += "\n"
+        result += "\n".join(items)
+        result += "\n\n"
+
+    result += "\n---------\n\n"
+    return result
+
+
+class _LazyDocModule(_types.ModuleType):
+    """
+    Module type whose ``__doc__`` gets its classification tables on first read.
+
+    See :py:func:`_defer_classification_doc`.
+    """
+
+    @property
+    def __doc__(self):  # noqa: D105
+        namespace = vars(self)
+        if "_classified_doc" not in namespace:
+            get_items, category_name_mappings = namespace["_classification_doc_args"]
+            classification_rst = build_classification_rst_string(
+                get_items(), self.__name__, category_name_mappings
+            )
+            namespace["_classified_doc"] = namespace["__doc__"] + classification_rst
+        return namespace["_classified_doc"]
+
+    @__doc__.setter
+    def __doc__(self, value):  # noqa: D105
+        namespace = vars(self)
+        namespace["__doc__"] = value
+        namespace.pop("_classified_doc", None)
+
+
+def _defer_classification_doc(module_name, category_name_mappings, get_items=None):
+    """
+    Append the classification rST to a module's ``__doc__`` when it is first read.
+
+    Use in place of::
+
+        __doc__ += build_classification_rst_string(globals(), __name__, <mappings>)
+
+    so that the tables, which are only wanted when building documentation,
+    are not built every time the module is imported. The result is the same.
+
+    Args:
+        module_name (str): The module to document, usually ``__name__``.
+        category_name_mappings (dict): as for :py:func:`build_classification_rst_string`
+        get_items (callable, optional): Called with no arguments to get the ``dict``
+            of items to document. Defaults to the module's own namespace.
+
+    """
+    module = _sys.modules[module_name]
+    if get_items is None:
+        get_items = vars(module).copy
+    vars(module)["_classification_doc_args"] = (get_items, category_name_mappings)
+    module.__class__ = _LazyDocModule
+
+
+def _adopt_into_package(namespace):
+    """
+    Make the public items defined in an internal module belong to its package.
+
+    The package is split into internal modules only so that importing any one piece
+    of it stays cheap. Documentation, pickling, and
+    :py:func:`build_classification_rst_string` should still see the items as
+    belonging to the package that re-exports them.
+
+    Args:
+        namespace (dict): The ``globals()`` of the internal module.
+
+    """
+    module_name = namespace["__name__"]
+    package_name = namespace["__package__"]
+    for name, item in namespace.items():
+        if name.startswith("_") or getattr(item, "__module__", None) != module_name:
+            continue
+        was_classified = _unregister(item, module_name)
+        item.__module__ = package_name
+        if was_classified:
+            _register(item)
+
+
+_adopt_into_package(globals())
@@ -0,0 +1,289 @@
+"""Helpers for files, the environment, subprocesses, and exiting."""
+
+import ast
+import os as _os
+import random
+import shutil as _shutil
+import string as _string
+import subprocess as _subprocess
+import sys as _sys
+
+from ._basics import _python_2_or_3_base_str_type, default_if_none
+from ._classify import _adopt_into_package, classify
+
+
+@classify("files", "meta-data")
+def display_name(path, package_name=""):
+    """
+    Create a human-readable name for a given project.
+
+    Determine the display name for a project given a path and (optional) package name.
+    If a display_name.txt file is found, the first line is returned. Otherwise, return a
+    title-cased string from either the base directory or package_name (if provided).
+
+    Args:
+        path (str): Path for searching
+        package_name (str): Sphinx-style, dot-delimited package name (optional)
+
+    Returns:
+        str: A display name for the provided path
+
+    """
+    name_path = _os.path.join(path, "display_name.txt")
+    if _os.path.exists(name_path):
+        with open(name_path, "r") as name_fo:
+            return name_fo.readline().rstrip("\r\n")
+    raw_name = package_name.split(".")[-1] if package_name else _os.path.basename(path)
+    return _string.capwords(raw_name.replace("_", " "))
+
+
+@classify("exit")
+def cleanup_and_exit(dir_name=None, status=0, message=None):
+    """
+    Cleanup a directory tree that was created and exit.
+
+    Args:
+        dir_name (string): Full path to a directory to remove (optional)
+        status (int): Exit code to use for exit (optional)
+        message (string): Message to print to standard error (optional)
+
+    """
+    if dir_name:
+        _shutil.rmtree(dir_name)
+    exit(status=status, message=message)
+
+
+@classify("exit", "running commands")
+def safe_run(commands, cwd=None):
+    """
+    Run the given list of commands, only return if no error.
+
+    If there is an error in attempting or actually running the commands,
+    error messages are printed to stdout and ``sys.exit()`` will be called.
+    """
+
+    try:
+        status = _subprocess.call(commands, cwd=cwd)
+    except OSError as e:
+        print("")
+        print('Error when trying to execute: "{}"'.format(" ".join(commands)))
+        print("")
+        print(e)
+        _sys.exit(-1)
+
+    if status:
+        print("")
+        print('Error {} from running: "{}"'.format(status, " ".join(commands)))
+        print("")
+        _sys.exit(status)
+
+
+@classify("exit")  # noqa: A001
+def exit(status=0, message=None):  # noqa: A001
+    """
+    Exit the program and optionally print a message to standard error.
+
+    Args:
+        status (int): Exit code to use for exit (optional)
+        message (string): Message to print to standard error (optional)
+
+    """
+    if message:
+        print(message, file=_sys.stderr)
+    _sys.exit(status)
+
+
+@classify("exit")
+def error_if(check, status=None, message=""):
+    """
+    Exit the program if a provided check is true.
+
+    Exit the program if the check is true. If a status is provided, that code is used
+    for the exit code; otherwise the value from the check is used. An optional message
+    for standard error can also be provided.
+
+    Args:
+        check: Anything with truthiness that can check if the program should exit or not
+        status (int): Exit code to use for exit (optional)
+        message (string): Message to print to standard error if check is True (optional)
+
+    """
+    if check:
+        exit(status=status or check, message=message.format(check))
+
+
+@classify("random", "string")
+def generate_random_string(prefix="", suffix="", size=8, choose_from=None):
+    """
+    Generate a random string of the specified size.
+
+    Args:
+        prefix (str, optional): String to prepend to the beginning of the random string.
+        suffix (str, optional): String to append to the end of the random string.
+        size (int, optional): Number of characters the random string should have.
+            (defaults to 8)
+        choose_from (str): A string containing the characters from which the randomness
+            will be chosen. If not provided, it will choose from lowercase letters and
+            digits.
+
+    Returns:
+        str: A randomly generated string.
+
+    Raises:
+        AssertionError: if the given length is incompatible with prefix/suffix length
+
+    Examples:
+        >>> generate_random_string()
+        'vng345jn'
+        >>> generate_random_string(prefix='Lbs-', suffix='-test', size=15)
+        'Lbs-js7eh9-test'
+        >>> generate_random_string(prefix='Lbs-', size=15)
+        'Lbs-js7eh98sfnk'
+        >>> generate_random_string(suffix='-test', size=15)
+        '8sdfjs7eh9-test'
+        >>> generate_random_string(choose_from="aeiou")
+        'uiiaueea'
+
+    """
+    choose_from = default_if_none(choose_from, _string.ascii_lowercase + _string.digits)
+    rand_string_length = size - len(prefix) - len(suffix)
+    message = '"size" of {} too short with prefix {} and suffix {}!'
+    assert rand_string_length > 0, message.format(size, prefix, suffix)
+    rand_string = "".join(random.choice(choose_from) for _ in range(rand_string_length))
+    return "{}{}{}".format(prefix, rand_string, suffix)
+
+
+@classify("exit", "environment")
+def must_be_in_virtual_environment(
+    exit_code=1, message="Must be running in a Python virtual environment, aborting!"
+):
+    """
+    Ensure the current process is running in a virtual environment.
+
+    Args:
+        exit_code (int, optional): Exit code to use if not running in a virtual
+            environment.
+        message (string, optional): Message to print if not running in a virtual
+            environment.
+
+    """
+    if "VIRTUAL_ENV" not in _os.environ:
+        exit(exit_code, message)
+
+
+@classify("environment")
+def var_from_env(var_name):
+    """
+    Try to get a value from an environment variable.
+
+    Get an environment variable and raise an error if not set / has an empty value.
+
+    Returns:
+        str: The value of the environment variable.
+
+    Raises:
+        ValueError: if the variable name is not set or has an empty value.
+
+    """
+    envvar = _os.environ.get(var_name)
+    if not envvar:
+        raise ValueError('"{}" variable not found!'.format(var_name))
+    return envvar
+
+
+@classify("files")
+def get_file_contents(*paths):
+    """
+    Get the contents of a file as a Python string.
+
+    Args:
+        *paths: All paths that lead to the file whole contents are to be retrieved.
+
+    Returns:
+        str: The contents of the file.
+
+    """
+    with open(_os.path.join(_os.path.join(*paths)), "r") as f:
+        return f.read()
+
+
+@classify("files", "meta-data")
+def get_file_docstring(file_path):
+    """
+    Get the full docstring of a given python file.
+
+    Args:
+        file_path (str): The path to the file whose docstring should
+            be gathered and returned.
+
+    Returns:
+        str: The python file's docstring.
+
+    """
+    tree = ast.parse(get_file_contents(file_path))
+    return ast.get_docstring(tree)
+
+
+@classify("files", "filter")
+def filter_lines(line_filter, lines, return_type=None):
+    """
+    Filter the given lines based on the given filter function.
+
+    This function by default will return the same type that it is given.
+    If you'd like, you may return a different type by providing the
+    ``return_type`` parameter.
+
+    The expected values for the the ``lines`` parameter type and the
+    ``return_type`` value are ``str`` and ``list``. Any other types/values
+    may cause unexpected behavior.
+
+    Args:
+        line_filter (Callable): The callable function to be used to filter each line.
+            It should take a single string parameter and return a boolean.
+        lines (Union[str, List[str]]): Either a string with newline characters splitting
+            the lines, or a list of lines as strings.
+        return_type (type): The desired return type. If not provided, the type of the
+            ``lines`` parameter will be used.
+
+    Returns:
+        Union[str, List[str]]: The filtered lines.
+
+    """
+    if return_type is None:
+        return_type = type(lines)
+
+    if isinstance(lines, _python_2_or_3_base_str_type()):
+        lines = lines.split("\n")
+
+    filtered_lines = list(filter(line_filter, lines))
+    return filtered_lines if return_type is list else "\n".join(filtered_lines)
+
+
+# Define this here because it is needed by the other scripts.
+def execute_command_list(commands_to_run, verbose=True):
+    """
+    Execute each command in the list.
+
+    If any command fails, print a helpful message and exit with that status.
+    """
+    for command in commands_to_run:
+        readable_command = " ".join(command)
+        try:
+            if verbose:
+                print(readable_command)
+            _subprocess.check_call(command)
+        except _subprocess.CalledProcessError as e:
+            print(
+                '"{}" - returned status code "{}"'.format(
+                    readable_command, e.returncode
+                )
+            )
+            exit(e.returncode)
+        except FileNotFoundError as f:
+            print(
+                '"{}" - No such file/program: "{}"'.format(readable_command, f.filename)
+            )
+            exit(2)
+
+
+_adopt_into_package(globals())
@@ -0,0 +1,202 @@
+"""Looping, retrying, and exception related helpers."""
+
+import logging
+import time as _time
+
+import wrapt as _wrapt
+
+from ._basics import fib_or_max, format_if, no_op, truths_from
+from ._classify import _adopt_into_package, classify
+
+
+_logger = logging.getLogger(__package__)
+_debug = _logger.debug
+
+
+CHECK_UNTIL_TIMEOUT = 300
+CHECK_UNTIL_CYCLE_SECS = 5
+
+
+DEFAULT_MAX_RETRY_SLEEP = 30
+
+
+@classify("looping", "exceptions")
+def retry_on_exceptions(
+    max_retry_count, exceptions, max_retry_sleep=DEFAULT_MAX_RETRY_SLEEP
+):
+    """
+    Retry a function based on provided parameters.
+
+    A wrapper to retry a function max_retry_count times if any of the given exceptions
+    are raised.
+
+    In the event the exception/exceptions are raised, this code will sleep for ever
+    increasing amounts of time (using the fibonacci sequence) but capping at
+    max_retry_sleep seconds.
+
+    Args:
+        max_retry_count (int): The maximum number of retries, must be > 0..
+        exceptions (exception or tuple of exceptions): The exceptions to catch and
+            retry on.
+        max_retry_sleep (int, float): The maximum time to sleep between retries.
+    """
+    assert exceptions, "No exception(s) given"
+    assert max_retry_count > 0, "max_retry_count must be greater than 0"
+
+    @_wrapt.decorator
+    def wrapper(wrapped, instance, args, kwargs):
+        error_count = 0
+        while error_count <= max_retry_count:
+            try:
+                return wrapped(*args, **kwargs)
+            except exceptions as e:
+                error = e
+                _debug('Retry on exception: "{}" encountered during call'.format(error))
+                error_count += 1
+                retry_sleep = fib_or_max(error_count, max_number=max_retry_sleep)
+                _debug("...trying again after a sleep of {}".format(retry_sleep))
+                _time.sleep(retry_sleep)
+        _debug(
+            "Retry on exception: Max Retry Count of {} Exceeded".format(max_retry_count)
+        )
+        raise error
+
+    return wrapper
+
+
+@classify("looping", "exceptions", "class")
+class IncompleteAtTimeoutException(Exception):
+    """
+    Exception for check_until results that timeout still pending validation.
+
+    Args:
+        msg (str): Human readable string describing the exception.
+        call_result (any): the final result of the call, which failed validation.
+        timeout (int,float): the timeout at which the result was still failing.
+
+    Atributes:
+        call_result (any): the final result of the call, which failed validation.
+        timeout (int,float): the timeout at which the result was still failing.
+
+    """
+
+    def __init__(self, msg, call_result=None, timeout=None):
+        self.call_result = call_result
+        self.timeout = timeout
+        super(IncompleteAtTimeoutException, self).__init__(msg)
+
+
+@classify("looping")
+def check_until(
+    function_call,
+    is_complete_validator,
+    timeout=CHECK_UNTIL_TIMEOUT,
+    cycle_secs=CHECK_UNTIL_CYCLE_SECS,
+    logger=_logger,
+    fn_args=None,
+    fn_kwargs=None,
+):
+    """
+    Periodically call a function until its result validates or the timeout is exceeded.
+
+    Args:
+        function_call (function): The function to be called
+        is_complete_validator (function): a fn that will accept the output from
+            function_call and return False if the call should continue repeating (still
+            pending result), or True if the checked result is complete and may be
+            returned.
+        timeout (int): maximum number of seconds to "check until" before raising an
+            exception.
+        cycle_secs (int): how long to wait (in seconds) in between calls to
+            function_call.
+        logger (logging.logger, optional): a logging instance to be used for debug info,
+            or ``None`` to suppress logging by this function.
+        fn_args (tuple, optional): tuple of positional args to be provided to
+            function_call
+        fn_kwargs (dict, optional): keyword args to be provided to function_call
+
+    Returns:
+        any: the result of function_call when the is_complete_validator returns any True
+            value.
+
+    Raises:
+        jgt_common.IncompleteAtTimeoutException: if function_call's result never
+            satisfies the is_complete_validator before timeout is reached.
+
+    """
+    fn_args = fn_args or ()
+    fn_kwargs = fn_kwargs or {}
+    debug = logger.debug if logger else no_op
+
+    check_start = _time.time()
+    end_time = _time.time() + timeout
+
+    while True:
+        result = function_call(*fn_args, **fn_kwargs)
+        if is_complete_validator(result):
+            time_elapsed = round(_time.time() - check_start, 2)
+            debug("Final response achieved in {} seconds".format(time_elapsed))
+            return result
+        if _time.time() > end_time:
+            break
+        _time.sleep(cycle_secs)
+    # If a result wasn't returned from within the while loop,
+    # we have reached timeout without a valid result.
+    msg = "Response was still pending at timeout."
+    debug(msg)
+    raise IncompleteAtTimeoutException(msg, call_result=result, timeout=timeout)
+
+
+@classify("misc", "exceptions")
+def assert_if_values(format_if_format, error_fun=lambda x: "\n".join(truths_from(x))):
+    """
+    Assert if any truthy values are returned (or yielded) from the decorated function.
+
+    Any values that the decorated function yields/returns are passed to ``error_fun``.
+    ``format_if_format``, and the result of the ``error_fun`` call,
+    are passed to ``format_if``.
+    The result of the ``format_if`` call is used for an assertion.
+
+    Args:
+        format_if_format (str): the first parameter to format_if.
+        error_fun (callable): called on the results of the decorated function,
+            return value will be passed as the 2nd parameter to format_if.
+            The default function will only process truthy values.
+            That can be changed by passing in your own custom ``error_fun``
+
+    Returns:
+        None - If no values are returned, or yielded,
+        or the result of ``error_fun`` is falsey, return None.
+
+    Raises:
+        AssertionError: as described above.
+
+    This decorator is meant to simplify code that otherwise has to manually keep
+    track of a list of things to complain about::
+
+        errors = []
+        for thing in things:
+           if bad(thing):
+               errors.append(description_of(thing))
+        err_msg = format_if("blah blah blah: {}", "".join(errors))
+        assert not err_msg, err_msg
+
+    into simpler code::
+
+        @assert_if_values("blah blah blah: {}")
+        ...
+            for thing in things:
+                if bad(thing):
+                    yield description_of(thing)
+
+    """
+
+    @_wrapt.decorator
+    def helper(wrapped, instance, args, kwargs):
+        err_msg = format_if(format_if_format, error_fun(wrapped(*args, **kwargs)))
+        assert not err_msg, err_msg
+
+    return helper
+
+
+_adopt_into_package(globals())
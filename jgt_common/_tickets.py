@@ -0,0 +1,126 @@
+"""Ticketing system identification, based on the ``tag_to_url`` plugins."""
+
+from collections import defaultdict
+
+from ._basics import must_get_key
+from ._classify import _adopt_into_package, classify
+
+
+_TICKET_INFO_ENTRY_POINT_GROUP = "tag_to_url"
+
+# Snapshot of the ``tag_to_url`` plugin registry, see ``_ticket_info``.
+_TICKET_INFO_SNAPSHOT = None
+_OBSOLETE_TICKETING_SYSTEMS_SNAPSHOT = None
+
+
+def _ticket_info_entry_points():
+    """Return the installed ``tag_to_url`` entry points."""
+    try:
+        from importlib.metadata import entry_points
+    except ImportError:  # Python < 3.8
+        import pkg_resources
+
+        return pkg_resources.iter_entry_points(_TICKET_INFO_ENTRY_POINT_GROUP)
+
+    all_entry_points = entry_points()
+    if hasattr(all_entry_points, "select"):
+        return all_entry_points.select(group=_TICKET_INFO_ENTRY_POINT_GROUP)
+    # Python < 3.10 returns a plain dict of group name to entry points.
+    return all_entry_points.get(_TICKET_INFO_ENTRY_POINT_GROUP, ())
+
+
+def _ticket_info():
+    """
+    Return the ``tag_to_url`` registry, loading the plugins on first use.
+
+    Scanning the installed distributions and loading every plugin is far too
+    expensive to do whenever this package is imported, so it is done once,
+    the first time ticket information is actually needed, and the result is kept.
+    """
+    global _TICKET_INFO_SNAPSHOT
+    if _TICKET_INFO_SNAPSHOT is None:
+        ticket_info = defaultdict(dict)
+        for data in _ticket_info_entry_points():
+            ticket_info[data.name].update(data.load())
+        _TICKET_INFO_SNAPSHOT = ticket_info
+    return _TICKET_INFO_SNAPSHOT
+
+
+def _obsolete_ticketing_systems():
+    """Return the ticketing systems that no longer have a ``url_template``."""
+    global _OBSOLETE_TICKETING_SYSTEMS_SNAPSHOT
+    if _OBSOLETE_TICKETING_SYSTEMS_SNAPSHOT is None:
+        _OBSOLETE_TICKETING_SYSTEMS_SNAPSHOT = [
+            key
+            for key, meta_data in _ticket_info().items()
+            if not meta_data.get("url_template")
+        ]
+    return _OBSOLETE_TICKETING_SYSTEMS_SNAPSHOT
+
+
+_LAZY_ATTRIBUTES = {
+    "OBSOLETE_TICKETING_SYSTEMS": _obsolete_ticketing_systems,
+    "_TICKET_INFO": _ticket_info,
+}
+"""Module attributes that are only computed when first accessed."""
+
+
+def __getattr__(name):
+    """
+    Compute the expensive module attributes in ``_LAZY_ATTRIBUTES`` on demand.
+
+    ``OBSOLETE_TICKETING_SYSTEMS`` - Systems for which we still support identifying
+    Tickets, but no longer can access.
+    """
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+    return _LAZY_ATTRIBUTES[name]()
+
+
+def __dir__():
+    """Include the lazily computed module attributes."""
+    return sorted(set(globals()).union(_LAZY_ATTRIBUTES))
+
+
+@classify("misc", "ticketing system")
+def ticketing_system_for(ticket):
+    """Return the Ticketing System/Type for the given ticket, or the empty string."""
+    for ticket_system, info in _ticket_info().items():
+        if info["pattern"].match(ticket):
+            return ticket_system
+    return ""
+
+
+@classify("misc", "ticketing system")
+def url_for_ticket(ticketing_system, ticket):
+    """
+    Return a URL for the given ticketing_system, ticket pair.
+
+    Does NOT validate that ticket string "looks" like a ticket for the ticketing system.
+
+    Raises if ticketing_system is not a supported system.
+    """
+    system_dict = must_get_key(_ticket_info(), ticketing_system)
+    return system_dict.get("url_template", "").format(ticket)
+
+
+@classify("misc", "ticketing system")
+def url_if_ticket(ticket):
+    """
+    Return a Ticket URL if a ticket is found.
+
+    Args:
+        ticket (string): Possible ticket ID
+
+    Returns:
+        string: Either a URL if a string is found, otherwise an empty string.
+
+    """
+
+    ticket_system = ticketing_system_for(ticket)
+    if ticket_system:
+        return url_for_ticket(ticket_system, ticket)
+    return ""
+
+
+_adopt_into_package(globals())
@@ -3,23 +3,20 @@
 # NOTE TO IMPLEMENTORS:
 # This module depends on the contracts described in our sibling module ``check``.
 # In the spirit of DRY, please see that module for details.
-
+#
+# Everything after ``assert_if_truthy`` is GENERATED from ``check`` by running
+# ``python -m jgt_common._assert_codegen``. Do not edit it by hand, change ``check``
+# and regenerate this module instead.
 
 from functools import wraps as _wraps
-from inspect import getmodule as _getmodule
-from inspect import getmembers as _getmembers
-from inspect import isfunction as _isfunction
 
-from . import check as _check
+from .check import _format_if, _isclose, _msg_concat, percent_diff
 
 
 # Used internally, but there is no reason to prevent it from being used externally.
 def assert_if_truthy(fun):
     """(Decorator) Assert if fun returns a truthy value (error indicator)."""
 
-    # NOTE: Not using ``wrapt`` because it forwards attributes
-    #       from the wrapping function to the wrapped function,
-    #       which will break the code in _make_asserter.
     @_wraps(fun)
     def wrapper(*args, **kwargs):
         result = fun(*args, **kwargs)
@@ -28,31 +25,161 @@ def assert_if_truthy(fun):
     return wrapper
 
 
-def _make_asserter(member):
-    """
-    Make fun part of member an asserting function _and_ take ownership of the wrapper.
+def not_eq(expected, actual, msg=""):
+    """Assert that the values are not equal."""
+    if expected != actual:
+        return
+    message = _msg_concat(
+        msg, "Expected '{}' to be not equal to actual '{}'".format(expected, actual)
+    )
+    assert not message, message
 
-    The wrapped function should have a correct doc string,
-    and a module attribute that shows it belongs
-    to us instead of ``check``, which could be confusing.
-    """
-    name, fun = member
-    new_fun = assert_if_truthy(fun)
-    if new_fun.__doc__:
-        new_fun.__doc__ = new_fun.__doc__.replace("Check", "Assert")
-    new_fun.__module__ = __name__
-    return (name, new_fun)
+
+def eq(expected, actual, msg=""):
+    """Assert that the values are equal."""
+    if expected == actual:
+        return
+    message = _msg_concat(msg, "Expected '{}' == actual '{}'".format(expected, actual))
+    assert not message, message
+
+
+def less(a, b, msg=""):
+    """Assert that a < b."""
+    if a < b:
+        return
+    message = _msg_concat(msg, "Expected '{}' < '{}'".format(a, b))
+    assert not message, message
+
+
+def less_equal(a, b, msg=""):
+    """Assert that a <= b."""
+    if a <= b:
+        return
+    message = _msg_concat(msg, "Expected '{}' <= '{}'".format(a, b))
+    assert not message, message
+
+
+def greater(a, b, msg=""):
+    """Assert that a > b."""
+    if a > b:
+        return
+    message = _msg_concat(msg, "Expected '{}' > '{}'".format(a, b))
+    assert not message, message
 
 
-def _is_exported_name(name):
-    """Is ``name`` something that check wants exported."""
-    # If ``check`` ever switches to using the ``__all__`` mechanism, update this code:
-    return not name.startswith("_")
+def greater_equal(a, b, msg=""):
+    """Assert that a >= b."""
+    if a >= b:
+        return
+    message = _msg_concat(msg, "Expected '{}' >= '{}'".format(a, b))
+    assert not message, message
 
 
-def _should_be_wrapped(member):
-    name, obj = member
-    return _is_exported_name(name) and _isfunction(obj) and _getmodule(obj) == _check
+def is_in(value, sequence, msg=""):
+    """Assert that value is in the sequence."""
+    if value in sequence:
+        return
+    message = _msg_concat(msg, "Expected: '{}' to be in '{}'".format(value, sequence))
+    assert not message, message
 
 
-globals().update(map(_make_asserter, filter(_should_be_wrapped, _getmembers(_check))))
+def any_in(a_sequence, b_sequence, msg=""):
+    """Assert that at least one member of a_sequence is in b_sequence."""
+    if any(a in b_sequence for a in a_sequence):
+        return
+    message = _msg_concat(
+        msg, "None of: '{}' found in '{}'".format(a_sequence, b_sequence)
+    )
+    assert not message, message
+
+
+def not_in(item, sequence, msg=""):
+    """Assert that item is not in sequence."""
+    if item not in sequence:
+        return
+    message = _msg_concat(
+        msg, "Did NOT Expect: '{}' to be in '{}'".format(item, sequence)
+    )
+    assert not message, message
+
+
+def is_not_none(a, msg=""):
+    """Assert a is not None."""
+    if a is not None:
+        return
+    message = _msg_concat(msg, "'{}' should not be None".format(a))
+    assert not message, message
+
+
+def is_not_empty(sequence, msg=""):
+    """
+    Cheeck that sequence is not empty.
+
+    Semantically more descriptive than just testing sequence for truthyness.
+
+    Sequences and containers in python are False when empty, and True when not empty.
+    This helper reads better in the test code and in the error message.
+    """
+    if sequence:
+        return
+    message = _msg_concat(msg, "'{}' - should not be empty".format(sequence))
+    assert not message, message
+
+
+def is_close(a, b, msg="", **isclose_kwargs):
+    """Assert that math.isclose returns True based on the given values."""
+    if _isclose(a, b, **isclose_kwargs):
+        return
+    message = _msg_concat(
+        msg,
+        "Expected '{}' to be close to '{}', "
+        "but they differ by '{}', a difference of '{}%'.{}".format(
+            a,
+            b,
+            abs(a - b),
+            percent_diff(a, b),
+            _format_if(": kwargs: {}", isclose_kwargs),
+        ),
+    )
+    assert not message, message
+
+
+def almost_equal(actual, expected, places=2, msg=""):
+    """Assert that actual and expected are within `places` equal."""
+    # Set relative tolerance to 0 because we don't want that messing up the places check
+    relative_tolerance = 0
+    absolute_tolerance = 10.0 ** (-places)
+    if _isclose(
+        expected, actual, rel_tol=relative_tolerance, abs_tol=absolute_tolerance
+    ):
+        return
+    message = _msg_concat(
+        msg, "Expected '{}' to be almost equal to '{}'".format(actual, expected)
+    )
+    assert not message, message
+
+
+def is_singleton_list(sequence, item_description="something", msg=""):
+    """Assert that the sequence has exactly one item (of item_description)."""
+    if len(sequence) == 1:
+        return
+    message = _msg_concat(
+        msg,
+        "Expected to find a one item list of {} but found '{}' instead".format(
+            item_description, sequence
+        ),
+    )
+    assert not message, message
+
+
+def is_instance(value, of_type, msg=""):
+    """Assert that value is an instance of of_type."""
+    if isinstance(value, of_type):
+        return
+    message = _msg_concat(
+        msg,
+        "Got value '{}' of type '{}' when expecting something of type {}".format(
+            value, type(value), of_type
+        ),
+    )
+    assert not message, message
@@ -0,0 +1,257 @@
+"""
+Helpful functions for fanning out coroutines on one asyncio event loop.
+
+These are the asyncio counterparts of the functions in ``jgt_common.futures``,
+with the same names and vocabulary, for async clients that would otherwise
+need a thread each to run in parallel.
+
+Terminology:
+
+  * fdict - futures dictionary - as in ``jgt_common.futures``, but the keys
+    are ``asyncio.Task`` objects, each running ``func(item)`` for its item.
+
+Purpose:
+
+   As with ``jgt_common.futures``, these are meant for "spot" parallelism:
+   code that needs to make a whole bunch of slow calls that can be done
+   concurrently, and then "goes synchronous again." Thousands of concurrent
+   calls only need thousands of tasks, not thousands of threads.
+
+Architecture:
+
+   ``func`` is a coroutine function (``async def``) called with one item.
+   At most the concurrency limit of them run at once, per call of ``run_each``.
+   The default limit is set by ``set_concurrency_limit``, so an application
+   can configure it in one place, and each function also takes a ``limit``.
+
+   ``run_each`` and the harvesting functions must be used on a running event loop.
+   Synchronous callers can use ``run_sync`` to run any of them to completion
+   without managing a loop, or ``run_each_sync`` for a list of results.
+
+"""
+
+import asyncio as _asyncio
+
+DEFAULT_CONCURRENCY_LIMIT = 100
+
+_CONCURRENCY_LIMIT = DEFAULT_CONCURRENCY_LIMIT
+
+
+def set_concurrency_limit(limit):
+    """Set the default for how many ``func`` calls can run at once."""
+
+    global _CONCURRENCY_LIMIT
+    if limit < 1:
+        raise ValueError("limit must be at least 1, not {}".format(limit))
+    _CONCURRENCY_LIMIT = limit
+
+
+async def _limited(semaphore, func, item):
+    """Return the result of awaiting ``func(item)``, once ``semaphore`` allows."""
+    async with semaphore:
+        return await func(item)
+
+
+def run_each(iterable, func, limit=None):
+    """
+    Start a task awaiting ``func`` on each item in ``iterable``.
+
+    The returned fdict's tasks (keys of the fdict) will not have started
+    by the time this function returns, they start when the caller next awaits.
+    It is up to the caller to decide how to harvest the results from the tasks.
+
+    Can be used directly, but is mostly used under the covers
+    by the other functions here.
+
+    Args:
+        iterable (any): Any iterable.
+        func (coroutine function): will be called with one item from iterable.
+        limit (int): how many calls of ``func`` can run at once,
+            defaults to the limit from ``set_concurrency_limit``.
+
+    Returns:
+        dict: an fdict whose values are the items from the iterable.
+
+    Raises:
+        RuntimeError: if there is no running event loop.
+    """
+
+    if limit is None:
+        limit = _CONCURRENCY_LIMIT
+    if limit < 1:
+        raise ValueError("limit must be at least 1, not {}".format(limit))
+    # Made here, on the running loop, for Python versions that bind it to a loop.
+    semaphore = _asyncio.Semaphore(limit)
+    loop = _asyncio.get_running_loop()
+    return {
+        loop.create_task(_limited(semaphore, func, item)): item for item in iterable
+    }
+
+
+async def _as_completed_items(fdict):
+    """Yield ``(task, item)`` from ``fdict`` as each task completes."""
+    pending = set(fdict)
+    while pending:
+        done, pending = await _asyncio.wait(
+            pending, return_when=_asyncio.FIRST_COMPLETED
+        )
+        for task in done:
+            yield task, fdict[task]
+
+
+async def _cancel(tasks):
+    """Cancel ``tasks`` and wait for them to finish being cancelled."""
+    for task in tasks:
+        task.cancel()
+    await _asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def set_response_when_completed(fdict):
+    """Set ``.response`` on each value from ``fdict`` to its task's result."""
+
+    async for task, item in _as_completed_items(fdict):
+        item.response = task.result()
+
+
+async def set_response_on_each(iterable, func, limit=None):
+    """
+    Shorthand for ``await set_response_when_completed(run_each(iterable, func))``.
+
+    This is primarily for those using jgt_common's ``ResponseList`` and
+    ``ResponseInfo`` objects.
+
+    Example:
+        Instead of writing::
+
+            for item in work_list:
+                item.response = await client.do_work(item.input)
+
+        Run that work concurrently::
+
+            await set_response_on_each(
+                work_list, lambda item: client.do_work(item.input)
+            )
+    """
+
+    await set_response_when_completed(run_each(iterable, func, limit=limit))
+
+
+async def set_when_completed(field, fdict):
+    """Set the given ``field`` on each value from ``fdict`` to its task's result."""
+
+    async for task, item in _as_completed_items(fdict):
+        setattr(item, field, task.result())
+
+
+async def set_each(iterable, field, func, limit=None):
+    """
+    Set ``field`` on each item from ``iterable`` to the value of ``await func(item)``.
+
+    Shorthand for ``await set_when_completed(field, run_each(iterable, func))``.
+
+    A more general form of ``set_response_on_each``.
+    """
+
+    await set_when_completed(field, run_each(iterable, func, limit=limit))
+
+
+async def as_completed_result(fdict):
+    """Yield each task's ``.result()`` from ``fdict`` as each task completes."""
+
+    async for task, _ in _as_completed_items(fdict):
+        yield task.result()
+
+
+async def result_from_each(iterable, func, limit=None):
+    """
+    Shorthand for ``as_completed_result(run_each(iterable, func))``.
+
+    When you want all the results from awaiting ``func`` on the items from
+    ``iterable``, but you don't need to know which result came from which item
+    or in which order.
+    If this generator is not run to the end, the remaining tasks are cancelled.
+    """
+
+    fdict = run_each(iterable, func, limit=limit)
+    try:
+        async for result in as_completed_result(fdict):
+            yield result
+    finally:
+        await _cancel([task for task in fdict if not task.done()])
+
+
+async def as_completed_item_result(fdict):
+    """
+    Yield ``(item, task.result())`` from ``fdict``, as each task completes.
+
+    The order of values in the tuples allow this function
+    to be used to create a dict mapping from an item to its result::
+
+        tasks = run_each(iterable, func)
+        results = as_completed_item_result(tasks)
+        results_map = {item: result async for item, result in results}
+    """
+
+    async for task, item in _as_completed_items(fdict):
+        yield item, task.result()
+
+
+def run_sync(coroutine):
+    """
+    Run ``coroutine`` to completion on a new event loop, and return its result.
+
+    This lets synchronous code use the functions here without managing a loop::
+
+        run_sync(set_response_on_each(work_list, fetch))
+
+    If this thread is already running an event loop, which can't run another,
+    the new loop is run in another thread while this one waits for it.
+    """
+
+    async def main():
+        return await coroutine
+
+    try:
+        _asyncio.get_running_loop()
+    except RuntimeError:
+        return _asyncio.run(main())
+    # Imported here, as it is only needed when called from a running loop.
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(_asyncio.run, main()).result()
+
+
+async def _results_in_order(iterable, func, limit):
+    """Return the results of ``run_each``, in the order of the items."""
+    fdict = run_each(iterable, func, limit=limit)
+    if not fdict:
+        return []
+    # The tasks in the order they finish, as a done set has no order.
+    finished = []
+    for task in fdict:
+        task.add_done_callback(finished.append)
+    try:
+        await _asyncio.wait(fdict, return_when=_asyncio.FIRST_EXCEPTION)
+        for task in finished:
+            if not task.cancelled() and task.exception():
+                task.result()
+        return [task.result() for task in fdict]
+    finally:
+        await _cancel([task for task in fdict if not task.done()])
+
+
+def run_each_sync(iterable, func, limit=None):
+    """
+    Return the results of awaiting ``func`` on each item in ``iterable``, in order.
+
+    The synchronous bridge for a batch: ``func`` is awaited on all the items
+    concurrently, up to ``limit`` at once, on an event loop that is started
+    and closed by this function.
+
+    Raises:
+        Exception: the first exception that any ``func`` call raised,
+            after cancelling the calls that have not finished.
+    """
+
+    return run_sync(_results_in_order(iterable, func, limit))
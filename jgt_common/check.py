@@ -20,13 +20,17 @@ can be exploited for use with ``format_if`` or ``assert`` or ...
 # 5 If any classes are defined in this module, they will not be processed by ``assert_``
 #   and may or may not need a hand written version in that module.
 # 6 If we ever switch to using __all__ for controlling what functions we export,
-#   the ``assert_`` module  will need to be changed.
+#   the ``_assert_codegen`` module  will need to be changed.
 # 7 There are no direct self-tests for this module because everything here
 #   is tested via the ``assert_`` module's tests.
 #   New functions added here should have new assertion tests in tests/test_asserts.py
+# 8 The ``assert_`` module is generated from this one by inlining each function,
+#   so regenerate it with ``python -m jgt_common._assert_codegen`` after any change.
+#   Passing checks must ``return ""`` literally, and the functions here must not
+#   call each other or use a local variable named ``message``.
 
-from . import percent_diff
-from . import format_if as _format_if
+from ._basics import percent_diff
+from ._basics import format_if as _format_if
 
 try:
     from math import isclose as _isclose
@@ -8,6 +8,16 @@ Terminology:
     are related to the work being done. See each function for details on what
     the values will be.
 
+  * harvest - a ``Harvest``, returned by the functions here that set
+    values from an fdict, saying which items completed, failed, timed out
+    or were cancelled. See ``set_when_completed`` for the deadlines and
+    fail-fast harvesting that make the last three possible without raising.
+
+  * fwindow - a ``FutureWindow``, made by ``run_each`` when it is given a ``window``
+    size. It can be harvested in place of an fdict, once, by any of the functions
+    here that take an fdict. Only ``window`` futures are in flight at a time,
+    the next items are submitted as earlier futures complete.
+
 Purpose:
 
    These helpers are meant to be used for "spot" parallelism,
@@ -29,21 +39,90 @@ Archicture:
    functions defined here, but users of this module are free to use it themselves
    directly as needed.
 
+   For CPU bound work, which threads don't speed up, there is also a shared
+   process pool, with the same kind of functions to configure and shut it down.
+   The functions here that submit work take a ``pool`` argument to use it
+   (or any other executor) instead of the thread pool.
+
+   Work that could starve other work of threads, such as polling a slow service,
+   can be given a named thread pool of its own, as a bulkhead: each named pool
+   is sized and shut down with the same functions, given its name, and any
+   function here that takes a ``pool`` can be given the name.
+   The pool used without a name is the ``DEFAULT_POOL``.
+
+   To see whether the thread pool is big enough, or what runs in it is slow,
+   ``enable_metrics`` keeps metrics of its calls, see ``metrics_snapshot``.
+
 """
 
+from bisect import bisect_left as _bisect_left
+from collections import deque as _deque
+from concurrent.futures import Future as _Future
 from concurrent.futures import ThreadPoolExecutor as _ThreadPoolExecutor
 from concurrent.futures import as_completed  # imported for pass-through use.
 from concurrent.futures import wait  # noqa - imported for pass-through use.
+from functools import partial as _partial
+from heapq import heappop as _heappop
+from heapq import heappush as _heappush
+from itertools import chain as _chain
+from itertools import count as _count
+from itertools import islice as _islice
+from queue import Empty as _Empty
+from queue import SimpleQueue as _SimpleQueue
+import threading as _threading
+from time import monotonic as _monotonic
+from time import perf_counter as _perf_counter
+
+DEFAULT_POOL = "default"
+"""The name of the shared thread pool used when no other pool is given."""
 
 _THREADPOOL_EXECUTOR = None
 _MAX_WORKERS = None
 
-
-def set_thread_pool_size(max_workers):
-    """Set the size for the shared ThreadPoolExecutor."""
+_NAMED_POOL_EXECUTORS = {}
+_NAMED_POOL_SIZES = {}
+
+_PROCESSPOOL_EXECUTOR = None
+_MAX_PROCESSES = None
+_PROCESS_PRELOAD = None
+
+_METRICS = None
+
+LATENCY_BUCKETS = (
+    0.001,
+    0.002,
+    0.005,
+    0.01,
+    0.02,
+    0.05,
+    0.1,
+    0.2,
+    0.5,
+    1,
+    2,
+    5,
+    10,
+    20,
+    60,
+)
+"""Upper bounds, in seconds, of the buckets of the metrics' latency histograms."""
+
+
+def set_thread_pool_size(max_workers, pool=DEFAULT_POOL):
+    """Set the size for the shared ThreadPoolExecutor, or the one named ``pool``."""
 
     global _MAX_WORKERS
-    _MAX_WORKERS = max_workers
+    if pool == DEFAULT_POOL:
+        _MAX_WORKERS = max_workers
+    else:
+        _NAMED_POOL_SIZES[pool] = max_workers
+
+
+def _pool_size(pool):
+    """Return the size set for the thread pool named ``pool``, or ``None``."""
+    if pool == DEFAULT_POOL:
+        return _MAX_WORKERS
+    return _NAMED_POOL_SIZES.get(pool)
 
 
 # Implemenation note:
@@ -51,35 +130,558 @@ def set_thread_pool_size(max_workers):
 # If no executor is ever created, the shutdown function doesn't need to do anything.
 # If the only way to get at the executor was via this function,
 # then shutdown might create an executor just to shut it down.
-def get_executor():
+def get_executor(pool=DEFAULT_POOL):
     """
-    Get the shared ThreadPoolExecutor.
+    Get the shared ThreadPoolExecutor, or the one named ``pool``.
 
     Returns:
         ThreadPoolExecutor: the shared thread pool executor.
 
     Raises:
-        TypeError: if ``set_thread_pool_size()`` was not called first.
+        TypeError: if ``set_thread_pool_size()`` was not called first,
+            for the same ``pool``.
 
     """
 
     global _THREADPOOL_EXECUTOR
-    if _THREADPOOL_EXECUTOR is None:
-        if _MAX_WORKERS is None:
-            raise TypeError("set_thread_pool_size() has to be called first.")
-        _THREADPOOL_EXECUTOR = _ThreadPoolExecutor(max_workers=_MAX_WORKERS)
-    return _THREADPOOL_EXECUTOR
+    if pool == DEFAULT_POOL:
+        if _THREADPOOL_EXECUTOR is None:
+            if _MAX_WORKERS is None:
+                raise TypeError("set_thread_pool_size() has to be called first.")
+            _THREADPOOL_EXECUTOR = _MeteredThreadPoolExecutor(
+                pool, max_workers=_MAX_WORKERS
+            )
+        return _THREADPOOL_EXECUTOR
+
+    executor = _NAMED_POOL_EXECUTORS.get(pool)
+    if executor is None:
+        if pool not in _NAMED_POOL_SIZES:
+            message = "set_thread_pool_size(..., pool={!r}) has to be called first."
+            raise TypeError(message.format(pool))
+        executor = _NAMED_POOL_EXECUTORS[pool] = _MeteredThreadPoolExecutor(
+            pool, max_workers=_NAMED_POOL_SIZES[pool], thread_name_prefix=pool
+        )
+    return executor
+
+
+def shutdown_executor(pool=None):
+    """
+    If the ThreadPoolExecutor named ``pool`` was started, shut it down.
+
+    Without a ``pool``, shut down all the thread pools that were started.
+    """
+
+    if pool is None:
+        executors = [_THREADPOOL_EXECUTOR] + list(_NAMED_POOL_EXECUTORS.values())
+    elif pool == DEFAULT_POOL:
+        executors = [_THREADPOOL_EXECUTOR]
+    else:
+        executors = [_NAMED_POOL_EXECUTORS.get(pool)]
+    for executor in executors:
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+def _executor_for(pool):
+    """Return the executor for a ``pool`` argument, see ``run_each``."""
+    if pool is None:
+        return get_executor()
+    if isinstance(pool, str):
+        return get_executor(pool)
+    return pool
+
+
+class _Histogram(object):
+    """Counts of durations, in the ``LATENCY_BUCKETS``, plus one for longer."""
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        """Count a duration of ``seconds``."""
+        self.counts[_bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def quantile(self, fraction):
+        """Return the upper bound of the bucket ``fraction`` of the counts are in."""
+        wanted = fraction * sum(self.counts)
+        seen = 0
+        for upper, count in zip(LATENCY_BUCKETS, self.counts):
+            seen += count
+            if seen >= wanted and seen:
+                return upper
+        return self.max
+
+    def snapshot(self):
+        """Return the histogram as a dict, see ``metrics_snapshot``."""
+        count = sum(self.counts)
+        return {
+            "count": count,
+            "mean": self.total / count if count else 0.0,
+            "max": self.max,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "buckets": list(self.counts),
+        }
+
+
+class _FunctionMetrics(object):
+    """Counts and latencies of the calls of one function in the shared executor."""
+
+    def __init__(self):
+        self.submitted = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.queue_wait = _Histogram()
+        self.run_time = _Histogram()
+
+    def snapshot(self):
+        """Return these metrics as a dict, see ``metrics_snapshot``."""
+        return {
+            "submitted": self.submitted,
+            "queued": self.submitted
+            - self.running
+            - self.completed
+            - self.failed
+            - self.cancelled,
+            "running": self.running,
+            "completed": self.completed,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+            "queue_wait": self.queue_wait.snapshot(),
+            "run_time": self.run_time.snapshot(),
+        }
+
+
+def _function_name(func, args):
+    """Return the name to keep metrics for calls of ``func(*args)`` under."""
+    if func is _call_on_chunk:
+        func = args[0]
+    # For functools.partial, the function it calls.
+    func = getattr(func, "func", func)
+    qualname = getattr(func, "__qualname__", type(func).__qualname__)
+    return "{}.{}".format(getattr(func, "__module__", None), qualname)
+
+
+class _PoolMetrics(object):
+    """The metrics of one thread pool, by function."""
+
+    def __init__(self):
+        self.busy = 0.0
+        self.functions = {}
+
+
+class _Metrics(object):
+    """The metrics of the shared thread pools, see ``enable_metrics``."""
+
+    def __init__(self):
+        self.started_at = _perf_counter()
+        self.pools = {}
+        self._lock = _threading.Lock()
+        self._stop_logging = _threading.Event()
+
+    def submitted(self, pool, func, args):
+        """Count a call being submitted to ``pool``, returning its metrics."""
+        name = _function_name(func, args)
+        with self._lock:
+            pool_metrics = self.pools.get(pool)
+            if pool_metrics is None:
+                pool_metrics = self.pools[pool] = _PoolMetrics()
+            function_metrics = pool_metrics.functions.get(name)
+            if function_metrics is None:
+                function_metrics = pool_metrics.functions[name] = _FunctionMetrics()
+            function_metrics.submitted += 1
+        return pool_metrics, function_metrics
+
+    def cancelled(self, function_metrics, future):
+        """Count ``future`` if it was cancelled before running."""
+        if future.cancelled():
+            with self._lock:
+                function_metrics.cancelled += 1
+
+    def call(self, pool_metrics, function_metrics, submitted_at, func, *args, **kwargs):
+        """Call ``func(*args, **kwargs)``, counting it and timing it."""
+        started_at = _perf_counter()
+        with self._lock:
+            function_metrics.running += 1
+            function_metrics.queue_wait.add(started_at - submitted_at)
+        failed = True
+        try:
+            result = func(*args, **kwargs)
+            failed = False
+            return result
+        finally:
+            run_time = _perf_counter() - started_at
+            with self._lock:
+                function_metrics.running -= 1
+                if failed:
+                    function_metrics.failed += 1
+                else:
+                    function_metrics.completed += 1
+                function_metrics.run_time.add(run_time)
+                pool_metrics.busy += run_time
+
+    def snapshot(self, pool, max_workers):
+        """Return the metrics of ``pool`` as a dict, see ``metrics_snapshot``."""
+        elapsed = _perf_counter() - self.started_at
+        with self._lock:
+            pool_metrics = self.pools.get(pool, _PoolMetrics())
+            functions = {
+                name: function_metrics.snapshot()
+                for name, function_metrics in pool_metrics.functions.items()
+            }
+            busy = pool_metrics.busy
+        totals = {
+            field: sum(function[field] for function in functions.values())
+            for field in (
+                "submitted",
+                "queued",
+                "running",
+                "completed",
+                "failed",
+                "cancelled",
+            )
+        }
+        capacity = elapsed * max_workers if max_workers else 0
+        return dict(
+            totals,
+            pool=pool,
+            max_workers=max_workers,
+            elapsed=elapsed,
+            utilization=busy / capacity if capacity else 0.0,
+            functions=functions,
+        )
+
+    def log_periodically(self, interval, logger):
+        """Log a summary of the metrics every ``interval`` seconds until stopped."""
+        while not self._stop_logging.wait(interval):
+            for pool in sorted(self.pools):
+                logger.info(_metrics_summary(self.snapshot(pool, _pool_size(pool))))
+
+    def stop_logging(self):
+        """Stop ``log_periodically``."""
+        self._stop_logging.set()
+
+
+def _metrics_summary(snapshot):
+    """Return a one line summary of a ``metrics_snapshot``."""
+    summary = (
+        "{pool} pool: {max_workers} workers, {running} running, {queued} queued, "
+        "{completed} completed, {failed} failed, {utilization:.0%} utilization"
+    ).format(**snapshot)
+    busiest = sorted(
+        snapshot["functions"].items(),
+        key=lambda name_and_function: -name_and_function[1]["run_time"]["count"],
+    )
+    for name, function in busiest[:3]:
+        summary += "; {}: wait p95 {}s, run p95 {}s".format(
+            name, function["queue_wait"]["p95"], function["run_time"]["p95"]
+        )
+    return summary
+
+
+class _MeteredThreadPoolExecutor(_ThreadPoolExecutor):
+    """A shared thread pool, which keeps metrics while they are enabled."""
+
+    def __init__(self, pool, *args, **kwargs):
+        """Make the thread pool named ``pool``, see ``ThreadPoolExecutor``."""
+        super().__init__(*args, **kwargs)
+        self.pool = pool
+
+    def submit(self, fn, *args, **kwargs):
+        """Submit ``fn(*args, **kwargs)``, see ``ThreadPoolExecutor.submit``."""
+        metrics = _METRICS
+        if metrics is None:
+            return super().submit(fn, *args, **kwargs)
+        submitted_at = _perf_counter()
+        pool_metrics, function_metrics = metrics.submitted(self.pool, fn, args)
+        future = super().submit(
+            metrics.call,
+            pool_metrics,
+            function_metrics,
+            submitted_at,
+            fn,
+            *args,
+            **kwargs
+        )
+        future.add_done_callback(_partial(metrics.cancelled, function_metrics))
+        return future
+
+
+def enable_metrics(log_interval=None, logger=None):
+    """
+    Start keeping metrics of the work done by the shared thread pools.
+
+    Whether the pool is too small, or what is run in it is slow, shows in
+    the metrics from ``metrics_snapshot``: how long calls wait in the queue,
+    how long they run for, and how busy the workers are.
+    While disabled, which is the default, no metrics are kept,
+    at the cost of one check per submitted call.
+    Enabling them again starts them from scratch.
+
+    Args:
+        log_interval (float): if given, log a summary of the metrics every
+            ``log_interval`` seconds, from a daemon thread, until disabled.
+        logger (logging.Logger): where to log the summary,
+            defaults to the ``jgt_common.futures`` logger.
+
+    """
+
+    global _METRICS
+    disable_metrics()
+    _METRICS = _Metrics()
+    if log_interval is not None:
+        if logger is None:
+            import logging
+
+            logger = logging.getLogger(__name__)
+        _threading.Thread(
+            target=_METRICS.log_periodically,
+            args=(log_interval, logger),
+            name="jgt_common.futures metrics",
+            daemon=True,
+        ).start()
+
+
+def disable_metrics():
+    """Stop keeping metrics of the shared thread pools, and any logging of them."""
+
+    global _METRICS
+    if _METRICS is not None:
+        _METRICS.stop_logging()
+    _METRICS = None
+
+
+def metrics_snapshot(pool=DEFAULT_POOL):
+    """
+    Return the metrics of the thread pool named ``pool`` since ``enable_metrics``.
 
+    Calls are counted under the name of the function submitted,
+    ``module.qualname``, which for a lambda or nested function
+    names where it is defined, and so the call site.
 
-def shutdown_executor():
-    """If a ThreadPoolExecutor was started, shut it down."""
+    Returns:
+        dict: ``None`` if metrics aren't enabled, otherwise a dict with:
+
+        * ``submitted``, ``queued``, ``running``, ``completed``, ``failed`` and
+          ``cancelled``: how many calls there are in each state, in total.
+        * ``pool`` and ``max_workers``: the name and size of the pool.
+        * ``elapsed``: how many seconds the metrics have been kept for.
+        * ``utilization``: the fraction of the workers' time spent running calls,
+          counting calls once they have finished.
+        * ``functions``: a dict from each function name to the same counts for
+          calls of it, plus ``queue_wait`` and ``run_time`` histograms. Each is a
+          dict with the ``count``, ``mean``, ``max`` and approximate
+          ``p50`` and ``p95`` seconds, and the ``buckets`` of counts by
+          ``LATENCY_BUCKETS``, plus one for longer.
+
+    """
+
+    metrics = _METRICS
+    if metrics is None:
+        return None
+    return metrics.snapshot(pool, _pool_size(pool))
+
+
+def set_process_pool_size(max_workers, preload=("jgt_common",)):
+    """
+    Set the size for the shared ProcessPoolExecutor.
+
+    Where the platform supports it, the worker processes are started by
+    a "forkserver" process that has already imported the ``preload`` modules,
+    so each worker starts with them imported, without inheriting whatever
+    state the parent process has built up since it started.
+    """
+
+    global _MAX_PROCESSES, _PROCESS_PRELOAD
+    _MAX_PROCESSES = max_workers
+    _PROCESS_PRELOAD = list(preload)
+
+
+def get_process_executor():
+    """
+    Get the shared ProcessPoolExecutor, for CPU bound work.
 
-    if _THREADPOOL_EXECUTOR is None:
+    Functions, items and results given to it must be picklable,
+    so functions have to be defined at the top level of a module.
+
+    Returns:
+        ProcessPoolExecutor: the shared process pool executor.
+
+    Raises:
+        TypeError: if ``set_process_pool_size()`` was not called first.
+
+    """
+
+    global _PROCESSPOOL_EXECUTOR
+    if _PROCESSPOOL_EXECUTOR is None:
+        if _MAX_PROCESSES is None:
+            raise TypeError("set_process_pool_size() has to be called first.")
+        # Imported here, as they are slow to import and not needed for threads.
+        from concurrent.futures import ProcessPoolExecutor
+        import multiprocessing
+
+        if "forkserver" in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context("forkserver")
+            context.set_forkserver_preload(_PROCESS_PRELOAD)
+        else:
+            context = None
+        _PROCESSPOOL_EXECUTOR = ProcessPoolExecutor(
+            max_workers=_MAX_PROCESSES, mp_context=context
+        )
+    return _PROCESSPOOL_EXECUTOR
+
+
+def shutdown_process_executor():
+    """If a ProcessPoolExecutor was started, shut it down."""
+
+    if _PROCESSPOOL_EXECUTOR is None:
         return
-    _THREADPOOL_EXECUTOR.shutdown(wait=True)
+    _PROCESSPOOL_EXECUTOR.shutdown(wait=True)
+
+
+def _call_on_chunk(func, chunk):
+    """Return ``(True, func(item))``, or ``(False, exception)``, for each item."""
+    outcomes = []
+    for item in chunk:
+        try:
+            outcomes.append((True, func(item)))
+        except Exception as exception:
+            outcomes.append((False, exception))
+    return outcomes
+
+
+class _ChunkItemFuture(_Future):
+    """
+    The future of one item in a chunk submitted by ``_submit_chunked``.
+
+    It is running while its chunk is. The chunk calls ``func`` on all its items,
+    so they can only be cancelled together: cancelling any of them cancels
+    the chunk, and all its items, if it hasn't started.
+    """
 
+    def __init__(self):
+        super().__init__()
+        self._chunk_future = None
+
+    def running(self):
+        """Return whether this item's chunk is running, and it isn't done yet."""
+        return super().running() or (not self.done() and self._chunk_future.running())
+
+    def cancel(self):
+        """Cancel this item's chunk, with all its items, unless it has started."""
+        # Cancelling the chunk cancels its items, see ``_resolve_chunk``.
+        self._chunk_future.cancel()
+        return self.cancelled()
+
+
+def _resolve_chunk(item_futures, chunk_future):
+    """Set each item's future from the outcomes of a ``_call_on_chunk`` future."""
+    if chunk_future.cancelled():
+        outcomes = None
+    else:
+        try:
+            outcomes = chunk_future.result()
+        except BaseException as exception:
+            outcomes = [(False, exception)] * len(item_futures)
+    for index, future in enumerate(item_futures):
+        if outcomes is None:
+            # The chunk can also be cancelled by the executor shutting down.
+            _Future.cancel(future)
+        if not future.set_running_or_notify_cancel():
+            continue
+        succeeded, value = outcomes[index]
+        if succeeded:
+            future.set_result(value)
+        else:
+            future.set_exception(value)
+
+
+def _submit_chunked(executor, func, iterable, chunksize):
+    """
+    Yield ``(future, item)`` for each item, submitting them ``chunksize`` at a time.
 
-def run_each(iterable, func):
+    Each chunk is one call in the executor, which saves pickling ``func``
+    and the overhead of a call for every item with a process pool.
+    The items' futures are pending until their chunk starts,
+    see ``_ChunkItemFuture``.
+    """
+    items = iter(iterable)
+    chunk = list(_islice(items, chunksize))
+    while chunk:
+        item_futures = [_ChunkItemFuture() for _ in chunk]
+        chunk_future = executor.submit(_call_on_chunk, func, chunk)
+        for future in item_futures:
+            future._chunk_future = chunk_future
+        chunk_future.add_done_callback(_partial(_resolve_chunk, item_futures))
+        yield from zip(item_futures, chunk)
+        chunk = list(_islice(items, chunksize))
+
+
+class FutureWindow(object):
+    """
+    Futures for calling a function on items from an iterable, a window at a time.
+
+    At most ``window`` futures are in flight at once. Items are taken from
+    the iterable as futures complete, so it can be a generator of any length,
+    and completed futures aren't kept once they have been harvested.
+
+    Made by ``run_each``, see fwindow in the module documentation.
+    """
+
+    def __init__(self, iterable, func, window, executor):
+        """Start the first ``window`` futures, see ``run_each``."""
+        if window < 1:
+            raise ValueError("window must be at least 1, not {}".format(window))
+        self._items = iter(iterable)
+        self._func = func
+        self._executor = executor
+        self._in_flight = {}
+        self._done = _SimpleQueue()
+        for _ in range(window):
+            if not self._submit_next():
+                break
+
+    def _submit_next(self):
+        """Submit the next item, returning its future, or None if there are none."""
+        for item in self._items:
+            future = self._executor.submit(self._func, item)
+            self._in_flight[future] = item
+            future.add_done_callback(self._done.put)
+            return future
+        return None
+
+    def _has_unsubmitted(self):
+        """Return whether any items are left to submit, keeping them to submit."""
+        for item in self._items:
+            self._items = _chain([item], self._items)
+            return True
+        return False
+
+    def __len__(self):
+        """Return how many futures are in flight."""
+        return len(self._in_flight)
+
+    def as_completed_items(self):
+        """
+        Yield ``(future, item)`` as each future completes.
+
+        Each completed future is replaced by one for the next item, if any.
+        If this generator is not run to the end, no more items are submitted.
+        """
+        while self._in_flight:
+            future = self._done.get()
+            item = self._in_flight.pop(future)
+            self._submit_next()
+            yield future, item
+
+
+def run_each(iterable, func, window=None, pool=None, chunksize=1):
     """
     Call ``func`` on each item in ``iterable``, using a future.
 
@@ -93,24 +695,269 @@ def run_each(iterable, func):
     Args:
         iterable (any): Any iterable.
         func (callable): will be called with one item from iterable.
+        window (int): If given, at most this many futures are in flight at once,
+            and an fwindow is returned instead of an fdict.
+            Use this for large or unbounded iterables.
+        pool (str or Executor): the name of the shared thread pool to use,
+            see ``set_thread_pool_size``, or an executor to use instead,
+            such as ``get_process_executor()`` for CPU bound work.
+        chunksize (int): submit the items in chunks of this many, with ``func``
+            called on each item of a chunk in turn. With a process pool,
+            this saves the overhead of a call to a worker process for every item.
+            There is still a future for each item, but cancelling one cancels
+            its whole chunk. Can't be used with ``window``.
 
     Returns:
         fdict: Mapping from a future to the item from iterable used to make it.
 
     """
 
-    executor = get_executor()
+    executor = _executor_for(pool)
+    if chunksize > 1:
+        if window is not None:
+            raise ValueError("window and chunksize can not be used together")
+        return dict(_submit_chunked(executor, func, iterable, chunksize))
+    if window is not None:
+        return FutureWindow(iterable, func, window, executor)
     return {executor.submit(func, item): item for item in iterable}
 
 
-def set_response_when_completed(fdict):
-    """Set ``.response`` on each value from ``fdict`` to its future's result."""
-
+def _as_completed_items(fdict):
+    """Yield ``(future, item)`` from an fdict or fwindow, as each future completes."""
+    if isinstance(fdict, FutureWindow):
+        yield from fdict.as_completed_items()
+        return
     for future in as_completed(fdict):
-        fdict[future].response = future.result()
+        yield future, fdict[future]
+
+
+class Harvest(object):
+    """
+    What became of each item of an fdict, from harvesting it.
+
+    Attributes:
+        completed (list): the items whose futures returned a result.
+        failed (list): ``(item, exception)`` for each future that raised.
+        timed_out (list): the items whose futures were still running at a deadline.
+            Their calls can't be interrupted, so may still finish later.
+        cancelled (list): the items whose futures were cancelled before they started.
+        not_submitted (bool): whether an fwindow stopped submitting its items
+            before they ran out, at the overall deadline or with fail_fast.
+            The items it never submitted are in none of the lists.
+
+    """
+
+    def __init__(self):
+        self.completed = []
+        self.failed = []
+        self.timed_out = []
+        self.cancelled = []
+        self.not_submitted = False
+
+    @property
+    def ok(self):
+        """Return whether every item completed."""
+        return not (
+            self.failed or self.timed_out or self.cancelled or self.not_submitted
+        )
+
+    def __repr__(self):
+        """Return how many items ended up each way."""
+        return (
+            "<Harvest completed={} failed={} timed_out={} cancelled={}"
+            " not_submitted={}>"
+        ).format(
+            len(self.completed),
+            len(self.failed),
+            len(self.timed_out),
+            len(self.cancelled),
+            self.not_submitted,
+        )
+
+
+def _notify_when_running(future, notify):
+    """
+    Call ``notify(future)`` when ``future`` starts running, or now if it has.
+
+    Executors call the future's ``set_running_or_notify_cancel`` just before
+    they start the call, so it is wrapped, on this future only, to notify.
+    If the future was started before it was wrapped, it may be notified twice.
+    """
+    set_running = future.set_running_or_notify_cancel
+
+    def set_running_or_notify_cancel():
+        del future.set_running_or_notify_cancel
+        running = set_running()
+        if running:
+            notify(future)
+        return running
+
+    future.set_running_or_notify_cancel = set_running_or_notify_cancel
+    if future.running():
+        notify(future)
+
+
+class _TaskTimeouts(object):
+    """When each future of a harvest started running, so when it times out."""
+
+    def __init__(self, task_timeout):
+        self.task_timeout = task_timeout
+        self._starts = _SimpleQueue()
+        # The futures each watched future starts, as a chunk starts all its items.
+        self._watched = {}
+        # ``(expiry, order, future)`` for each future that has started.
+        self._expiries = []
+        self._order = _count()
+
+    def watch(self, future):
+        """Time ``future`` from when it starts running."""
+        if isinstance(future, _ChunkItemFuture):
+            start_future = future._chunk_future
+        else:
+            start_future = future
+        if start_future in self._watched:
+            self._watched[start_future].append(future)
+            return
+        self._watched[start_future] = [future]
+        _notify_when_running(start_future, self._started)
+
+    def _started(self, start_future):
+        """Record when ``start_future`` started, called from the executor."""
+        self._starts.put((_monotonic(), start_future))
+
+    def expired(self, now):
+        """Yield each watched future whose task timeout has passed by ``now``."""
+        while True:
+            try:
+                start, start_future = self._starts.get_nowait()
+            except _Empty:
+                break
+            for future in self._watched.pop(start_future, ()):
+                expiry = start + self.task_timeout
+                _heappush(self._expiries, (expiry, next(self._order), future))
+        while self._expiries and self._expiries[0][0] <= now:
+            yield _heappop(self._expiries)[2]
+
+    def wait_for(self, now):
+        """Return how long from ``now`` until a future could next time out."""
+        if self._expiries:
+            return max(0, self._expiries[0][0] - now)
+        # Any future that starts from now on times out no sooner than this.
+        return self.task_timeout
+
+
+def _deadline_items(fdict, harvest, timeout, task_timeout, fail_fast):
+    """
+    Yield ``(future, item)`` for each future in ``fdict`` that returns a result.
+
+    The other futures are recorded in ``harvest`` instead of raising,
+    see ``set_when_completed`` for the arguments.
+    """
+    if isinstance(fdict, FutureWindow):
+        in_flight, done, submit_next = fdict._in_flight, fdict._done, fdict._submit_next
+    else:
+        in_flight, done, submit_next = dict(fdict), _SimpleQueue(), None
+        for future in in_flight:
+            future.add_done_callback(done.put)
+    deadline = None if timeout is None else _monotonic() + timeout
+    task_timeouts = None
+    if task_timeout is not None:
+        task_timeouts = _TaskTimeouts(task_timeout)
+        for future in in_flight:
+            task_timeouts.watch(future)
+
+    while in_flight:
+        now = _monotonic()
+        wait_for = None
+        if task_timeouts is not None:
+            for future in task_timeouts.expired(now):
+                if future in in_flight and not future.done():
+                    harvest.timed_out.append(in_flight.pop(future))
+                    if submit_next:
+                        submitted = submit_next()
+                        if submitted:
+                            task_timeouts.watch(submitted)
+            wait_for = task_timeouts.wait_for(now)
+        if deadline is not None:
+            if now >= deadline:
+                for future in [future for future in in_flight if not future.done()]:
+                    item = in_flight.pop(future)
+                    if future.cancel():
+                        harvest.cancelled.append(item)
+                    else:
+                        harvest.timed_out.append(item)
+                # Only those that finished in time are left, waiting in the queue.
+                if submit_next:
+                    harvest.not_submitted = fdict._has_unsubmitted()
+                deadline = submit_next = None
+                continue
+            remaining = deadline - now
+            wait_for = remaining if wait_for is None else min(wait_for, remaining)
+        if not in_flight:
+            return
+
+        try:
+            future = done.get(timeout=wait_for)
+        except _Empty:
+            continue
+        if future not in in_flight:
+            # Already recorded as timed out or cancelled, at a deadline.
+            continue
+        item = in_flight.pop(future)
+        if submit_next:
+            submitted = submit_next()
+            if submitted and task_timeouts is not None:
+                task_timeouts.watch(submitted)
+        if future.cancelled():
+            harvest.cancelled.append(item)
+        elif future.exception() is not None:
+            harvest.failed.append((item, future.exception()))
+            if fail_fast:
+                if submit_next:
+                    harvest.not_submitted = fdict._has_unsubmitted()
+                submit_next = None
+                # Those that haven't started get to the queue as cancelled.
+                for pending in in_flight:
+                    pending.cancel()
+        else:
+            harvest.completed.append(item)
+            yield future, item
+
+
+def _harvest_items(fdict, harvest, timeout, task_timeout, fail_fast):
+    """Yield ``(future, item)`` for each result from ``fdict``, see ``Harvest``."""
+    if timeout is None and task_timeout is None and not fail_fast:
+        for future, item in _as_completed_items(fdict):
+            # Raises any exception from the call, as without a harvest.
+            future.result()
+            harvest.completed.append(item)
+            yield future, item
+    else:
+        yield from _deadline_items(fdict, harvest, timeout, task_timeout, fail_fast)
+
+
+def set_response_when_completed(
+    fdict, timeout=None, task_timeout=None, fail_fast=False
+):
+    """
+    Set ``.response`` on each value from ``fdict`` to its future's result.
+
+    See ``set_when_completed`` for ``timeout``, ``task_timeout`` and ``fail_fast``.
+
+    Returns:
+        Harvest: which items completed, failed, timed out, or were cancelled.
 
+    """
+
+    harvest = Harvest()
+    for future, item in _harvest_items(
+        fdict, harvest, timeout, task_timeout, fail_fast
+    ):
+        item.response = future.result()
+    return harvest
 
-def set_response_on_each(iterable, func):
+
+def set_response_on_each(iterable, func, window=None, pool=None, chunksize=1):
     """
     Shorthand for ``set_response_when_completed(run_each(iterable, func))``.
 
@@ -127,28 +974,62 @@ def set_response_on_each(iterable, func):
 
             set_response_on_each(work_list, lambda item: client.do_work(item.input))
 
+    See ``run_each`` for ``window``, ``pool`` and ``chunksize``.
     """
 
-    set_response_when_completed(run_each(iterable, func))
+    set_response_when_completed(
+        run_each(iterable, func, window=window, pool=pool, chunksize=chunksize)
+    )
 
 
-def set_when_completed(field, fdict):
-    """Set the given ``field`` on each value from ``fdict`` to its future's result."""
+def set_when_completed(field, fdict, timeout=None, task_timeout=None, fail_fast=False):
+    """
+    Set the given ``field`` on each value from ``fdict`` to its future's result.
 
-    for future in as_completed(fdict):
-        setattr(fdict[future], field, future.result())
+    By default this waits for every future, and raises the first exception
+    that a future raises. With any of ``timeout``, ``task_timeout`` or ``fail_fast``
+    it raises nothing, instead returning which items failed, timed out
+    or were cancelled, so that one hung or failing call can't hold up the rest.
 
+    Args:
+        field (str): the attribute to set on each item.
+        fdict (dict): an fdict or fwindow, as from ``run_each``.
+        timeout (float): seconds to wait for all the futures.
+            Those not started by then are cancelled, the others time out.
+            With an fwindow, no more of its items are submitted.
+        task_timeout (float): seconds to wait for each future, once it is running.
+        fail_fast (bool): cancel the futures that haven't started
+            once any future raises. Those already running are still waited for.
+            With an fwindow, no more of its items are submitted.
 
-def set_each(iterable, field, func):
+    Returns:
+        Harvest: which items completed, failed, timed out, or were cancelled.
+            The items an fwindow never submitted are not listed,
+            its ``not_submitted`` says whether there were any.
+
+    """
+
+    harvest = Harvest()
+    for future, item in _harvest_items(
+        fdict, harvest, timeout, task_timeout, fail_fast
+    ):
+        setattr(item, field, future.result())
+    return harvest
+
+
+def set_each(iterable, field, func, window=None, pool=None, chunksize=1):
     """
     Set ``field`` on each item from ``iterable`` to the value of ``func(item)``.
 
     Shorthand for ``set_when_completed(field, run_each(iterable, func))``.
 
     A more general form of ``set_response_on_each``.
+    See ``run_each`` for ``window``, ``pool`` and ``chunksize``.
     """
 
-    set_when_completed(field, run_each(iterable, func))
+    set_when_completed(
+        field, run_each(iterable, func, window=window, pool=pool, chunksize=chunksize)
+    )
 
 
 def as_completed_result(futures):
@@ -157,25 +1038,77 @@ def as_completed_result(futures):
 
     Because iterating over a dictionary iterates over it's keys,
     ``futures`` can be an fdict, or a list of futures, ... any other
-    iterable of futures.
+    iterable of futures, or an fwindow.
     """
 
+    if isinstance(futures, FutureWindow):
+        for future, _ in futures.as_completed_items():
+            yield future.result()
+        return
     for future in as_completed(futures):
         yield future.result()
 
 
-def result_from_each(iterable, func):
+def result_from_each(iterable, func, window=None, pool=None, chunksize=1):
     """
     Shorthand for ``as_completed_result(run_each(iterable, func))``.
 
     When you want all the results from calling ``func`` on the items from ``iterable``,
     but you don't need to know which result came from which item or in which order.
+    See ``run_each`` for ``window``, ``pool`` and ``chunksize``.
     """
 
-    yield from as_completed_result(run_each(iterable, func))
+    yield from as_completed_result(
+        run_each(iterable, func, window=window, pool=pool, chunksize=chunksize)
+    )
 
 
-def as_completed_item_result(fdict):
+def result_from_each_in_order(iterable, func, read_ahead=None, pool=None):
+    """
+    Yield the result of calling ``func`` on each item in ``iterable``, in order.
+
+    Like ``result_from_each``, but the results come in the order of the items,
+    each as soon as it and all the results before it are done.
+    Like ``Executor.map``, but items are only taken from ``iterable``
+    ``read_ahead`` at a time, so it can be a generator of any length.
+    If this generator is not run to the end, the remaining futures are cancelled.
+
+    Args:
+        iterable (any): Any iterable.
+        func (callable): will be called with one item from iterable.
+        read_ahead (int): how many futures to keep in flight, or completed
+            and waiting for an earlier one, at once.
+            Defaults to twice the pool size.
+        pool (str or Executor): the thread pool name or executor to use,
+            see ``run_each``.
+
+    Raises:
+        Exception: whatever ``func`` raised, when its result would be yielded.
+    """
+
+    executor = _executor_for(pool)
+    if read_ahead is None:
+        # Both standard executors have this, if not public.
+        read_ahead = 2 * getattr(executor, "_max_workers", _MAX_WORKERS or 1)
+    if read_ahead < 1:
+        raise ValueError("read_ahead must be at least 1, not {}".format(read_ahead))
+    items = iter(iterable)
+    pending = _deque(executor.submit(func, item) for item in _islice(items, read_ahead))
+    try:
+        while pending:
+            result = pending[0].result()
+            pending.popleft()
+            for item in _islice(items, 1):
+                pending.append(executor.submit(func, item))
+            yield result
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def as_completed_item_result(
+    fdict, timeout=None, task_timeout=None, fail_fast=False, harvest=None
+):
     """
     Yield ``(item, future.result())`` from ``fdict``, as each future completes.
 
@@ -184,7 +1117,21 @@ def as_completed_item_result(fdict):
 
         futures = run_each(iterable, func)
         results_map = dict(as_completed_item_result(futures))
+
+    With any of ``timeout``, ``task_timeout`` or ``fail_fast``,
+    see ``set_when_completed``, only the items that completed are yielded,
+    and what became of the others is recorded in ``harvest``, if given::
+
+        harvest = Harvest()
+        results = as_completed_item_result(futures, timeout=60, harvest=harvest)
+        results_map = dict(results)
+        for item, exception in harvest.failed:
+            ...
     """
 
-    for future in as_completed(fdict):
-        yield fdict[future], future.result()
+    if harvest is None:
+        harvest = Harvest()
+    for future, item in _harvest_items(
+        fdict, harvest, timeout, task_timeout, fail_fast
+    ):
+        yield item, future.result()
@@ -6,7 +6,8 @@ import json
 
 import requests
 
-from . import build_classification_rst_string, classify, no_op
+from . import classify, no_op
+from ._classify import _defer_classification_doc
 
 
 MAX_CALL_FAILURES = 5
@@ -445,14 +446,12 @@ def call_with_custom_logger(call, curl_logger):
         curl_logger.done()
 
 
-__doc__ += build_classification_rst_string(
-    globals(),
-    __name__,
-    {
-        "json": "JSON related functions",
-        "logging": "Logging related functions",
-        "response": "Requests' Response object related functions",
-        "status_code": "HTTP Status code functions",
-        "string": "String related functions",
-    },
-)
+_CATEGORY_NAME_MAPPINGS = {
+    "json": "JSON related functions",
+    "logging": "Logging related functions",
+    "response": "Requests' Response object related functions",
+    "status_code": "HTTP Status code functions",
+    "string": "String related functions",
+}
+
+_defer_classification_doc(__name__, _CATEGORY_NAME_MAPPINGS)
@@ -0,0 +1,465 @@
+"""
+Index where UUIDs occur in a collection of log files.
+
+Scanning gigabytes of logs for one UUID is slow,
+so ``update_index`` scans them once and saves where each UUID occurs,
+after which ``UUIDIndex.occurrences`` answers from the saved index.
+Updating the index again only scans what was appended to the files since,
+and merges what it finds into the existing index as it writes the new one.
+
+The index file has the UUIDs as sorted 16 byte keys, for a binary search
+of the memory-mapped file, and for each UUID its occurrences,
+as varint-encoded differences between successive ``(file, offset)`` pairs.
+The occurrences are written before the keys, so both can be streamed out.
+"""
+
+import argparse
+from binascii import unhexlify
+from bisect import bisect_left
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+
+from .uuid_replacer import UUIDLineReplacer, is_compressed
+
+INDEX_MAGIC = b"JGT-UUID-INDEX1\n"
+"""The bytes an index file starts with, followed by its ``HEADER_FORMAT`` header."""
+
+HEADER_FORMAT = "<4Q"
+"""Offsets of the files, keys and postings sections, and the number of keys."""
+
+KEY_SIZE = 16
+
+OFFSET_BITS = 40
+"""
+Occurrences are ``file_number << OFFSET_BITS | offset``, allowing files up to 1 TiB.
+"""
+
+OFFSET_MASK = (1 << OFFSET_BITS) - 1
+
+
+def uuid_key(uuid):
+    """
+    Return the 16 byte index key for the ``str`` or ``bytes`` ``uuid``.
+
+    Raises:
+        ValueError: if ``uuid`` isn't a UUID.
+    """
+    if isinstance(uuid, str):
+        uuid = uuid.encode("ascii", "replace")
+    key = unhexlify(uuid.replace(b"-", b""))
+    if len(key) != KEY_SIZE:
+        raise ValueError("{!r} is not a UUID".format(uuid))
+    return key
+
+
+def _encode_varints(values, output):
+    """Append the unsigned ``values``, LEB128 encoded, to the ``output`` bytearray."""
+    for value in values:
+        while value >= 0x80:
+            output.append(value & 0x7F | 0x80)
+            value >>= 7
+        output.append(value)
+
+
+def _decode_varints(data):
+    """Yield the LEB128 encoded unsigned values in ``data``."""
+    value = shift = 0
+    for byte in data:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            yield value
+            value = shift = 0
+
+
+def _encode_postings(occurrences, output):
+    """Append the sorted ``occurrences`` to ``output`` as varint deltas."""
+    previous = 0
+    deltas = []
+    for occurrence in occurrences:
+        deltas.append(occurrence - previous)
+        previous = occurrence
+    _encode_varints(deltas, output)
+
+
+def _decode_postings(data):
+    """Return the list of occurrences encoded by ``_encode_postings``."""
+    occurrences = []
+    occurrence = 0
+    for delta in _decode_varints(data):
+        occurrence += delta
+        occurrences.append(occurrence)
+    return occurrences
+
+
+class UUIDIndex(object):
+    """
+    A read-only, memory-mapped, UUID index file written by ``update_index``.
+
+    Use as a context manager, or ``close`` it when done.
+    """
+
+    def __init__(self, path):
+        """
+        Open the index file at ``path``.
+
+        Raises:
+            ValueError: if the file isn't a UUID index.
+        """
+        self.path = path
+        self.root = os.path.dirname(os.path.abspath(path))
+        with open(path, "rb") as index_file:
+            self._mapped = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mapped[: len(INDEX_MAGIC)] != INDEX_MAGIC:
+            self.close()
+            raise ValueError("{} is not a UUID index".format(path))
+        (
+            files_start,
+            self._keys_start,
+            self._key_count,
+            self._postings_start,
+        ) = struct.unpack_from(HEADER_FORMAT, self._mapped, len(INDEX_MAGIC))
+
+        self.files = []
+        self.indexed_sizes = []
+        file_count, position = self._varint_at(files_start)
+        for _ in range(file_count):
+            length, position = self._varint_at(position)
+            name = self._mapped[position : position + length].decode("utf-8")
+            size, position = self._varint_at(position + length)
+            self.files.append(name)
+            self.indexed_sizes.append(size)
+        self._offsets_start = self._keys_start + self._key_count * KEY_SIZE
+
+    def _varint_at(self, position):
+        """Return the varint at ``position`` in the file, and the position after it."""
+        value = shift = 0
+        while True:
+            byte = self._mapped[position]
+            position += 1
+            value |= (byte & 0x7F) << shift
+            if not byte & 0x80:
+                return value, position
+            shift += 7
+
+    def __enter__(self):
+        """Return this index, to be closed at the end of the ``with``."""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Close the index."""
+        self.close()
+
+    def close(self):
+        """Unmap the index file."""
+        self._mapped.close()
+
+    def __len__(self):
+        """Return how many distinct UUIDs are in the index."""
+        return self._key_count
+
+    def _key(self, index):
+        """Return the key at ``index`` in the keys section."""
+        start = self._keys_start + index * KEY_SIZE
+        return self._mapped[start : start + KEY_SIZE]
+
+    def _encoded_postings(self, index):
+        """Return the occurrences of the key at ``index``, still encoded."""
+        start, end = struct.unpack_from(
+            "<2Q", self._mapped, self._offsets_start + index * 8
+        )
+        return self._mapped[self._postings_start + start : self._postings_start + end]
+
+    def _postings(self, index):
+        """Return the occurrences of the key at ``index`` in the keys section."""
+        return _decode_postings(self._encoded_postings(index))
+
+    def _find(self, key):
+        """Return where ``key`` is in the keys section, or ``None``."""
+        index = bisect_left(_KeyView(self), key)
+        if index < self._key_count and self._key(index) == key:
+            return index
+        return None
+
+    def occurrences(self, uuid):
+        """
+        Return where ``uuid`` occurs in the indexed files.
+
+        Returns:
+            list: of ``(path, offset)`` tuples, in file and then offset order,
+            where ``offset`` is the byte offset of the UUID in the file at ``path``.
+        """
+        index = self._find(uuid_key(uuid))
+        if index is None:
+            return []
+        return [
+            (
+                os.path.join(self.root, self.files[occurrence >> OFFSET_BITS]),
+                occurrence & OFFSET_MASK,
+            )
+            for occurrence in self._postings(index)
+        ]
+
+    def items(self):
+        """Yield each key in the index, in order, with its occurrences."""
+        for index in range(self._key_count):
+            yield self._key(index), self._postings(index)
+
+
+class _KeyView(object):
+    """The keys of a ``UUIDIndex`` as a sequence, for ``bisect``."""
+
+    def __init__(self, index):
+        self._index = index
+
+    def __len__(self):
+        return len(self._index)
+
+    def __getitem__(self, position):
+        return self._index._key(position)
+
+
+def _index_files(paths, skip):
+    """Yield the files in ``paths``, walking directories in sorted order."""
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+            continue
+        for directory, subdirectories, names in os.walk(path):
+            subdirectories.sort()
+            for name in sorted(names):
+                file_path = os.path.join(directory, name)
+                if os.path.abspath(file_path) not in skip:
+                    yield file_path
+
+
+def _scan(path, start, file_number, postings):
+    """
+    Add the occurrences of UUIDs in the file at ``path`` from ``start`` to ``postings``.
+
+    Only complete lines are scanned, the rest is left for the next update.
+
+    Returns:
+        int: where in the file the scan finished.
+    """
+    with open(path, "rb") as src:
+        size = os.fstat(src.fileno()).st_size
+        if size <= start:
+            return start
+        if size > OFFSET_MASK + 1:
+            raise ValueError(
+                "{} is too large to index, offsets are at most {}".format(
+                    path, OFFSET_MASK
+                )
+            )
+        with mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            end = mapped.rfind(b"\n", start) + 1
+            if end <= start:
+                return start
+            find_uuids = UUIDLineReplacer(binary=True)._find_uuids
+            # Not a loop, so no match is left referring to ``mapped`` when it closes.
+            found = [
+                (match.group(), match.start())
+                for match in find_uuids(mapped, start, end)
+            ]
+    base = file_number << OFFSET_BITS
+    for uuid, offset in found:
+        postings.setdefault(uuid_key(uuid), []).append(base | offset)
+    return end
+
+
+def _merged_postings(old_index, renumbering, postings):
+    """
+    Yield ``(key, encoded_occurrences)``, in key order, for the updated index.
+
+    The keys of ``old_index``, if any, and ``postings`` are merged as they are
+    written, so the old index is never all in memory. Only the occurrences of
+    keys with new ones, or all of them when ``renumbering`` changes any
+    file numbers, are decoded again.
+    """
+    old_count = len(old_index) if old_index else 0
+    unchanged = old_index is not None and all(
+        renumbering.get(number) == number for number in range(len(old_index.files))
+    )
+    new_keys = sorted(postings)
+    new_position = 0
+    for old_position in range(old_count + 1):
+        old_key = old_index._key(old_position) if old_position < old_count else None
+        while new_position < len(new_keys) and (
+            old_key is None or new_keys[new_position] < old_key
+        ):
+            new_key = new_keys[new_position]
+            new_position += 1
+            encoded = bytearray()
+            _encode_postings(sorted(postings[new_key]), encoded)
+            yield new_key, encoded
+        if old_key is None:
+            break
+        new_occurrences = []
+        if new_position < len(new_keys) and new_keys[new_position] == old_key:
+            new_occurrences = postings[old_key]
+            new_position += 1
+        elif unchanged:
+            yield old_key, old_index._encoded_postings(old_position)
+            continue
+        occurrences = [
+            renumbering[occurrence >> OFFSET_BITS] << OFFSET_BITS
+            | occurrence & OFFSET_MASK
+            for occurrence in old_index._postings(old_position)
+            if occurrence >> OFFSET_BITS in renumbering
+        ]
+        occurrences.extend(new_occurrences)
+        if occurrences:
+            encoded = bytearray()
+            _encode_postings(sorted(occurrences), encoded)
+            yield old_key, encoded
+
+
+def _write_index(path, files, indexed_sizes, merged_postings):
+    """Write an index file at ``path``, with the postings from ``_merged_postings``."""
+    files_section = bytearray()
+    _encode_varints([len(files)], files_section)
+    for name, size in zip(files, indexed_sizes):
+        encoded_name = name.encode("utf-8")
+        _encode_varints([len(encoded_name)], files_section)
+        files_section += encoded_name
+        _encode_varints([size], files_section)
+
+    files_start = len(INDEX_MAGIC) + struct.calcsize(HEADER_FORMAT)
+    with open(path, "wb") as index_file, tempfile.TemporaryFile() as keys:
+        with tempfile.TemporaryFile() as offsets:
+            index_file.write(INDEX_MAGIC)
+            # Filled in once the sizes of the sections are known.
+            index_file.write(bytes(struct.calcsize(HEADER_FORMAT)))
+            index_file.write(files_section)
+            postings_start = index_file.tell()
+            key_count = 0
+            end = 0
+            offsets.write(struct.pack("<Q", end))
+            for key, encoded in merged_postings:
+                index_file.write(encoded)
+                end += len(encoded)
+                keys.write(key)
+                offsets.write(struct.pack("<Q", end))
+                key_count += 1
+            keys_start = index_file.tell()
+            for section in (keys, offsets):
+                section.seek(0)
+                shutil.copyfileobj(section, index_file)
+        index_file.seek(len(INDEX_MAGIC))
+        index_file.write(
+            struct.pack(
+                HEADER_FORMAT, files_start, keys_start, key_count, postings_start
+            )
+        )
+
+
+def update_index(index_path, paths):
+    """
+    Create, or bring up to date, the UUID index at ``index_path`` for ``paths``.
+
+    Files already in the index that have grown are only scanned from where
+    the last update left off. Files that have shrunk are scanned again,
+    and files that no longer exist are dropped from the index.
+    Compressed files are skipped, as there are no offsets to give in them.
+
+    Args:
+        index_path (str): the index file, created if it doesn't exist.
+        paths (list): of files, and directories to index all the files in,
+            in addition to those already in the index.
+
+    Returns:
+        int: how many bytes of the files were scanned.
+
+    Raises:
+        ValueError: if a file is too large for its offsets to be indexed.
+    """
+    root = os.path.dirname(os.path.abspath(index_path))
+    temporary_path = index_path + ".tmp"
+    old_index = None
+    files = []
+    indexed_sizes = []
+    if os.path.exists(index_path):
+        old_index = UUIDIndex(index_path)
+        files, indexed_sizes = list(old_index.files), list(old_index.indexed_sizes)
+
+    try:
+        skip = {os.path.abspath(index_path), os.path.abspath(temporary_path)}
+        known = set(files)
+        for path in _index_files(paths, skip):
+            name = os.path.relpath(os.path.abspath(path), root)
+            if name not in known and not is_compressed(path):
+                known.add(name)
+                files.append(name)
+                indexed_sizes.append(0)
+
+        # Renumber the files, leaving out those that are gone or need indexing again.
+        kept = []
+        renumbering = {}
+        for number, (name, size) in enumerate(zip(files, indexed_sizes)):
+            path = os.path.join(root, name)
+            if not os.path.isfile(path):
+                continue
+            if os.path.getsize(path) < size:
+                size = 0
+            else:
+                renumbering[number] = len(kept)
+            kept.append((name, size))
+
+        postings = {}
+        indexed_sizes = []
+        scanned = 0
+        for number, (name, size) in enumerate(kept):
+            end = _scan(os.path.join(root, name), size, number, postings)
+            scanned += end - size
+            indexed_sizes.append(end)
+        _write_index(
+            temporary_path,
+            [name for name, _ in kept],
+            indexed_sizes,
+            _merged_postings(old_index, renumbering, postings),
+        )
+    finally:
+        if old_index:
+            old_index.close()
+    # Replaced all at once, once the old index is no longer needed.
+    os.replace(temporary_path, index_path)
+    return scanned
+
+
+def main():
+    """Command-line interface for indexing and finding UUIDs in log files."""
+    parser = argparse.ArgumentParser(
+        description="Index where UUIDs occur in log files, and look them up. "
+        "With paths, the index is created or brought up to date with them, "
+        "scanning only what was appended to files already indexed. "
+        "With --find, print where each UUID occurs, as path:offset lines."
+    )
+    parser.add_argument("index", help="the index file")
+    parser.add_argument(
+        "paths", nargs="*", metavar="PATH", help="files and directories to index"
+    )
+    parser.add_argument(
+        "--find", "-f", nargs="+", metavar="UUID", help="UUIDs to look up"
+    )
+    args = parser.parse_args()
+    if not (args.paths or args.find):
+        parser.error("give paths to index, or UUIDs to --find, or both")
+
+    if args.find:
+        for uuid in args.find:
+            try:
+                uuid_key(uuid)
+            except ValueError:
+                parser.error("{!r} is not a UUID".format(uuid))
+    if args.paths:
+        update_index(args.index, args.paths)
+    if args.find:
+        with UUIDIndex(args.index) as index:
+            for uuid in args.find:
+                for path, offset in index.occurrences(uuid):
+                    print("{}:{}".format(path, offset))
@@ -1,14 +1,40 @@
 """Replace UUIDs helper."""
+
+from array import array
 import argparse
-from itertools import count
+from bisect import bisect_left
+from collections.abc import MutableMapping
+import hashlib
+import importlib
+import io
+from itertools import count, islice
+import mmap
 import os
 import re
+import select
+import stat
 import sys
+import time
 
-from . import UUID_ISOLATED_RE
-
+from ._basics import HEX_DIGIT_RE, UUID_ISOLATED_RE, re_for_hex_digits
 
 UUID_ISOLATED_MATCHER = re.compile(UUID_ISOLATED_RE)
+UUID_ISOLATED_BYTES_MATCHER = re.compile(UUID_ISOLATED_RE.encode("ascii"))
+
+UUID_PREFILTER_RE = "-{0}-{0}-".format(re_for_hex_digits(4))
+"""
+RE for the middle part of a UUID, that every UUID contains.
+
+Since it starts with a literal ``-`` the regex engine can skip straight to
+each hyphen, which makes searching for it many times faster than for a whole UUID
+and lets text that can't contain a UUID be passed over quickly.
+"""
+
+UUID_PREFILTER_OFFSET = 8
+"""Where a ``UUID_PREFILTER_RE`` match starts within a UUID."""
+
+UUID_PREFILTER_MATCHER = re.compile(UUID_PREFILTER_RE)
+UUID_PREFILTER_BYTES_MATCHER = re.compile(UUID_PREFILTER_RE.encode("ascii"))
 
 UUID_REPLACEMENT_TEMPLATE = ",,UUID-{:03d},,"
 """
@@ -17,6 +43,99 @@ Template used to generate shorter version for a UUID.
 Is expected to hold exaclty one numeric parameter substitution.
 """
 
+UUID_HASH_TEMPLATE = ",,UUID-{},,"
+"""
+Template used by ``HashedUUIDLineReplacer`` to generate shorter version for a UUID.
+
+Is expected to hold exactly one string parameter substitution.
+"""
+
+DEFAULT_HASH_DIGITS = 12
+"""
+Default number of hex digits in ``HashedUUIDLineReplacer`` markers.
+
+48 bits makes a collision unlikely for up to millions of distinct UUIDs.
+"""
+
+UUID_LENGTH = 36
+
+DEFAULT_OUTPUT_SUFFIX = ".uuids"
+"""What ``uuid_replace_files`` adds to input file names to name the output files."""
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+"""Default number of characters (or bytes) ``read_chunks`` reads at a time."""
+
+PARALLEL_RANGE_SIZE = 4 * 1024 * 1024
+"""The most bytes, rounded up to a whole line, each range of a parallel job has."""
+
+COMPRESSION_MAGIC = {
+    b"\x1f\x8b": "gzip",
+    b"BZh": "bz2",
+    b"\xfd7zXZ\x00": "lzma",
+}
+"""Map from the bytes compressed files start with to the module that reads them."""
+
+COMPRESSION_EXTENSIONS = {".gz": "gzip", ".bz2": "bz2", ".xz": "lzma"}
+"""Map from compressed file name extensions to the module that writes them."""
+
+_TIMESTAMP_RE = (
+    r"\b\d{4}-\d\d-\d\d[T ]\d\d:\d\d:\d\d(?:[.,]\d+)?(?:Z\b|[+-]\d\d:?\d\d\b)?"
+)
+
+
+IDENTIFIER_PATTERNS = {
+    "uuid": (UUID_ISOLATED_RE, UUID_REPLACEMENT_TEMPLATE),
+    "hex-id": (r"\b{}{{16,}}\b".format(HEX_DIGIT_RE), ",,HEX-{:03d},,"),
+    "ipv4": (r"\b(?:\d{1,3}\.){3}\d{1,3}\b", ",,IP-{:03d},,"),
+    "timestamp": (_TIMESTAMP_RE, ",,TIME-{:03d},,"),
+}
+"""
+Map from the name of each kind of identifier that ``IdentifierReplacer`` knows
+to its regular expression and default replacement template.
+
+Ticket IDs are known too, from the ``tag_to_url`` plugins,
+see ``ticket_identifier_patterns``.
+"""
+
+TICKET_IDENTIFIERS = "tickets"
+"""The name ``IdentifierReplacer.for_names`` takes for all the kinds of ticket IDs."""
+
+_INLINE_FLAGS = {re.IGNORECASE: "i", re.MULTILINE: "m", re.DOTALL: "s", re.VERBOSE: "x"}
+
+DEFAULT_POLL_INTERVAL = 0.25
+"""Seconds ``follow_lines`` waits before checking a file for more lines again."""
+
+
+def _isolated(pattern):
+    """Return the ``tag_to_url`` style anchored ``pattern`` to match inside a line."""
+    regex = pattern.pattern.replace("^", "").replace("$", "")
+    flags = "".join(
+        letter for flag, letter in _INLINE_FLAGS.items() if pattern.flags & flag
+    )
+    if flags:
+        regex = "(?{}:{})".format(flags, regex)
+    return r"\b{}\b".format(regex)
+
+
+def ticket_identifier_patterns():
+    """
+    Return the kinds of ticket IDs, like ``IDENTIFIER_PATTERNS``.
+
+    There is one for each ticketing system of the ``tag_to_url`` plugins,
+    named in lower case, so JIRA tickets are ``jira``, replaced by ``,,JIRA-001,,``.
+    The plugins are only loaded when this is first called.
+    """
+    # Imported here, as loading the plugins is slow, see ``_tickets._ticket_info``.
+    from ._tickets import _ticket_info
+
+    return {
+        system.lower(): (
+            _isolated(info["pattern"]),
+            ",,{}-{{:03d}},,".format(system.upper()),
+        )
+        for system, info in sorted(_ticket_info().items())
+    }
+
 
 class UUIDLineReplacer(object):
     """
@@ -26,10 +145,11 @@ class UUIDLineReplacer(object):
     and will return the substituted line.
 
     When you are all done, if you want, you can call ``uuid_mappings``
-    to get a list of the substitutions that were made.
+    to get a list of the substitutions that were made,
+    or have them written to a file as they are made with ``write_glossary_to``.
     """
 
-    def __init__(self, template=None):
+    def __init__(self, template=None, binary=False, uuid_map=None):
         """
         Create a new UUID replacer.
 
@@ -37,52 +157,1425 @@ class UUIDLineReplacer(object):
             template (str): A ``.format`` template to use for generating
                 the UUID replacement values. It is expected to have a placeholder
                 to format one numeric parameter.
+            binary (bool): Process ``bytes`` lines instead of ``str`` lines.
+                The lines are never decoded, so word boundaries around UUIDs
+                are determined by ASCII rules only. ``uuid_map`` and
+                ``uuid_mappings`` will then hold ``bytes`` too.
+            uuid_map (dict): The mapping to keep the replacements in,
+                such as a ``UUIDMappingStore``, defaults to a new ``dict``.
+                Numbering continues after any replacements already in it.
         """
 
-        self.count = count(start=1)
-        self.uuid_map = {}
+        self.uuid_map = {} if uuid_map is None else uuid_map
+        self.count = count(start=len(self.uuid_map) + 1)
         self.template = template or UUID_REPLACEMENT_TEMPLATE
+        self.binary = binary
+        if binary:
+            self._matcher = UUID_ISOLATED_BYTES_MATCHER
+            self._prefilter = UUID_PREFILTER_BYTES_MATCHER
+            self._empty = b""
+        else:
+            self._matcher = UUID_ISOLATED_MATCHER
+            self._prefilter = UUID_PREFILTER_MATCHER
+            self._empty = ""
+        self._mapping_template = b"# %s -> %s\n" if binary else "# %s -> %s\n"
+        self.glossary = None
 
-    def _add_uuid(self, uuid):
-        if uuid in self.uuid_map:
-            return
-        self.uuid_map[uuid] = self.template.format(next(self.count))
+    def _add(self, uuid, replacement):
+        """Record a new replacement."""
+        self.uuid_map[uuid] = replacement
+        if self.glossary is not None:
+            self.glossary.write(self._mapping_template % (replacement, uuid))
+
+    def _marker_for(self, uuid):
+        """Return the marker for a UUID, numbering it if it is new."""
+        try:
+            return self.uuid_map[uuid]
+        except KeyError:
+            replacement = self.template.format(next(self.count))
+            if self.binary:
+                replacement = replacement.encode()
+            self._add(uuid, replacement)
+            return replacement
+
+    def _find_uuids(self, data, start=0, end=None):
+        """
+        Yield the matches of the isolated UUIDs in ``data``, from ``start`` on.
+
+        This finds the same UUIDs as ``UUID_ISOLATED_MATCHER.finditer`` would,
+        but only tries to match a whole UUID where ``UUID_PREFILTER_RE`` is found.
+        If ``end`` is given, ``data`` is treated as if it ended there.
+        """
+        if end is None:
+            end = len(data)
+        search = self._prefilter.search
+        match_uuid = self._matcher.match
+        candidate = search(data, start, end)
+        while candidate:
+            uuid_start = candidate.start() - UUID_PREFILTER_OFFSET
+            match = match_uuid(data, uuid_start, end) if uuid_start >= start else None
+            if match:
+                yield match
+                candidate = search(data, match.end(), end)
+            else:
+                candidate = search(data, candidate.start() + 1, end)
 
     def __call__(self, line):
-        """Replace all found UUIDs with markers."""
-        uuids_found = set(UUID_ISOLATED_MATCHER.findall(line))
-        for uuid in uuids_found:
-            self._add_uuid(uuid)
-        for uuid in uuids_found:
-            line = line.replace(uuid, self.uuid_map[uuid])
+        """
+        Replace all found UUIDs with markers.
+
+        The line is scanned once, numbering new UUIDs in the order they are found
+        and substituting them as it goes.
+        A UUID found isolated is also replaced where it appears as part of
+        a larger "word" elsewhere in the same line, those are rare enough
+        that checking for them afterwards is cheaper than matching them up front.
+        """
+        candidate = self._prefilter.search(line)
+        if not candidate:
+            return line
+
+        # The same loop as ``_find_uuids``, inlined as this is the hot path.
+        search = self._prefilter.search
+        match_uuid = self._matcher.match
+        found = []
+        pieces = []
+        position = 0
+        while candidate:
+            uuid_start = candidate.start() - UUID_PREFILTER_OFFSET
+            match = match_uuid(line, uuid_start) if uuid_start >= 0 else None
+            if match:
+                uuid = match.group()
+                found.append(uuid)
+                pieces.append(line[position:uuid_start])
+                pieces.append(self._marker_for(uuid))
+                position = match.end()
+                candidate = search(line, position)
+            else:
+                candidate = search(line, candidate.start() + 1)
+        if not found:
+            return line
+        pieces.append(line[position:])
+        line = self._empty.join(pieces)
+        if self._prefilter.search(line):
+            for uuid in set(found):
+                line = line.replace(uuid, self.uuid_map[uuid])
         return line
 
+    def _replace_up_to(self, data, start, limit):
+        """
+        Replace UUIDs in ``data`` that begin from ``start`` up to ``limit``.
+
+        Returns the replaced text and the index in ``data`` that it ends at,
+        which is ``limit`` unless the last UUID replaced runs past it.
+        """
+        pieces = []
+        position = start
+        for match in self._find_uuids(data, start):
+            if match.start() >= limit:
+                break
+            pieces.append(data[position : match.start()])
+            pieces.append(self._marker_for(match.group()))
+            position = match.end()
+        end = max(position, limit)
+        pieces.append(data[position:end])
+        return self._empty.join(pieces), end
+
+    def replace_chunks(self, chunks):
+        """
+        Replace UUIDs in a stream of arbitrarily split text, yielding the results.
+
+        This is for input that isn't usefully split into lines,
+        such as logs with huge JSON payloads on a single line.
+        Each chunk of output is roughly the size of the chunk it came from,
+        and at most a UUID's worth of input is held back between chunks,
+        so UUIDs that straddle chunk boundaries are still found.
+
+        Unlike calling the replacer on each line, only isolated UUIDs are replaced,
+        other occurrences of them as part of a larger "word" are left alone.
+        """
+        data = self._empty
+        start = 0
+        for chunk in chunks:
+            data += chunk
+            # Any UUID beginning before this is complete, with the character
+            # after it available for the word boundary check.
+            limit = len(data) - UUID_LENGTH - 1
+            if limit <= start:
+                continue
+            replaced, end = self._replace_up_to(data, start, limit)
+            yield replaced
+            # Hold on to the last character replaced for the next word boundary check.
+            data = data[end - 1 :]
+            start = 1
+        if len(data) > start:
+            yield self._replace_up_to(data, start, len(data))[0]
+
+    def iter_uuid_mappings(self):
+        """Yield a line for each of the substitutions done, in numbering order."""
+        mapping_template = self._mapping_template
+        for uuid, replacement in self.uuid_map.items():
+            yield mapping_template % (replacement, uuid)
+
     def uuid_mappings(self):
-        """Return a list of lines of all the substitutions done."""
-        return [
-            "# {} -> {}\n".format(replacement, uuid)
-            for uuid, replacement in sorted(
-                self.uuid_map.items(), key=lambda item: item[1]
+        """Return a list of lines of all the substitutions done, in numbering order."""
+        return list(self.iter_uuid_mappings())
+
+    def write_glossary_to(self, glossary):
+        """
+        Write the glossary so far to ``glossary``, then each new substitution as made.
+
+        Args:
+            glossary (file): a file opened for write, in binary mode for
+                a ``binary`` replacer.
+        """
+        glossary.writelines(self.iter_uuid_mappings())
+        self.glossary = glossary
+
+
+class UUIDMappingStore(MutableMapping):
+    """
+    Compact, persistent ``uuid_map`` for a ``UUIDLineReplacer``.
+
+    Each UUID is kept as its 128 bit integer value, with its number,
+    and the replacement is formatted from the template only when it is looked up.
+    Most of them are kept in arrays sorted by UUID, about 20 bytes per UUID
+    rather than the nearly 200 of a ``dict`` of strings to strings.
+    New UUIDs go into a ``dict`` first, which is merged into the arrays
+    whenever it grows past a fraction of their size.
+    Looking up a UUID in the arrays is several times slower than in a ``dict``,
+    so the replacements of the most recently used UUIDs are cached,
+    as logs tend to mention the same UUIDs close together.
+
+    Only lower case UUIDs, as most are, are kept as integers. Any others are kept
+    as they are spelled, so that, as in a ``dict``, each spelling of a UUID
+    has its own replacement, and is given back as it was spelled.
+    Replacements have to be added in numbering order, as ``UUIDLineReplacer`` does.
+
+    The store can be saved to a file with ``save`` and read back with ``load``,
+    so that a later run can continue the numbering where an earlier one stopped.
+    """
+
+    FILE_MAGIC = b"JGT-UUID-MAP-1\n"
+    """
+    The start of a saved store file.
+
+    It is followed by the number of UUIDs, then the arrays, then the number
+    of UUIDs that are not lower case, each with its number and spelling,
+    all little-endian.
+    """
+
+    MIN_MERGE_SIZE = 4096
+    """How many new UUIDs there have to be before they are merged into the arrays."""
+
+    CACHE_SIZE = 65536
+    """How many replacements to cache before starting the cache over."""
+
+    def __init__(self, template=None, binary=False):
+        """
+        Create a new, empty, store.
+
+        Args:
+            template (str): The replacement template, see ``UUIDLineReplacer``.
+            binary (bool): UUIDs and replacements are ``bytes``,
+                see ``UUIDLineReplacer``.
+        """
+
+        self.template = template or UUID_REPLACEMENT_TEMPLATE
+        self.binary = binary
+        # The high and low 64 bits of each UUID, sorted, and the matching numbers.
+        self._highs = array("Q")
+        self._lows = array("Q")
+        self._numbers = array("I")
+        # New UUIDs, not merged into the arrays yet.
+        self._recent = {}
+        # The number of each UUID that isn't in lower case, by its spelling.
+        self._spelled = {}
+        self._cache = {}
+        # The last UUID looked up and not found, which is usually added next.
+        self._missing = (None, None)
+
+    @staticmethod
+    def _key(uuid):
+        """Return the integer value of a lower case UUID string, or the string."""
+        hyphen, empty = (b"-", b"") if isinstance(uuid, bytes) else ("-", "")
+        try:
+            key = int(uuid.replace(hyphen, empty), 16)
+        except (AttributeError, TypeError, ValueError):
+            raise KeyError(uuid)
+        if uuid.lower() == uuid:
+            return key
+        # Saved as they are spelled, so they have to be whole UUIDs.
+        if len(uuid) != UUID_LENGTH:
+            raise KeyError(uuid)
+        return uuid
+
+    def _uuid(self, key):
+        """Return the UUID string for a key from ``_key``."""
+        if not isinstance(key, int):
+            return key
+        digits = "%032x" % key
+        uuid = "-".join(
+            [digits[:8], digits[8:12], digits[12:16], digits[16:20], digits[20:]]
+        )
+        return uuid.encode() if self.binary else uuid
+
+    def _index(self, key):
+        """Return where ``key`` is, or would go, in the arrays."""
+        high = key >> 64
+        low = key & 0xFFFFFFFFFFFFFFFF
+        index = bisect_left(self._highs, high)
+        while (
+            index < len(self._highs)
+            and self._highs[index] == high
+            and self._lows[index] < low
+        ):
+            index += 1
+        return index
+
+    def _number(self, key):
+        """Return the number of ``key``, or ``None`` if it is not in the store."""
+        if not isinstance(key, int):
+            return self._spelled.get(key)
+        number = self._recent.get(key)
+        if number is not None or not self._highs:
+            return number
+        index = self._index(key)
+        if index < len(self._highs) and (
+            self._highs[index] << 64 | self._lows[index] == key
+        ):
+            return self._numbers[index]
+        return None
+
+    def _merge(self):
+        """Merge the new UUIDs into the arrays."""
+        highs, lows, numbers = array("Q"), array("Q"), array("I")
+        previous = 0
+        for key in sorted(self._recent):
+            index = self._index(key)
+            highs.extend(self._highs[previous:index])
+            lows.extend(self._lows[previous:index])
+            numbers.extend(self._numbers[previous:index])
+            highs.append(key >> 64)
+            lows.append(key & 0xFFFFFFFFFFFFFFFF)
+            numbers.append(self._recent[key])
+            previous = index
+        highs.extend(self._highs[previous:])
+        lows.extend(self._lows[previous:])
+        numbers.extend(self._numbers[previous:])
+        self._highs, self._lows, self._numbers = highs, lows, numbers
+        self._recent = {}
+
+    def replacement_for(self, number):
+        """Return the replacement for the UUID with ``number``."""
+        replacement = self.template.format(number)
+        return replacement.encode() if self.binary else replacement
+
+    def _cache_replacement(self, uuid, replacement):
+        """Remember the replacement for ``uuid``."""
+        if len(self._cache) >= self.CACHE_SIZE:
+            self._cache = {}
+        self._cache[uuid] = replacement
+
+    def __getitem__(self, uuid):
+        """Return the replacement for ``uuid``."""
+        try:
+            return self._cache[uuid]
+        except KeyError:
+            pass
+        key = self._key(uuid)
+        number = self._number(key)
+        if number is None:
+            self._missing = (uuid, key)
+            raise KeyError(uuid)
+        replacement = self.replacement_for(number)
+        self._cache_replacement(uuid, replacement)
+        return replacement
+
+    def __setitem__(self, uuid, replacement):
+        """Add ``uuid`` with the next replacement, which ``replacement`` must be."""
+        missing_uuid, key = self._missing
+        if uuid is missing_uuid:
+            number = None
+        else:
+            key = self._key(uuid)
+            number = self._number(key)
+        is_new = number is None
+        if is_new:
+            number = len(self) + 1
+        expected = self.replacement_for(number)
+        if replacement != expected:
+            raise ValueError("{} has to be replaced by {}".format(uuid, expected))
+        if not is_new:
+            return
+        self._missing = (None, None)
+        self._cache_replacement(uuid, replacement)
+        if not isinstance(key, int):
+            self._spelled[key] = number
+            return
+        self._recent[key] = number
+        if len(self._recent) > max(self.MIN_MERGE_SIZE, len(self._highs) // 4):
+            self._merge()
+
+    def __delitem__(self, uuid):
+        """Refuse to remove a UUID, that would leave a gap in the numbering."""
+        raise TypeError("UUIDs can not be removed from a UUIDMappingStore")
+
+    def _keys_in_number_order(self):
+        """Return the keys of the UUIDs, see ``_key``, in numbering order."""
+        keys = [None] * len(self)
+        for high, low, number in zip(self._highs, self._lows, self._numbers):
+            keys[number - 1] = high << 64 | low
+        for key, number in self._recent.items():
+            keys[number - 1] = key
+        for key, number in self._spelled.items():
+            keys[number - 1] = key
+        return keys
+
+    def __iter__(self):
+        """Yield the UUIDs in numbering order."""
+        return map(self._uuid, self._keys_in_number_order())
+
+    def __len__(self):
+        """Return the number of UUIDs in the store."""
+        return len(self._highs) + len(self._recent) + len(self._spelled)
+
+    def items(self):
+        """Yield ``(uuid, replacement)`` pairs in numbering order."""
+        return (
+            (self._uuid(key), self.replacement_for(number))
+            for number, key in enumerate(self._keys_in_number_order(), start=1)
+        )
+
+    def save(self, path):
+        """
+        Save the UUIDs to the file at ``path``.
+
+        The file is replaced all at once, so an interrupted save leaves
+        any previous version in place.
+        """
+        self._merge()
+        temporary_path = path + ".tmp"
+        with open(temporary_path, "wb") as store_file:
+            store_file.write(self.FILE_MAGIC)
+            store_file.write(len(self._highs).to_bytes(8, "little"))
+            for values in (self._highs, self._lows, self._numbers):
+                if sys.byteorder == "big":
+                    values = array(values.typecode, values)
+                    values.byteswap()
+                values.tofile(store_file)
+            store_file.write(len(self._spelled).to_bytes(8, "little"))
+            for uuid, number in self._spelled.items():
+                if not isinstance(uuid, bytes):
+                    uuid = uuid.encode("ascii")
+                store_file.write(number.to_bytes(4, "little"))
+                store_file.write(uuid)
+        os.replace(temporary_path, path)
+
+    @classmethod
+    def load(cls, path, template=None, binary=False):
+        """
+        Return a store with the UUIDs saved in the file at ``path``.
+
+        Args:
+            path (str): the file written by ``save``.
+            template (str): see ``UUIDMappingStore``.
+            binary (bool): see ``UUIDMappingStore``.
+
+        Raises:
+            ValueError: if the file wasn't written by ``save``.
+        """
+        store = cls(template=template, binary=binary)
+        with open(path, "rb") as store_file:
+            if store_file.read(len(cls.FILE_MAGIC)) != cls.FILE_MAGIC:
+                raise ValueError("{} is not a saved UUIDMappingStore".format(path))
+            size = int.from_bytes(store_file.read(8), "little")
+            try:
+                for values in (store._highs, store._lows, store._numbers):
+                    values.fromfile(store_file, size)
+                    if sys.byteorder == "big":
+                        values.byteswap()
+                spelled = store_file.read(8)
+                if len(spelled) < 8:
+                    raise EOFError
+                for _ in range(int.from_bytes(spelled, "little")):
+                    number = store_file.read(4)
+                    uuid = store_file.read(UUID_LENGTH)
+                    if len(uuid) < UUID_LENGTH:
+                        raise EOFError
+                    if not binary:
+                        uuid = uuid.decode("ascii")
+                    store._spelled[uuid] = int.from_bytes(number, "little")
+            except EOFError:
+                raise ValueError("{} is truncated".format(path))
+        return store
+
+
+class UUIDHashCollisionException(ValueError):
+    """
+    Exception for two UUIDs whose hash-derived markers are the same.
+
+    Args:
+        marker (str): the marker that both UUIDs hash to.
+        uuids (tuple): the UUIDs that collided.
+
+    Atributes:
+        marker (str): the marker that both UUIDs hash to.
+        uuids (tuple): the UUIDs that collided.
+
+    """
+
+    def __init__(self, marker, uuids):
+        self.marker = marker
+        self.uuids = uuids
+        super(UUIDHashCollisionException, self).__init__(
+            "{} and {} both map to {}, use more digits or a different key".format(
+                uuids[0], uuids[1], marker
             )
-        ]
+        )
+
+
+class HashedUUIDLineReplacer(UUIDLineReplacer):
+    """
+    Replace UUIDs with markers derived from a keyed hash of each UUID.
+
+    Since a UUID always gets the same marker, independent of what came before it,
+    separate replacers (on separate machines even) can process pieces of a log
+    without sharing any state, and their glossaries can be combined afterwards
+    with ``merge_glossaries``.
+    The same ``key`` and ``digits`` have to be used everywhere for that to work.
+    """
+
+    def __init__(self, template=None, binary=False, key=b"", digits=None):
+        """
+        Create a new hashing UUID replacer.
+
+        Args:
+            template (str): A ``.format`` template to use for generating
+                the UUID replacement values. It is expected to have a placeholder
+                to format one string parameter, the hex digits of the hash.
+            binary (bool): Process ``bytes`` lines, see ``UUIDLineReplacer``.
+            key (bytes, str): The key for the hash (at most 64 bytes),
+                so that markers can't be traced back to the UUIDs without it.
+            digits (int): The number of hex digits of the hash to use in markers,
+                defaults to ``DEFAULT_HASH_DIGITS``.
+
+        """
+
+        super(HashedUUIDLineReplacer, self).__init__(
+            template=template or UUID_HASH_TEMPLATE, binary=binary
+        )
+        self.key = key.encode() if isinstance(key, str) else key
+        self.digits = digits or DEFAULT_HASH_DIGITS
+        self._uuids_by_marker = {}
+
+    def _marker_for(self, uuid):
+        """Return the marker for a UUID, checking new ones for collisions."""
+        try:
+            return self.uuid_map[uuid]
+        except KeyError:
+            pass
+        hashed = hashlib.blake2b(
+            uuid if self.binary else uuid.encode(),
+            digest_size=(self.digits + 1) // 2,
+            key=self.key,
+        )
+        replacement = self.template.format(hashed.hexdigest()[: self.digits])
+        if self.binary:
+            replacement = replacement.encode()
+        self.update({uuid: replacement})
+        return replacement
+
+    def update(self, uuid_map):
+        """
+        Add the replacements from another replacer's ``uuid_map``.
+
+        Raises:
+            UUIDHashCollisionException: if a marker would stand for two UUIDs.
+        """
+        for uuid, replacement in uuid_map.items():
+            known_uuid = self._uuids_by_marker.setdefault(replacement, uuid)
+            if known_uuid != uuid:
+                raise UUIDHashCollisionException(replacement, (known_uuid, uuid))
+            if uuid not in self.uuid_map:
+                self._add(uuid, replacement)
+
+    def _empty_copy(self):
+        """Return a replacer with the same settings and no replacements yet."""
+        return HashedUUIDLineReplacer(
+            template=self.template, binary=self.binary, key=self.key, digits=self.digits
+        )
+
+
+class IdentifierReplacer(object):
+    """
+    Track and replace several kinds of identifiers, such as UUIDs and IPs, in one pass.
+
+    Each kind of identifier is numbered separately, with its own template,
+    and has its own section in the glossary.
+    Instances are called with a line to process, like ``UUIDLineReplacer``,
+    and can be used in its place by ``uuid_replace``, ``uuid_replace_files``
+    (without ``jobs``) and ``uuid_replace_follow``.
+
+    Unlike ``UUIDLineReplacer``, only identifiers matched by their patterns
+    are replaced, not other occurrences of them as part of a larger "word".
+    """
+
+    def __init__(self, patterns, binary=False):
+        """
+        Create a new identifier replacer.
+
+        Args:
+            patterns (list): of ``(name, regular_expression, template)`` tuples,
+                one for each kind of identifier, see ``IDENTIFIER_PATTERNS``.
+                Where more than one pattern matches at the same place,
+                the first one given wins. The regular expressions must not have
+                named groups. The templates are as for ``UUIDLineReplacer``.
+            binary (bool): Process ``bytes`` lines instead of ``str`` lines,
+                see ``UUIDLineReplacer``.
+        """
+
+        self.binary = binary
+        self.replacers = {}
+        self._replacers_by_group = {}
+        patterns = list(patterns)
+        # Checking a word boundary shared by all the patterns once, before trying
+        # each of them, saves trying them all at every position inside a word.
+        boundary = r"\b"
+        if not all(pattern.startswith(boundary) for _, pattern, _ in patterns):
+            boundary = ""
+        alternatives = []
+        for index, (name, pattern, template) in enumerate(patterns):
+            replacer = UUIDLineReplacer(template=template, binary=binary)
+            self.replacers[name] = replacer
+            group = "_{}".format(index)
+            self._replacers_by_group[group] = replacer
+            pattern = pattern[len(boundary) :]
+            alternatives.append("(?P<{}>{})".format(group, pattern))
+        pattern = "{}(?:{})".format(boundary, "|".join(alternatives))
+        self._matcher = re.compile(pattern.encode("ascii") if binary else pattern)
+        self._section_template = b"## %s\n" if binary else "## %s\n"
+
+    @classmethod
+    def for_names(cls, names, binary=False, templates=None):
+        """
+        Return a replacer for these kinds of identifiers from ``IDENTIFIER_PATTERNS``.
+
+        Args:
+            names (list): of names from ``IDENTIFIER_PATTERNS``,
+                or ``ticket_identifier_patterns``, or ``TICKET_IDENTIFIERS``
+                for all the kinds of ticket IDs.
+            binary (bool): see ``IdentifierReplacer``.
+            templates (dict): of templates to use instead of the defaults,
+                by name.
+
+        Raises:
+            ValueError: if a name is not a known kind of identifier.
+        """
+        templates = templates or {}
+        known_patterns = IDENTIFIER_PATTERNS
+        if any(name not in known_patterns for name in names):
+            tickets = ticket_identifier_patterns()
+            known_patterns = dict(IDENTIFIER_PATTERNS, **tickets)
+            names = [
+                ticket_name
+                for name in names
+                for ticket_name in (tickets if name == TICKET_IDENTIFIERS else [name])
+            ]
+        patterns = []
+        for name in names:
+            if name not in known_patterns:
+                raise ValueError("{!r} is not a known kind of identifier".format(name))
+            pattern, template = known_patterns[name]
+            patterns.append((name, pattern, templates.get(name) or template))
+        return cls(patterns, binary=binary)
+
+    def _marker_for(self, match):
+        """Return the marker for a matched identifier, numbering it if it is new."""
+        return self._replacers_by_group[match.lastgroup]._marker_for(match.group())
+
+    def __call__(self, line):
+        """Replace all found identifiers with markers."""
+        return self._matcher.sub(self._marker_for, line)
+
+    def iter_uuid_mappings(self):
+        """Yield the glossary lines, in a section for each kind of identifier."""
+        for name, replacer in self.replacers.items():
+            if replacer.uuid_map:
+                yield self._section_template % (name.encode() if self.binary else name)
+                yield from replacer.iter_uuid_mappings()
+
+    def uuid_mappings(self):
+        """Return a list of the glossary lines, see ``iter_uuid_mappings``."""
+        return list(self.iter_uuid_mappings())
+
+    def write_glossary_to(self, glossary):
+        """
+        Write the glossary so far to ``glossary``, then each new substitution as made.
+
+        The substitutions made from then on are written in the order they are made,
+        not in sections.
+        """
+        glossary.writelines(self.iter_uuid_mappings())
+        for replacer in self.replacers.values():
+            replacer.glossary = glossary
+
+
+def read_glossary(lines):
+    """
+    Yield the ``(replacement, uuid)`` pairs of a glossary.
+
+    Args:
+        lines (iterable): lines as written by ``UUIDLineReplacer.uuid_mappings``,
+            ``str`` or ``bytes``, anything else, such as blank lines, is skipped.
+    """
+    for line in lines:
+        if isinstance(line, bytes):
+            prefix, arrow, line_ends = b"# ", b" -> ", b"\r\n"
+        else:
+            prefix, arrow, line_ends = "# ", " -> ", "\r\n"
+        if not line.startswith(prefix) or arrow not in line:
+            continue
+        replacement, uuid = line[2:].rstrip(line_ends).rsplit(arrow, 1)
+        yield replacement, uuid
+
+
+def merge_glossaries(*glossaries):
+    """
+    Merge glossaries from ``HashedUUIDLineReplacer`` runs into one glossary.
+
+    Args:
+        glossaries (iterable): of glossary lines, see ``read_glossary``.
+
+    Returns:
+        list: of the merged glossary lines.
+
+    Raises:
+        UUIDHashCollisionException: if a marker stands for different UUIDs.
+    """
+    uuids_by_marker = {}
+    for glossary in glossaries:
+        for replacement, uuid in read_glossary(glossary):
+            known_uuid = uuids_by_marker.setdefault(replacement, uuid)
+            if known_uuid != uuid:
+                raise UUIDHashCollisionException(replacement, (known_uuid, uuid))
+    return ["# %s -> %s\n" % item for item in sorted(uuids_by_marker.items())]
+
+
+def _is_regular_file(src):
+    """Is the file object ``src`` a regular file, as opposed to a pipe, tty, etc."""
+    try:
+        return stat.S_ISREG(os.fstat(src.fileno()).st_mode)
+    except (AttributeError, OSError):
+        # io.UnsupportedOperation is an OSError
+        return False
+
+
+def _compression_module_for(magic):
+    """Return the module for reading data that starts with ``magic``, if any."""
+    for prefix, module_name in COMPRESSION_MAGIC.items():
+        if magic.startswith(prefix):
+            return importlib.import_module(module_name)
+    return None
+
+
+def is_compressed(path):
+    """Is the file at ``path`` compressed in a way ``open_input`` can read."""
+    with open(path, "rb") as src:
+        return _compression_module_for(src.read(8)) is not None
+
+
+def open_input(path, binary=False, encoding=None):
+    """
+    Open ``path`` for reading, decompressing it if it is compressed.
+
+    gzip, bzip2 and xz compressed files are recognized by how they start,
+    whatever they are named, so this works for standard input too.
+    Compressed files are read through a buffer of ``DEFAULT_CHUNK_SIZE``.
+
+    Args:
+        path (str): the file to open, ``-`` for standard input.
+        binary (bool): open in binary mode, see ``UUIDLineReplacer``.
+        encoding (str): the encoding of the file if not ``binary``,
+            defaults to what ``open`` would use.
+    """
+    if path == "-":
+        stdin = sys.stdin.buffer
+        module = _compression_module_for(stdin.peek(8))
+        if module is None:
+            return stdin if binary else sys.stdin
+        src = module.open(stdin, "rb")
+    else:
+        with open(path, "rb") as raw:
+            module = _compression_module_for(raw.read(8))
+        if module is None:
+            return open(path, "rb" if binary else "r", encoding=encoding)
+        src = module.open(path, "rb")
+    src = io.BufferedReader(src, buffer_size=DEFAULT_CHUNK_SIZE)
+    return src if binary else io.TextIOWrapper(src, encoding=encoding)
 
 
-def uuid_replace(src, dest, template=UUID_REPLACEMENT_TEMPLATE):
+def open_output(path, binary=False, encoding=None):
+    """
+    Open ``path`` for writing, compressing what is written if its name says to.
+
+    Files named with one of the ``COMPRESSION_EXTENSIONS`` are compressed,
+    through a buffer of ``DEFAULT_CHUNK_SIZE``.
+
+    Args:
+        path (str): the file to open, ``-`` for standard output.
+        binary (bool): open in binary mode, see ``UUIDLineReplacer``.
+        encoding (str): the encoding to write if not ``binary``,
+            defaults to what ``open`` would use.
+    """
+    if path == "-":
+        return sys.stdout.buffer if binary else sys.stdout
+    module_name = COMPRESSION_EXTENSIONS.get(os.path.splitext(path)[1])
+    if module_name is None:
+        return open(path, "wb" if binary else "w", encoding=encoding)
+    dest = importlib.import_module(module_name).open(path, "wb")
+    dest = io.BufferedWriter(dest, buffer_size=DEFAULT_CHUNK_SIZE)
+    return dest if binary else io.TextIOWrapper(dest, encoding=encoding)
+
+
+def _close_output(dest):
+    """Close ``dest``, finishing any compressed data, or just flush standard output."""
+    if dest in (sys.stdout, sys.stdout.buffer):
+        dest.flush()
+    else:
+        dest.close()
+
+
+def read_chunks(src, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yield the rest of the contents of ``src`` in chunks of ``chunk_size``.
+
+    Regular files opened in binary mode are memory-mapped rather than read,
+    anything else, such as a pipe, is read ``chunk_size`` at a time.
+    """
+    # Not a compressed file, its file number is for the compressed data.
+    is_plain_file = isinstance(getattr(src, "raw", None), io.FileIO)
+    if is_plain_file and _is_regular_file(src):
+        offset = src.tell()
+        size = os.fstat(src.fileno()).st_size
+        if offset >= size:
+            return
+        with mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            for position in range(offset, size, chunk_size):
+                yield mapped[position : position + chunk_size]
+        src.seek(size)
+        return
+
+    chunk = src.read(chunk_size)
+    while chunk:
+        yield chunk
+        chunk = src.read(chunk_size)
+
+
+def _write_glossary(dest, replacer):
+    """Append the glossary of ``replacer`` to the ``dest`` output file."""
+    separator = "\n" + GLOSSARY_SEPARATOR
+    dest.write(separator.encode() if replacer.binary else separator)
+    dest.writelines(replacer.iter_uuid_mappings())
+
+
+def uuid_replace(
+    src,
+    dest,
+    template=UUID_REPLACEMENT_TEMPLATE,
+    binary=False,
+    chunk_size=None,
+    replacer=None,
+    glossary=None,
+):
     """
     Replace UUIDs in all the lines in ``src`` and write to ``dest``.
 
     Args:
         src (file): a file opened for read
         dest (file): a file opened for write.
+        template (str): the replacement template, see ``UUIDLineReplacer``.
+        binary (bool): ``src`` and ``dest`` are opened in binary mode,
+            see ``UUIDLineReplacer``.
+        chunk_size (int): If given, process ``src`` in chunks of this size
+            rather than line by line, see ``UUIDLineReplacer.replace_chunks``
+            and ``read_chunks``.
+        replacer (UUIDLineReplacer): the replacer to use, such as
+            a ``HashedUUIDLineReplacer``, instead of one made from ``template``
+            and ``binary``.
+        glossary (file): a file opened for write, in the same mode as ``dest``,
+            to write the glossary to as the UUIDs are found,
+            see ``UUIDLineReplacer.write_glossary_to``.
 
     After processing the contents of ``src`` into ``dest``, a glossary is then written
-    to ``dest.``
+    to ``dest.``, unless it was written to ``glossary``.
+    """
+
+    if replacer is None:
+        replacer = UUIDLineReplacer(template=template, binary=binary)
+    if glossary is not None:
+        replacer.write_glossary_to(glossary)
+    if chunk_size:
+        for replaced in replacer.replace_chunks(read_chunks(src, chunk_size)):
+            dest.write(replaced)
+    else:
+        dest.writelines(map(replacer, src))
+    if glossary is None:
+        _write_glossary(dest, replacer)
+
+
+def _line_aligned_ranges(path, count, max_size=None):
+    """
+    Split the file at ``path`` into about ``count`` byte ranges of whole lines.
+
+    More ranges are made if needed so each is at most ``max_size`` bytes,
+    defaulting to ``PARALLEL_RANGE_SIZE``, plus the rest of its last line.
+    A compressed file can't be split, it is one range with an ``end`` of ``None``.
+
+    Returns:
+        list: of ``(start, end)`` offset tuples, in file order.
+    """
+    if is_compressed(path):
+        return [(0, None)]
+    size = os.path.getsize(path)
+    if max_size is None:
+        max_size = PARALLEL_RANGE_SIZE
+    count = max(count, -(-size // max_size))
+    ranges = []
+    start = 0
+    with open(path, "rb") as src:
+        for index in range(1, count + 1):
+            end = size * index // count
+            if end <= start:
+                continue
+            if end < size:
+                src.seek(end)
+                end += len(src.readline())
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def _range_lines(path, start, end, binary, encoding):
+    """Return the lines of ``path`` between the ``start`` and ``end`` offsets."""
+    if end is None:
+        with open_input(path, binary=binary, encoding=encoding) as src:
+            return src.readlines()
+    with open(path, "rb") as src:
+        src.seek(start)
+        data = src.read(end - start)
+    if binary:
+        return io.BytesIO(data).readlines()
+    # Decode the same way as ``open`` would, including newline translation.
+    return io.TextIOWrapper(io.BytesIO(data), encoding=encoding).readlines()
+
+
+def _range_uuids(args):
+    """Return the distinct isolated UUIDs in a range, in the order first found."""
+    path, start, end, binary, encoding = args
+    replacer = UUIDLineReplacer(binary=binary)
+    text = replacer._empty.join(_range_lines(path, start, end, binary, encoding))
+    return list(dict.fromkeys(match.group() for match in replacer._find_uuids(text)))
+
+
+def _replace_range(args):
+    """Return a range with its UUIDs replaced by the markers in ``uuid_map``."""
+    path, start, end, binary, encoding, uuid_map = args
+    replacer = UUIDLineReplacer(binary=binary)
+    replacer.uuid_map = uuid_map
+    empty = b"" if binary else ""
+    return empty.join(map(replacer, _range_lines(path, start, end, binary, encoding)))
+
+
+def _replace_range_independently(args):
+    """Return a range replaced by its own copy of a replacer, and that copy's map."""
+    path, start, end, binary, encoding, replacer = args
+    empty = b"" if binary else ""
+    lines = _range_lines(path, start, end, binary, encoding)
+    return empty.join(map(replacer, lines)), replacer.uuid_map
+
+
+def _replaced_ranges(ranges, jobs, replacer, encoding):
+    """
+    Yield each of the ``(path, start, end)`` ranges with its UUIDs replaced, in order.
+
+    See ``uuid_replace_parallel`` for how ``jobs`` processes share the work.
+    Only a couple of ranges per process are submitted or waiting to be yielded
+    at a time, so memory use doesn't grow with the size of the input.
+    """
+    # Imported here, they are slow to import and only needed with several jobs.
+    from concurrent.futures import ProcessPoolExecutor
+    from .futures import result_from_each_in_order
+
+    binary = replacer.binary
+    read_ahead = 2 * jobs
+    range_args = [(path, start, end, binary, encoding) for path, start, end in ranges]
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        if isinstance(replacer, HashedUUIDLineReplacer):
+            # Not the replacer itself, it changes while the arguments are pickled.
+            replace_args = (args + (replacer._empty_copy(),) for args in range_args)
+            for replaced, uuid_map in result_from_each_in_order(
+                replace_args,
+                _replace_range_independently,
+                read_ahead=read_ahead,
+                pool=executor,
+            ):
+                replacer.update(uuid_map)
+                yield replaced
+        else:
+            # Each range's UUIDs are numbered as its scan comes back, in order,
+            # so its replacement can start while later ranges are still scanned.
+            range_uuids = result_from_each_in_order(
+                range_args, _range_uuids, read_ahead=read_ahead, pool=executor
+            )
+            replace_args = (
+                args + ({uuid: replacer._marker_for(uuid) for uuid in uuids},)
+                for args, uuids in zip(range_args, range_uuids)
+            )
+            yield from result_from_each_in_order(
+                replace_args, _replace_range, read_ahead=read_ahead, pool=executor
+            )
+
+
+def uuid_replace_parallel(
+    src_path,
+    dest,
+    jobs,
+    template=UUID_REPLACEMENT_TEMPLATE,
+    binary=False,
+    encoding=None,
+    replacer=None,
+    glossary=None,
+):
+    """
+    Replace UUIDs in the file at ``src_path`` using ``jobs`` processes.
+
+    The output, including the glossary, is the same as ``uuid_replace`` would write.
+    The file is split into ranges of whole lines, which are first scanned
+    in parallel for UUIDs. Those are numbered in the order they first appear
+    in the file, then the ranges are replaced in parallel and written in order.
+    A ``HashedUUIDLineReplacer`` doesn't need the first pass,
+    the ranges are replaced independently and their glossaries merged.
+    A compressed file can't be split, so it is processed by ``uuid_replace``.
+
+    Args:
+        src_path (str): the path of the (regular) file to process.
+        dest (file): a file opened for write.
+        jobs (int): the number of worker processes to use.
+        template (str): the replacement template, see ``UUIDLineReplacer``.
+        binary (bool): read ``src_path`` as bytes, and ``dest`` is opened
+            in binary mode, see ``UUIDLineReplacer``.
+        encoding (str): the encoding of ``src_path`` if not ``binary``,
+            defaults to what ``open`` would use.
+        replacer (UUIDLineReplacer): the replacer to use, see ``uuid_replace``.
+        glossary (file): where to write the glossary instead of ``dest``,
+            see ``uuid_replace``.
+    """
+
+    if replacer is None:
+        replacer = UUIDLineReplacer(template=template, binary=binary)
+    if is_compressed(src_path):
+        with open_input(src_path, binary=replacer.binary, encoding=encoding) as src:
+            uuid_replace(src, dest, replacer=replacer, glossary=glossary)
+        return
+    if glossary is not None:
+        replacer.write_glossary_to(glossary)
+    # Several ranges per worker even out the differences in how long each takes.
+    ranges = _line_aligned_ranges(src_path, jobs * 4)
+    file_ranges = [(src_path, start, end) for start, end in ranges]
+    for replaced in _replaced_ranges(file_ranges, jobs, replacer, encoding):
+        dest.write(replaced)
+    if glossary is None:
+        _write_glossary(dest, replacer)
+
+
+def _with_suffix(path, suffix):
+    """
+    Return ``path`` with ``suffix`` added to it, before any compression extension.
+
+    So the output for ``x.log.gz`` is compressed the same way, as ``x.log.uuids.gz``.
+    """
+    base, extension = os.path.splitext(path)
+    if extension in COMPRESSION_EXTENSIONS:
+        return base + suffix + extension
+    return path + suffix
+
+
+def _batch_files(paths, output_dir, suffix):
+    """
+    Return the ``(input_path, output_path)`` of each file for ``uuid_replace_files``.
+
+    Directories are walked in sorted order, so the numbering is repeatable.
+
+    Raises:
+        ValueError: if two files would have the same output file.
+    """
+    output_endings = tuple(
+        [suffix] + [suffix + extension for extension in COMPRESSION_EXTENSIONS]
+    )
+    files = []
+    for path in paths:
+        if not os.path.isdir(path):
+            name = os.path.basename(path)
+            if output_dir:
+                files.append((path, os.path.join(output_dir, name)))
+            else:
+                files.append((path, _with_suffix(path, suffix)))
+            continue
+        for directory, subdirectories, names in os.walk(path):
+            subdirectories.sort()
+            for name in sorted(names):
+                if not output_dir and name.endswith(output_endings):
+                    # Output from an earlier run.
+                    continue
+                input_path = os.path.join(directory, name)
+                if output_dir:
+                    relative_path = os.path.relpath(input_path, path)
+                    files.append((input_path, os.path.join(output_dir, relative_path)))
+                else:
+                    files.append((input_path, _with_suffix(input_path, suffix)))
+
+    inputs_by_output = {}
+    for input_path, output_path in files:
+        other_input = inputs_by_output.setdefault(
+            os.path.normcase(os.path.abspath(output_path)), input_path
+        )
+        if other_input != input_path:
+            raise ValueError(
+                "{} and {} would both be written to {}".format(
+                    other_input, input_path, output_path
+                )
+            )
+    return files
+
+
+def uuid_replace_files(
+    paths,
+    output_dir=None,
+    suffix=DEFAULT_OUTPUT_SUFFIX,
+    glossary=None,
+    jobs=None,
+    template=UUID_REPLACEMENT_TEMPLATE,
+    binary=False,
+    encoding=None,
+    replacer=None,
+):
+    """
+    Replace UUIDs in many files, numbering them across all of the files.
+
+    This saves starting a process per file, and the same UUID gets the same
+    replacement in every file, with one glossary for them all.
+    Compressed files are read, and their output files written, compressed,
+    see ``open_input`` and ``open_output``.
+    UUIDs are numbered in the order they first appear, going through
+    the files in the order given, with directories walked in sorted order.
+
+    Args:
+        paths (list): of files, and directories to process all the files in.
+        output_dir (str): where to write the output files, the files in
+            a directory from ``paths`` keep their path relative to that directory
+            and other files keep their name. If not given, each output file is
+            written next to its input file, named with ``suffix`` added.
+        suffix (str): added to the input file name for the output file name
+            when there is no ``output_dir``, before any compression extension.
+            Files with this suffix in the directories are skipped.
+        glossary (file): a file opened for write, to write the glossary to
+            as the UUIDs are found, see ``UUIDLineReplacer.write_glossary_to``.
+            Needed unless a ``replacer`` is given, which keeps the mappings.
+        jobs (int): the number of worker processes to use,
+            see ``uuid_replace_parallel``. If not given, all the work is done
+            in this process.
+        template (str): the replacement template, see ``UUIDLineReplacer``.
+        binary (bool): process the files as bytes, see ``UUIDLineReplacer``.
+        encoding (str): the encoding of the files if not ``binary``,
+            defaults to what ``open`` would use.
+        replacer (UUIDLineReplacer): the replacer to use, see ``uuid_replace``.
+
+    Returns:
+        list: of the ``(input_path, output_path)`` of each file processed.
+
+    Raises:
+        ValueError: without a ``glossary`` or ``replacer``, as the mappings
+            would be lost, or if two files would have the same output file.
+    """
+
+    if replacer is None:
+        if glossary is None:
+            raise ValueError("a glossary or a replacer is needed, to keep the UUIDs")
+        replacer = UUIDLineReplacer(template=template, binary=binary)
+    binary = replacer.binary
+    files = _batch_files(paths, output_dir, suffix)
+    if glossary is not None:
+        replacer.write_glossary_to(glossary)
+
+    if jobs:
+        # Split the work into ranges by size, across all the files together.
+        total_size = sum(os.path.getsize(path) for path, _ in files) or 1
+        file_ranges = [
+            [
+                (path, start, end)
+                for start, end in _line_aligned_ranges(
+                    path, max(1, jobs * 4 * os.path.getsize(path) // total_size)
+                )
+            ]
+            for path, _ in files
+        ]
+        replaced_ranges = _replaced_ranges(
+            [one_range for ranges in file_ranges for one_range in ranges],
+            jobs,
+            replacer,
+            encoding,
+        )
+
+    for index, (path, output_path) in enumerate(files):
+        output_directory = os.path.dirname(output_path)
+        if output_directory:
+            os.makedirs(output_directory, exist_ok=True)
+        with open_output(output_path, binary=binary, encoding=encoding) as dest:
+            if jobs:
+                for _ in file_ranges[index]:
+                    dest.write(next(replaced_ranges))
+            else:
+                with open_input(path, binary=binary, encoding=encoding) as src:
+                    dest.writelines(map(replacer, src))
+    if jobs:
+        # Let the worker processes go.
+        replaced_ranges.close()
+    return files
+
+
+def _input_is_waiting(src):
+    """
+    Is there input waiting to be read from the pipe (etc.) ``src``.
+
+    When there is no way to tell, such as for a pipe on Windows, say there isn't.
+    """
+    try:
+        readable, _, _ = select.select([src], [], [], 0)
+    except (OSError, ValueError, TypeError):
+        return False
+    return bool(readable)
+
+
+def follow_lines(src, poll_interval=DEFAULT_POLL_INTERVAL, idle=None):
+    """
+    Yield each line of ``src`` as soon as it is complete, like ``tail -f``.
+
+    At the end of a regular file, wait for more lines to be written to it,
+    checking every ``poll_interval`` seconds, so this never ends by itself.
+    Anything else, such as a pipe, is followed until it is closed.
+
+    Args:
+        src (file): a file opened for read, in either mode.
+        poll_interval (float): seconds to wait between checks of a regular file
+            for more lines.
+        idle (callable): if given, called with no arguments whenever reading
+            the next line has to wait for it to be written.
+    """
+    idle = idle or (lambda: None)
+    line = src.readline()
+    empty = line[:0]
+    newline = "\n" if isinstance(empty, str) else b"\n"
+    if not _is_regular_file(src):
+        while line:
+            yield line
+            if not _input_is_waiting(src):
+                idle()
+            line = src.readline()
+        return
+
+    partial = empty
+    while True:
+        if line.endswith(newline):
+            yield partial + line
+            partial = empty
+        elif line:
+            # The rest of the line hasn't been written yet.
+            partial += line
+        else:
+            idle()
+            time.sleep(poll_interval)
+        line = src.readline()
+
+
+def uuid_replace_follow(
+    src,
+    dest,
+    template=UUID_REPLACEMENT_TEMPLATE,
+    binary=False,
+    replacer=None,
+    glossary=None,
+    flush_interval=0,
+    poll_interval=DEFAULT_POLL_INTERVAL,
+):
+    """
+    Replace UUIDs in lines as they are written to ``src``, see ``follow_lines``.
+
+    Instead of a glossary at the end, each new glossary line is written out
+    just before the first line with that placeholder in it.
+
+    Args:
+        src (file): a file opened for read, followed as it grows.
+        dest (file): a file opened for write.
+        template (str): the replacement template, see ``UUIDLineReplacer``.
+        binary (bool): ``src`` and ``dest`` are opened in binary mode,
+            see ``UUIDLineReplacer``.
+        replacer (UUIDLineReplacer): the replacer to use instead of one made
+            from ``template`` and ``binary``.
+        glossary (file): a file opened for write, in the same mode as ``dest``,
+            to write the glossary lines to instead of ``dest``.
+        flush_interval (float): the most seconds between flushes of ``dest``
+            and ``glossary``, while lines keep arriving.
+            Whatever was written is always flushed before waiting for another line,
+            so a larger interval only trades latency for throughput on busy input.
+        poll_interval (float): see ``follow_lines``.
+    """
+    if replacer is None:
+        replacer = UUIDLineReplacer(template=template, binary=binary)
+    replacer.write_glossary_to(dest if glossary is None else glossary)
+    outputs = [dest] if glossary in (None, dest) else [dest, glossary]
+    unflushed = False
+    last_flush = time.monotonic()
+
+    def flush():
+        nonlocal unflushed, last_flush
+        if unflushed:
+            for output in outputs:
+                output.flush()
+            unflushed = False
+            last_flush = time.monotonic()
+
+    try:
+        for line in follow_lines(src, poll_interval=poll_interval, idle=flush):
+            dest.write(replacer(line))
+            unflushed = True
+            if time.monotonic() - last_flush >= flush_interval:
+                flush()
+    finally:
+        flush()
+
+
+GLOSSARY_SEPARATOR = "##########\n"
+"""The line between the output of ``uuid_replace`` and the glossary appended to it."""
+
+
+def _common_pattern(strings):
+    """
+    Return a regex that matches all of ``strings``, by what they have in common.
+
+    That is their common prefix and suffix, with any of the characters
+    that differ in between.
     """
+    if not strings:
+        # Matches nothing.
+        return "(?!)"
+    if len(strings) == 1:
+        return re.escape(strings[0])
+    prefix = os.path.commonprefix(strings)
+    reversed_rests = [string[len(prefix) :][::-1] for string in strings]
+    suffix = os.path.commonprefix(reversed_rests)[::-1]
+    middles = [rest[len(suffix) :] for rest in reversed_rests]
+    middle = "[{}]".format("".join(map(re.escape, sorted(set("".join(middles))))))
+    quantifier = "+" if all(middles) else "*"
+    pattern = re.escape(prefix) + middle + quantifier + re.escape(suffix)
+    if not suffix:
+        # Don't match just the start of a longer string.
+        pattern += "(?!{})".format(middle)
+    return pattern
+
+
+class UUIDRestorer(object):
+    """
+    Restore the UUIDs that a ``UUIDLineReplacer`` replaced, line by line.
+
+    Instances should be called with a line to process
+    and will return the line with the UUIDs put back.
+
+    Rather than searching for every replacement, one regex that matches
+    any of them is built from what they all have in common, which for
+    ``,,UUID-001,,`` to ``,,UUID-123,,`` is ``,,UUID-[0-9]+,,``.
+    Anything it matches that isn't in the glossary is left alone.
+    """
+
+    def __init__(self, glossary, binary=False):
+        """
+        Create a new UUID restorer.
+
+        Args:
+            glossary (iterable): the glossary lines, see ``read_glossary``.
+            binary (bool): Process ``bytes`` lines instead of ``str`` lines,
+                then ``glossary`` has to be ``bytes`` lines too.
+        """
 
-    replacer = UUIDLineReplacer(template=template)
-    dest.writelines(map(replacer, src))
-    dest.write("\n##########\n")
-    dest.writelines(replacer.uuid_mappings())
+        self.binary = binary
+        self.uuid_by_replacement = dict(read_glossary(glossary))
+        self._matcher = self._replacement_matcher(list(self.uuid_by_replacement))
+
+    def _replacement_matcher(self, replacements):
+        """Return a compiled regex that matches all of ``replacements``."""
+        if not self.binary:
+            return re.compile(_common_pattern(replacements))
+        # Work it out as text, latin-1 maps every byte to a character and back.
+        replacements = [replacement.decode("latin-1") for replacement in replacements]
+        return re.compile(_common_pattern(replacements).encode("latin-1"))
+
+    def _restore(self, match):
+        """Return the UUID for a matched replacement."""
+        replacement = match.group()
+        return self.uuid_by_replacement.get(replacement, replacement)
+
+    def __call__(self, line):
+        """Restore the UUIDs in ``line``."""
+        return self._matcher.sub(self._restore, line)
+
+
+def _split_appended_glossary(src, binary):
+    """
+    Return the glossary appended to ``src``, and how many lines come before it.
+
+    ``src`` is left where it started, for reading again.
+    """
+    separator = GLOSSARY_SEPARATOR.encode() if binary else GLOSSARY_SEPARATOR
+    start = src.tell()
+    glossary = []
+    content_line_count = None
+    for index, line in enumerate(src):
+        if line == separator:
+            glossary = []
+            content_line_count = index
+        else:
+            glossary.append(line)
+    if content_line_count is None:
+        raise ValueError("{} has no glossary".format(getattr(src, "name", "The input")))
+    src.seek(start)
+    return glossary, content_line_count
+
+
+def uuid_restore(src, dest, glossary=None, binary=False):
+    """
+    Restore the UUIDs in ``src``, as written by ``uuid_replace``, and write to ``dest``.
+
+    Args:
+        src (file): a file opened for read. If there is no separate ``glossary``,
+            its glossary is read from its end, so it has to be a seekable file.
+        dest (file): a file opened for write.
+        glossary (file): the glossary file, if it was written separately.
+        binary (bool): ``src``, ``dest`` and ``glossary`` are opened in binary mode,
+            see ``UUIDLineReplacer``.
+    """
+    if glossary is not None:
+        dest.writelines(map(UUIDRestorer(glossary, binary=binary), src))
+        return
+
+    glossary, content_line_count = _split_appended_glossary(src, binary)
+    restorer = UUIDRestorer(glossary, binary=binary)
+    lines = islice(src, content_line_count)
+    # The line before the separator got an extra newline.
+    last_line = next(lines, None)
+    for line in lines:
+        dest.write(restorer(last_line))
+        last_line = line
+    if last_line is not None:
+        dest.write(restorer(last_line[:-1]))
 
 
 def main():
@@ -95,25 +1588,255 @@ def main():
         "which will be given a single numeric value. "
         "The environment variable UUID_TEMPLATE can be used to override the "
         "default value, and the `-t`/`-template` parameter can be used to "
-        "overrride the environment variable."
+        "overrride the environment variable. "
+        "With --hashed, each placeholder is instead derived from a keyed hash "
+        "of the UUID, so separately processed pieces of a log agree on them, "
+        "and the replacement field will be given a string of hex digits. "
+        "With --restore, the UUIDs in output from this utility are put back. "
+        "gzip, bzip2 and xz compressed input is decompressed, and output files "
+        "named .gz, .bz2 or .xz are compressed."
     )
     parser = argparse.ArgumentParser(
         description=description, formatter_class=argparse.ArgumentDefaultsHelpFormatter
     )
+    parser.add_argument("input", nargs="?", help="input file (default: stdin)")
+    parser.add_argument("output", nargs="?", help="output file (default: stdout)")
     parser.add_argument(
-        "input", nargs="?", type=argparse.FileType("r"), default=sys.stdin
+        "--template",
+        "-t",
+        type=str,
+        help="UUID replacement template (default: {} or with --hashed {})".format(
+            UUID_REPLACEMENT_TEMPLATE, UUID_HASH_TEMPLATE
+        ),
+        default=os.environ.get("UUID_TEMPLATE"),
     )
+
     parser.add_argument(
-        "output", nargs="?", type=argparse.FileType("w"), default=sys.stdout
+        "--binary",
+        "-b",
+        action="store_true",
+        help="process the input as undecoded bytes, for logs that aren't valid text",
     )
+
     parser.add_argument(
-        "--template",
-        "-t",
+        "--chunk-size",
+        "-c",
+        type=int,
+        help="process the input in chunks of this many characters "
+        "(bytes with --binary) instead of line by line, for input with huge lines",
+    )
+
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        help="process the input file with this many worker processes",
+    )
+
+    parser.add_argument(
+        "--follow",
+        "-f",
+        action="store_true",
+        help="keep processing lines as they are written to the input, like tail -f, "
+        "writing each new glossary line before the line it is first used in, "
+        "unless --glossary is given",
+    )
+
+    parser.add_argument(
+        "--flush-interval",
+        type=float,
+        default=0,
+        help="with --follow, flush the output at least this often (in seconds) "
+        "while lines keep arriving, it is always flushed when the input is idle",
+    )
+
+    parser.add_argument(
+        "--restore",
+        "-r",
+        action="store_true",
+        help="restore the UUIDs in the input, using the glossary at its end "
+        "or from --glossary",
+    )
+
+    parser.add_argument(
+        "--batch",
+        nargs="+",
+        metavar="PATH",
+        help="process these files, and all the files in these directories, "
+        "with one numbering for all of them, instead of input and output, "
+        "see --output-dir, --suffix and --glossary",
+    )
+
+    parser.add_argument(
+        "--output-dir",
+        "-o",
+        type=str,
+        help="with --batch, write the output files into this directory, "
+        "mirroring the directories given, instead of next to the input files",
+    )
+
+    parser.add_argument(
+        "--suffix",
+        type=str,
+        default=DEFAULT_OUTPUT_SUFFIX,
+        help="with --batch, added to input file names for output files "
+        "written next to them",
+    )
+
+    parser.add_argument(
+        "--glossary",
+        "-g",
+        type=str,
+        help="write the glossary to this file as UUIDs are found, "
+        "instead of appending it to the output (with --batch, default: stdout)",
+    )
+
+    parser.add_argument(
+        "--mapping-store",
+        "-m",
+        type=str,
+        help="file to keep the UUID numbering in, "
+        "so that a later run continues it, created if it doesn't exist",
+    )
+
+    parser.add_argument(
+        "--identifiers",
+        "-i",
+        nargs="+",
+        metavar="KIND",
+        help="replace these kinds of identifiers, each numbered separately, "
+        "in a single pass, instead of just UUIDs (--template is used for uuid), "
+        "choose from: {}, {} for all ticket IDs, or a ticketing system "
+        "such as jira".format(
+            ", ".join(sorted(IDENTIFIER_PATTERNS)), TICKET_IDENTIFIERS
+        ),
+    )
+
+    parser.add_argument(
+        "--hashed",
+        action="store_true",
+        help="use placeholders derived from a keyed hash of each UUID",
+    )
+
+    parser.add_argument(
+        "--hash-key",
         type=str,
-        help="UUID replacement template",
-        default=os.environ.get("UUID_TEMPLATE", UUID_REPLACEMENT_TEMPLATE),
+        help="key for --hashed placeholders",
+        default=os.environ.get("UUID_HASH_KEY", ""),
+    )
+
+    parser.add_argument(
+        "--hash-digits",
+        type=int,
+        help="number of hex digits in --hashed placeholders",
+        default=DEFAULT_HASH_DIGITS,
     )
 
     args = parser.parse_args()
+    if args.restore:
+        if args.glossary:
+            glossary = open_input(args.glossary, binary=args.binary)
+        elif not args.input:
+            parser.error("--restore needs an input file or --glossary")
+        else:
+            glossary = None
+        dest = open_output(args.output or "-", binary=args.binary)
+        uuid_restore(
+            open_input(args.input or "-", binary=args.binary),
+            dest,
+            glossary=glossary,
+            binary=args.binary,
+        )
+        _close_output(dest)
+        return
+
+    if args.batch and (args.input or args.output):
+        parser.error("--batch takes the place of input and output")
+    if args.batch and args.chunk_size:
+        parser.error("--batch and --chunk-size can not be used together")
+    if args.jobs and not (args.input or args.batch):
+        parser.error("--jobs needs an input file")
+    if args.jobs and args.chunk_size:
+        parser.error("--jobs and --chunk-size can not be used together")
+    if args.hashed and args.mapping_store:
+        parser.error("--hashed placeholders don't need a --mapping-store")
+    if args.follow and (args.batch or args.jobs or args.chunk_size):
+        parser.error("--follow can not be used with --batch, --jobs or --chunk-size")
+    if args.identifiers and (
+        args.jobs or args.chunk_size or args.hashed or args.mapping_store
+    ):
+        parser.error(
+            "--identifiers can not be used with --jobs, --chunk-size, --hashed "
+            "or --mapping-store"
+        )
+
+    if args.identifiers:
+        try:
+            replacer = IdentifierReplacer.for_names(
+                args.identifiers, binary=args.binary, templates={"uuid": args.template}
+            )
+        except ValueError as error:
+            parser.error(str(error))
+    elif args.hashed:
+        replacer = HashedUUIDLineReplacer(
+            template=args.template,
+            binary=args.binary,
+            key=args.hash_key,
+            digits=args.hash_digits,
+        )
+    elif args.mapping_store:
+        if os.path.exists(args.mapping_store):
+            store = UUIDMappingStore.load(
+                args.mapping_store, template=args.template, binary=args.binary
+            )
+        else:
+            store = UUIDMappingStore(template=args.template, binary=args.binary)
+        replacer = UUIDLineReplacer(
+            template=args.template, binary=args.binary, uuid_map=store
+        )
+    else:
+        replacer = UUIDLineReplacer(template=args.template, binary=args.binary)
 
-    uuid_replace(args.input, args.output, template=args.template)
+    glossary = dest = None
+    if args.glossary or args.batch:
+        glossary = open_output(args.glossary or "-", binary=args.binary)
+    if not args.batch:
+        dest = open_output(args.output or "-", binary=args.binary)
+    if args.batch:
+        uuid_replace_files(
+            args.batch,
+            output_dir=args.output_dir,
+            suffix=args.suffix,
+            glossary=glossary,
+            jobs=args.jobs,
+            replacer=replacer,
+        )
+    elif args.follow:
+        try:
+            uuid_replace_follow(
+                open_input(args.input or "-", binary=args.binary),
+                dest,
+                replacer=replacer,
+                glossary=glossary,
+                flush_interval=args.flush_interval,
+            )
+        except KeyboardInterrupt:
+            # The usual way to stop following.
+            pass
+    elif args.jobs:
+        uuid_replace_parallel(
+            args.input, dest, args.jobs, replacer=replacer, glossary=glossary
+        )
+    else:
+        uuid_replace(
+            open_input(args.input or "-", binary=args.binary),
+            dest,
+            chunk_size=args.chunk_size,
+            replacer=replacer,
+            glossary=glossary,
+        )
+    for output in (dest, glossary):
+        if output is not None:
+            _close_output(output)
+    if args.mapping_store:
+        replacer.uuid_map.save(args.mapping_store)
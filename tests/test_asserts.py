@@ -4,8 +4,12 @@ Unit tests for the jgt_common assert helpers.
 These are simple functions being tested, so the tests are pretty simple too.
 """
 
+import ast
+import inspect
+import sys
+
 import pytest
-from jgt_common import assert_
+from jgt_common import _assert_codegen, assert_, check
 
 
 def test_equality_asserts():
@@ -130,3 +134,47 @@ def test_is_close_asserts():
     assert_.is_close(100, 97, rel_tol=0.03)
     with pytest.raises(AssertionError):
         assert_.is_close(100, 96, rel_tol=0.03)
+
+
+@pytest.mark.skipif(sys.version_info < (3, 8), reason="needs ast end positions")
+def test_assert_module_is_generated_from_check():
+    """If this fails, run ``python -m jgt_common._assert_codegen``."""
+    with open(assert_.__file__) as assert_file:
+        on_disk = assert_file.read()
+    assert ast.dump(ast.parse(_assert_codegen.render())) == ast.dump(ast.parse(on_disk))
+
+
+def test_assert_functions_match_check_functions():
+    check_functions = {
+        name: fun
+        for name, fun in inspect.getmembers(check, inspect.isfunction)
+        if not name.startswith("_") and fun.__module__ == check.__name__
+    }
+    assert_functions = {
+        name
+        for name, fun in inspect.getmembers(assert_, inspect.isfunction)
+        if fun.__module__ == assert_.__name__
+    }
+    assert assert_functions == set(check_functions) | {"assert_if_truthy"}
+    for name, check_function in check_functions.items():
+        assert_function = getattr(assert_, name)
+        assert inspect.signature(assert_function) == inspect.signature(check_function)
+        assert assert_function.__doc__ == check_function.__doc__.replace(
+            "Check", "Assert"
+        )
+
+
+def test_asserts_have_no_wrapper_frame():
+    with pytest.raises(AssertionError) as excinfo:
+        assert_.eq(1, 2, "msg")
+    assert str(excinfo.value) == check.eq(1, 2, "msg")
+    assert [entry.name for entry in excinfo.traceback] == [
+        "test_asserts_have_no_wrapper_frame",
+        "eq",
+    ]
+
+
+def test_assert_if_truthy():
+    assert_.assert_if_truthy(check.eq)(1, 1)
+    with pytest.raises(AssertionError):
+        assert_.assert_if_truthy(check.eq)(1, 2)
@@ -0,0 +1,161 @@
+"""Unit tests for the jgt_common.async_futures tools."""
+
+import asyncio
+import random
+
+import pytest
+from jgt_common import async_futures
+from jgt_common import ResponseInfo
+from jgt_common import ResponseList
+
+# Arbitrary re-usable iterable of inputs to test against.
+inputs = range(10)
+
+
+async def do_work(x):
+    """
+    Return any arbitrary unique value based on x.
+
+    Unique so that set operations can be used to check results without
+    concern for the order of the operations.
+    """
+    # Sleep a few milliseconds to allow the tasks to interleave.
+    await asyncio.sleep(random.random() / 100.0)
+    return 30 * x
+
+
+# The expected results given all the inputs to do_work.
+desired_results = {30 * x for x in inputs}
+
+
+class InFlightCounter(object):
+    """An async ``do_work`` that records the most calls it had running at once."""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.most_in_flight = 0
+
+    async def __call__(self, x):
+        """Return ``do_work(x)``, counting how many calls are running."""
+        self.in_flight += 1
+        self.most_in_flight = max(self.most_in_flight, self.in_flight)
+        try:
+            return await do_work(x)
+        finally:
+            self.in_flight -= 1
+
+
+async def collect(async_iterable):
+    return [value async for value in async_iterable]
+
+
+def test_primitives():
+    async def check():
+        fdict = async_futures.run_each(inputs, do_work)
+        assert set(inputs) == set(fdict.values())
+        assert all(isinstance(task, asyncio.Task) for task in fdict)
+        return await collect(async_futures.as_completed_result(fdict))
+
+    assert desired_results == set(async_futures.run_sync(check()))
+
+
+def test_run_each_needs_a_running_loop():
+    with pytest.raises(RuntimeError):
+        async_futures.run_each(inputs, do_work)
+
+
+def test_set_each():
+    work_items = ResponseList(ResponseInfo(input=x, expected=30 * x) for x in inputs)
+    async_futures.run_sync(
+        async_futures.set_each(work_items, "result", lambda r: do_work(r.input))
+    )
+    assert work_items.expected == work_items.result
+
+
+def test_set_response_on_each():
+    work_items = ResponseList(ResponseInfo(input=x, expected=30 * x) for x in inputs)
+    async_futures.run_sync(
+        async_futures.set_response_on_each(work_items, lambda r: do_work(r.input))
+    )
+    assert work_items.expected == work_items.response
+
+
+def test_result_from_each():
+    results = async_futures.run_sync(
+        collect(async_futures.result_from_each(inputs, do_work))
+    )
+    assert desired_results == set(results)
+
+
+def test_as_completed_item_result():
+    async def check():
+        fdict = async_futures.run_each(inputs, do_work)
+        return dict(await collect(async_futures.as_completed_item_result(fdict)))
+
+    results = async_futures.run_sync(check())
+    assert set(inputs) == results.keys()
+    assert desired_results == set(results.values())
+
+
+@pytest.mark.parametrize("limit", [1, 3, 100])
+def test_limit(limit):
+    counter = InFlightCounter()
+    results = async_futures.run_each_sync(range(50), counter, limit=limit)
+    assert results == [30 * x for x in range(50)]
+    assert counter.most_in_flight == min(limit, 50)
+
+
+def test_default_limit():
+    counter = InFlightCounter()
+    async_futures.set_concurrency_limit(4)
+    try:
+        async_futures.run_each_sync(range(20), counter)
+    finally:
+        async_futures.set_concurrency_limit(async_futures.DEFAULT_CONCURRENCY_LIMIT)
+    assert counter.most_in_flight == 4
+
+
+@pytest.mark.parametrize("limit", [0, -1])
+def test_limit_must_be_positive(limit):
+    with pytest.raises(ValueError):
+        async_futures.set_concurrency_limit(limit)
+    with pytest.raises(ValueError):
+        async_futures.run_each_sync(inputs, do_work, limit=limit)
+
+
+def test_run_each_sync_cancels_the_rest_on_an_exception():
+    started = []
+
+    async def fail_on_three(x):
+        started.append(x)
+        if x == 3:
+            raise ZeroDivisionError(x)
+        await asyncio.sleep(10)
+
+    with pytest.raises(ZeroDivisionError):
+        async_futures.run_each_sync(inputs, fail_on_three, limit=5)
+    # Only 3's slot frees up before the exception cancels everything.
+    assert started == [0, 1, 2, 3, 4, 5]
+
+
+def test_run_each_sync_raises_the_first_exception_raised():
+    async def fail(x):
+        # 0 raises after 1, but before the exception from 1 is seen.
+        for _ in range(1 - x):
+            await asyncio.sleep(0)
+        raise ValueError(x)
+
+    with pytest.raises(ValueError) as error:
+        async_futures.run_each_sync([0, 1], fail)
+    assert error.value.args == (1,)
+
+
+def test_run_each_sync_with_no_items():
+    assert async_futures.run_each_sync([], do_work) == []
+
+
+def test_run_sync_from_a_running_loop():
+    async def caller():
+        return async_futures.run_each_sync(inputs, do_work)
+
+    assert asyncio.run(caller()) == [30 * x for x in inputs]
@@ -9,9 +9,12 @@ import random
 import re
 import shutil
 import string
+import subprocess
+import sys
 
 import pytest
 import jgt_common
+from jgt_common import _tickets
 
 
 TEST_MESSAGE = "Test Message"
@@ -449,6 +452,55 @@ def test_get_file_docstring():
     assert jgt_common.get_file_docstring(__file__) == __doc__
 
 
+@jgt_common.classify("testing", "misc")
+def _classified_for_testing():
+    """Classified "test" function."""
+
+
+@jgt_common.classify("testing")
+class _ClassifiedForTesting(object):
+    """Classified test class."""
+
+
+def test_classified_items():
+    assert jgt_common.classified_items(__name__) == {
+        "_classified_for_testing": _classified_for_testing,
+        "_ClassifiedForTesting": _ClassifiedForTesting,
+    }
+    assert jgt_common.classified_items(__name__, "misc") == {
+        "_classified_for_testing": _classified_for_testing
+    }
+    assert jgt_common.classified_items(__name__, "no such category") == {}
+    assert jgt_common.classified_items("no.such.module") == {}
+
+
+def test_classified_items_for_package():
+    exit_items = jgt_common.classified_items("jgt_common", "exit")
+    assert exit_items["exit"] is jgt_common.exit
+    assert "classify" in jgt_common.classified_items("jgt_common", "meta-data")
+
+
+def test_build_classification_rst_string():
+    rst = jgt_common.build_classification_rst_string(
+        globals(), __name__, {"testing": "Testing", "misc": "Miscellaneous"}
+    )
+    assert rst == (
+        "\n\n"
+        ".. csv-table:: Miscellaneous\n"
+        "   :widths: auto\n\n"
+        "   :py:func:`_classified_for_testing`, \"Classified 'test' function.\"\n\n"
+        ".. csv-table:: Testing\n"
+        "   :widths: auto\n\n"
+        '   :py:func:`_ClassifiedForTesting`, "Classified test class."\n'
+        "   :py:func:`_classified_for_testing`, \"Classified 'test' function.\"\n\n"
+        "\n---------\n\n"
+    )
+    assert (
+        jgt_common.build_classification_rst_string({}, __name__, {})
+        == "<NO classifications were found>"
+    )
+
+
 def _is_vowel(value):
     return value.lower() in ["a", "e", "i", "o", "u"]
 
@@ -824,6 +876,23 @@ def test_ticketing_system_urls(ticket_id, system):
         assert url == ""
 
 
+def test_ticketing_system_info_is_cached():
+    assert _tickets._ticket_info() is _tickets._ticket_info()
+    assert jgt_common._TICKET_INFO is _tickets._ticket_info()
+    assert "OBSOLETE_TICKETING_SYSTEMS" in dir(jgt_common)
+
+
+def test_import_does_not_scan_entry_points():
+    code = (
+        "import sys, jgt_common; "
+        "assert 'pkg_resources' not in sys.modules; "
+        "jgt_common.ticketing_system_for; "
+        "assert jgt_common._tickets._TICKET_INFO_SNAPSHOT is None"
+    )
+    project_root = path.dirname(path.dirname(path.abspath(__file__)))
+    subprocess.check_call([sys.executable, "-c", code], cwd=project_root)
+
+
 UUID_BASIC_MATCHER = re.compile(jgt_common.UUID_BASIC_RE)
 
 
@@ -1,7 +1,9 @@
 """Unit tests for the jgt_common.futures tools."""
 
 import concurrent
+import itertools
 import random
+import threading
 import time
 
 import pytest
@@ -110,3 +112,590 @@ def test_as_completed_item_result(executor):
     results = dict(futures.as_completed_item_result(fdict))
     assert set(inputs) == results.keys()
     assert desired_results == set(results.values())
+
+
+class InFlightCounter(object):
+    """Wrap ``do_work``, keeping track of the most calls running at once."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.running = 0
+        self.most_running = 0
+
+    def __call__(self, x):
+        """Return ``do_work(x)``."""
+        with self.lock:
+            self.running += 1
+            self.most_running = max(self.most_running, self.running)
+        try:
+            return do_work(x)
+        finally:
+            with self.lock:
+                self.running -= 1
+
+
+@pytest.mark.parametrize("window", [1, 2, 100])
+def test_windowed_helpers(executor, window):
+    counter = InFlightCounter()
+    assert desired_results == set(
+        futures.result_from_each(inputs, counter, window=window)
+    )
+    assert counter.most_running <= window
+
+    results = dict(
+        futures.as_completed_item_result(
+            futures.run_each(inputs, do_work, window=window)
+        )
+    )
+    assert desired_results == set(results.values())
+
+    work_items = ResponseList(
+        ResponseInfo(input=x, expected=do_work(x)) for x in inputs
+    )
+    futures.set_response_on_each(work_items, lambda r: do_work(r.input), window=window)
+    assert work_items.expected == work_items.response
+
+
+def test_window_pulls_items_lazily(executor):
+    pulled = []
+
+    def items():
+        for x in itertools.count():
+            pulled.append(x)
+            yield x
+
+    window = futures.run_each(items(), lambda x: x, window=3)
+    assert len(pulled) == 3
+    completed = window.as_completed_items()
+    for _ in range(10):
+        next(completed)
+        assert len(window) <= 3
+    # Each completed future has been replaced by the next item, and no more.
+    assert len(pulled) == 13
+    completed.close()
+
+
+def test_window_must_be_positive(executor):
+    with pytest.raises(ValueError):
+        futures.run_each(inputs, do_work, window=0)
+
+
+@pytest.mark.parametrize("read_ahead", [None, 1, 3])
+def test_result_from_each_in_order(executor, read_ahead):
+    results = futures.result_from_each_in_order(inputs, do_work, read_ahead=read_ahead)
+    assert list(results) == list(map(do_work, inputs))
+
+
+def test_result_from_each_in_order_reads_ahead_lazily(executor):
+    pulled = []
+
+    def items():
+        for x in itertools.count():
+            pulled.append(x)
+            yield x
+
+    results = futures.result_from_each_in_order(items(), do_work, read_ahead=4)
+    assert list(itertools.islice(results, 5)) == list(map(do_work, range(5)))
+    assert len(pulled) == 5 + 4
+    results.close()
+
+
+def test_result_from_each_in_order_raises_in_order(executor):
+    def fail_on_three(x):
+        if x == 3:
+            raise ZeroDivisionError(x)
+        return do_work(x)
+
+    results = futures.result_from_each_in_order(inputs, fail_on_three)
+    assert [next(results) for _ in range(3)] == list(map(do_work, range(3)))
+    with pytest.raises(ZeroDivisionError):
+        next(results)
+
+
+def fail_on_three(x):
+    """Return ``do_work(x)``, except for 3, picklable for the process pool."""
+    if x == 3:
+        raise ZeroDivisionError(x)
+    return do_work(x)
+
+
+@pytest.fixture(scope="module")
+def process_executor():
+    futures.set_process_pool_size(2)
+    yield futures.get_process_executor()
+    futures.shutdown_process_executor()
+    futures._PROCESSPOOL_EXECUTOR = None
+
+
+def test_get_process_executor_raises_when_no_pool_size_set():
+    old_size = futures._MAX_PROCESSES
+    old_executor = futures._PROCESSPOOL_EXECUTOR
+    futures._MAX_PROCESSES = None
+    futures._PROCESSPOOL_EXECUTOR = None
+
+    with pytest.raises(TypeError):
+        futures.get_process_executor()
+
+    futures._MAX_PROCESSES = old_size
+    futures._PROCESSPOOL_EXECUTOR = old_executor
+
+
+@pytest.mark.parametrize("chunksize", [1, 3])
+def test_process_pool_helpers(process_executor, chunksize):
+    results = futures.result_from_each(
+        inputs, do_work, pool=process_executor, chunksize=chunksize
+    )
+    assert desired_results == set(results)
+
+    fdict = futures.run_each(
+        inputs, do_work, pool=process_executor, chunksize=chunksize
+    )
+    assert set(inputs) == set(fdict.values())
+    results = dict(futures.as_completed_item_result(fdict))
+    assert desired_results == set(results.values())
+
+    results = futures.result_from_each_in_order(inputs, do_work, pool=process_executor)
+    assert list(results) == list(map(do_work, inputs))
+
+
+@pytest.mark.parametrize("chunksize", [2, 4])
+def test_chunked_exceptions_belong_to_their_items(executor, chunksize):
+    fdict = futures.run_each(inputs, fail_on_three, chunksize=chunksize)
+    futures.wait(fdict)
+    for future, item in fdict.items():
+        if item == 3:
+            assert isinstance(future.exception(), ZeroDivisionError)
+        else:
+            assert future.result() == do_work(item)
+
+
+def test_window_and_chunksize_are_exclusive(executor):
+    with pytest.raises(ValueError):
+        futures.run_each(inputs, do_work, window=2, chunksize=2)
+
+
+class Hanging(object):
+    """A ``do_work`` that hangs on some items until released."""
+
+    def __init__(self, hang_on=(), fail_on=()):
+        self.hang_on = set(hang_on)
+        self.fail_on = set(fail_on)
+        self.released = threading.Event()
+        self.started = []
+
+    def __call__(self, x):
+        """Return ``do_work(x)``, after hanging or instead raising as configured."""
+        self.started.append(x)
+        if x in self.fail_on:
+            raise ZeroDivisionError(x)
+        if x in self.hang_on:
+            self.released.wait()
+        return do_work(x)
+
+
+@pytest.fixture
+def small_executor():
+    """Make a two thread executor, so tests know which items have started."""
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=2)
+    yield executor
+    executor.shutdown(wait=True)
+
+
+def test_harvest_without_deadlines_raises(executor):
+    work_items = ResponseList(ResponseInfo(input=x) for x in inputs)
+    harvest = futures.set_response_when_completed(
+        futures.run_each(work_items, lambda r: do_work(r.input))
+    )
+    assert harvest.ok
+    assert sorted(harvest.completed, key=lambda r: r.input) == list(work_items)
+
+    fdict = futures.run_each(inputs, Hanging(fail_on=[3]))
+    with pytest.raises(ZeroDivisionError):
+        dict(futures.as_completed_item_result(fdict))
+
+
+def test_task_timeout(small_executor):
+    work = Hanging(hang_on=[1])
+    work_items = ResponseList(ResponseInfo(input=x) for x in inputs)
+    fdict = futures.run_each(work_items, lambda r: work(r.input), pool=small_executor)
+    start = time.monotonic()
+    harvest = futures.set_response_when_completed(fdict, task_timeout=0.2)
+    work.released.set()
+
+    assert time.monotonic() - start < 2
+    assert not harvest.ok
+    assert [r.input for r in harvest.timed_out] == [1]
+    assert len(harvest.completed) == len(inputs) - 1
+    assert not (harvest.failed or harvest.cancelled)
+    assert work_items[1].response is None
+    assert work_items[2].response == do_work(2)
+
+
+def test_task_timeout_with_a_window(small_executor):
+    work = Hanging(hang_on=[3])
+    fwindow = futures.run_each(range(6), work, window=2, pool=small_executor)
+    harvest = futures.Harvest()
+    results = dict(
+        futures.as_completed_item_result(fwindow, task_timeout=0.2, harvest=harvest)
+    )
+    work.released.set()
+
+    assert harvest.timed_out == [3]
+    assert sorted(results) == [0, 1, 2, 4, 5]
+
+
+def test_task_timeout_with_two_executors(small_executor):
+    busy = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+    blocker = threading.Event()
+    busy.submit(blocker.wait)
+    work = Hanging(hang_on=[1])
+    # 0 waits behind the busy executor's other work, but 1 starts right away.
+    fdict = {busy.submit(work, 0): 0, small_executor.submit(work, 1): 1}
+    harvest = futures.Harvest()
+    timed_out_before_0_started = []
+
+    def release():
+        timed_out_before_0_started.extend(harvest.timed_out)
+        blocker.set()
+
+    threading.Timer(1, release).start()
+    results = dict(
+        futures.as_completed_item_result(fdict, task_timeout=0.2, harvest=harvest)
+    )
+    work.released.set()
+    busy.shutdown(wait=True)
+
+    assert timed_out_before_0_started == [1]
+    assert results == {0: do_work(0)}
+
+
+def test_task_timeout_of_many_futures(small_executor):
+    fdict = futures.run_each(range(10000), lambda x: x, pool=small_executor)
+    start = time.monotonic()
+    results = dict(futures.as_completed_item_result(fdict, task_timeout=10))
+
+    # Checking every future on every pass took over a minute.
+    assert time.monotonic() - start < 10
+    assert len(results) == 10000
+
+
+def test_overall_timeout(small_executor):
+    work = Hanging(hang_on=[0, 1])
+    fdict = futures.run_each(inputs, work, pool=small_executor)
+    harvest = futures.Harvest()
+    results = dict(
+        futures.as_completed_item_result(fdict, timeout=0.2, harvest=harvest)
+    )
+    work.released.set()
+
+    assert results == {}
+    assert sorted(harvest.timed_out) == [0, 1]
+    assert sorted(harvest.cancelled) == list(inputs)[2:]
+    assert work.started == [0, 1]
+
+
+def test_overall_timeout_with_a_task_timeout():
+    running, finished = concurrent.futures.Future(), concurrent.futures.Future()
+    running.set_running_or_notify_cancel()
+    finished.set_result(30)
+    fdict = {running: "running", finished: "finished"}
+    harvest = futures.Harvest()
+    # The running future's task timeout passes just after the overall deadline.
+    results = dict(
+        futures.as_completed_item_result(
+            fdict, timeout=0, task_timeout=0.000001, harvest=harvest
+        )
+    )
+
+    assert results == {"finished": 30}
+    assert harvest.timed_out == ["running"]
+
+
+def test_fail_fast(small_executor):
+    work = Hanging(fail_on=[0], hang_on=inputs)
+    fdict = futures.run_each(inputs, work, pool=small_executor)
+    harvest = futures.Harvest()
+    # Those running when 0 fails are waited for until they are released.
+    threading.Timer(0.1, work.released.set).start()
+    results = dict(
+        futures.as_completed_item_result(fdict, fail_fast=True, harvest=harvest)
+    )
+
+    assert [item for item, _ in harvest.failed] == [0]
+    assert isinstance(harvest.failed[0][1], ZeroDivisionError)
+    assert sorted(harvest.completed) == sorted(results)
+    assert sorted(harvest.completed + harvest.cancelled) == list(inputs)[1:]
+    # Unless the harvest gets to it first, 2 starts before 0's failure is seen.
+    assert set(harvest.cancelled) >= set(inputs[3:])
+    assert "failed=1" in repr(harvest)
+
+
+def test_fail_fast_with_a_window(small_executor):
+    work = Hanging(fail_on=[2])
+    fwindow = futures.run_each(itertools.count(), work, window=2, pool=small_executor)
+    harvest = futures.Harvest()
+    results = dict(
+        futures.as_completed_item_result(fwindow, fail_fast=True, harvest=harvest)
+    )
+    assert [item for item, _ in harvest.failed] == [2]
+    assert set(results) == set(harvest.completed)
+    assert max(work.started) < 10
+    assert harvest.not_submitted
+    assert "not_submitted=True" in repr(harvest)
+
+
+def test_overall_timeout_with_a_window(small_executor):
+    work = Hanging(hang_on=[0, 1])
+    fwindow = futures.run_each(inputs, work, window=2, pool=small_executor)
+    harvest = futures.Harvest()
+    list(futures.as_completed_item_result(fwindow, timeout=0.2, harvest=harvest))
+    work.released.set()
+
+    assert sorted(harvest.timed_out) == [0, 1]
+    assert harvest.not_submitted
+    assert not harvest.ok
+    assert work.started == [0, 1]
+
+
+def test_a_window_that_submits_everything(small_executor):
+    work = Hanging(fail_on=[9])
+    fwindow = futures.run_each(inputs, work, window=2, pool=small_executor)
+    harvest = futures.Harvest()
+    results = dict(
+        futures.as_completed_item_result(fwindow, fail_fast=True, harvest=harvest)
+    )
+
+    assert sorted(results) == list(inputs)[:9]
+    assert not harvest.not_submitted
+
+
+@pytest.fixture
+def metrics(executor):
+    """Keep metrics of the shared executor for the test."""
+    futures.enable_metrics()
+    yield
+    futures.disable_metrics()
+
+
+def function_metrics(name):
+    """Return the metrics snapshot of the function ``name`` in this module."""
+    return futures.metrics_snapshot()["functions"][__name__ + "." + name]
+
+
+def test_metrics_are_disabled_by_default(executor):
+    assert futures.metrics_snapshot() is None
+    assert desired_results == set(futures.result_from_each(inputs, do_work))
+    assert futures.metrics_snapshot() is None
+
+
+def test_latency_histogram():
+    histogram = futures._Histogram()
+    for seconds in [0.0005, 0.003, 0.003, 0.003, 100]:
+        histogram.add(seconds)
+
+    snapshot = histogram.snapshot()
+    assert snapshot["count"] == sum(snapshot["buckets"]) == 5
+    assert snapshot["buckets"][0] == 1
+    assert snapshot["buckets"][futures.LATENCY_BUCKETS.index(0.005)] == 3
+    assert snapshot["buckets"][-1] == 1
+    assert snapshot["p50"] == 0.005
+    assert snapshot["p95"] == snapshot["max"] == 100
+    assert snapshot["mean"] == pytest.approx(100.0095 / 5)
+
+
+def test_metrics(metrics):
+    assert desired_results == set(futures.result_from_each(inputs, do_work))
+    futures.wait(futures.run_each(inputs, Hanging(fail_on=[3]), chunksize=2))
+
+    snapshot = futures.metrics_snapshot()
+    assert snapshot["max_workers"] == POOL_SIZE_FOR_TESTING
+    assert 0 < snapshot["utilization"] <= 1
+    assert snapshot["submitted"] == len(inputs) + len(inputs) // 2
+
+    do_work_metrics = function_metrics("do_work")
+    assert do_work_metrics["submitted"] == do_work_metrics["completed"] == len(inputs)
+    assert do_work_metrics["queued"] == do_work_metrics["running"] == 0
+    run_time = do_work_metrics["run_time"]
+    assert run_time["count"] == sum(run_time["buckets"]) == len(inputs)
+    # How long the calls take depends on the machine, only how it adds up doesn't.
+    assert 0 < run_time["mean"] <= run_time["max"]
+    assert run_time["p50"] <= run_time["p95"]
+    assert do_work_metrics["queue_wait"]["count"] == len(inputs)
+
+    # Chunks are counted under the function called on each item.
+    hanging_metrics = function_metrics("Hanging")
+    assert hanging_metrics["completed"] == len(inputs) // 2
+    assert hanging_metrics["failed"] == 0
+
+
+def test_metrics_count_failed_and_cancelled_calls(metrics, executor):
+    release = threading.Event()
+    blockers = [executor.submit(release.wait) for _ in range(POOL_SIZE_FOR_TESTING)]
+    queued = executor.submit(do_work, 1)
+    failing = executor.submit(Hanging(fail_on=[1]), 1)
+    assert futures.metrics_snapshot()["queued"] >= 2
+    assert queued.cancel()
+    release.set()
+    futures.wait(blockers + [failing])
+
+    do_work_metrics = function_metrics("do_work")
+    assert do_work_metrics["cancelled"] == 1
+    assert do_work_metrics["queued"] == 0
+    assert function_metrics("Hanging")["failed"] == 1
+
+
+def test_metrics_log(executor, caplog):
+    caplog.set_level("INFO", logger="jgt_common.futures")
+    futures.enable_metrics(log_interval=0.05)
+    try:
+        list(futures.result_from_each(inputs, do_work))
+        time.sleep(0.2)
+    finally:
+        futures.disable_metrics()
+    assert any(
+        "{} workers".format(POOL_SIZE_FOR_TESTING) in message
+        and "do_work: wait p95" in message
+        for message in caplog.messages
+    )
+
+
+@pytest.fixture
+def named_pool():
+    """Make a named thread pool of two threads, removing it afterwards."""
+    futures.set_thread_pool_size(2, pool="polling")
+    yield "polling"
+    futures.shutdown_executor("polling")
+    futures._NAMED_POOL_EXECUTORS.pop("polling", None)
+    futures._NAMED_POOL_SIZES.pop("polling", None)
+
+
+def thread_name(x):
+    """Return the name of the thread this runs in, with ``do_work(x)``."""
+    return threading.current_thread().name, do_work(x)
+
+
+def test_get_executor_raises_when_named_pool_size_not_set():
+    with pytest.raises(TypeError, match="polling"):
+        futures.get_executor("polling")
+
+
+def test_named_pool(executor, named_pool):
+    polling_executor = futures.get_executor(named_pool)
+    assert polling_executor is futures.get_executor(named_pool)
+    assert polling_executor is not executor
+    assert futures.get_executor(futures.DEFAULT_POOL) is executor
+
+    results = list(futures.result_from_each(inputs, thread_name, pool=named_pool))
+    assert {name.split("_")[0] for name, _ in results} == {named_pool}
+    assert desired_results == {result for _, result in results}
+    results = futures.result_from_each_in_order(inputs, thread_name, pool=named_pool)
+    assert [result for _, result in results] == list(map(do_work, inputs))
+    results = futures.result_from_each(inputs, thread_name)
+    assert named_pool not in {name.split("_")[0] for name, _ in results}
+
+
+def test_named_pool_is_a_bulkhead(executor, named_pool):
+    release = threading.Event()
+    try:
+        futures.run_each(range(10), lambda _: release.wait(), pool=named_pool)
+        # The default pool isn't held up by the polling pool being busy.
+        assert desired_results == set(futures.result_from_each(inputs, do_work))
+    finally:
+        release.set()
+
+
+def test_shutdown_named_pool(executor, named_pool):
+    polling_executor = futures.get_executor(named_pool)
+    futures.shutdown_executor(named_pool)
+    with pytest.raises(RuntimeError):
+        polling_executor.submit(do_work, 1)
+    assert executor.submit(do_work, 1).result() == do_work(1)
+
+
+def test_shutdown_all_pools(executor, named_pool):
+    old_executor = futures._THREADPOOL_EXECUTOR
+    futures._THREADPOOL_EXECUTOR = None
+    try:
+        default_executor = futures.get_executor()
+        polling_executor = futures.get_executor(named_pool)
+        futures.shutdown_executor()
+        for shut_down in (default_executor, polling_executor):
+            with pytest.raises(RuntimeError):
+                shut_down.submit(do_work, 1)
+    finally:
+        futures._THREADPOOL_EXECUTOR = old_executor
+
+
+def test_metrics_by_pool(metrics, named_pool):
+    list(futures.result_from_each(inputs, do_work, pool=named_pool))
+    polling = futures.metrics_snapshot(named_pool)
+    assert polling["pool"] == named_pool
+    assert polling["max_workers"] == 2
+    assert polling["completed"] == len(inputs)
+    assert futures.metrics_snapshot()["submitted"] == 0
+
+
+@pytest.fixture
+def one_thread_executor():
+    """Make a one thread executor, so later chunks wait for earlier ones."""
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+    yield executor
+    executor.shutdown(wait=True)
+
+
+def test_chunk_items_are_pending_until_their_chunk_starts(one_thread_executor):
+    work = Hanging(hang_on=[0])
+    fdict = futures.run_each(range(6), work, pool=one_thread_executor, chunksize=2)
+    items = {item: future for future, item in fdict.items()}
+    try:
+        while not items[0].running():
+            time.sleep(0.01)
+        assert items[1].running()
+        assert not items[1].cancel()
+        assert not items[2].running()
+
+        # The chunk of 2 and 3 is cancelled as a whole.
+        assert items[2].cancel()
+        assert items[2].cancelled() and items[3].cancelled()
+    finally:
+        work.released.set()
+    futures.wait(fdict)
+
+    assert [future.result() for future in map(items.get, [0, 1, 4, 5])] == list(
+        map(do_work, [0, 1, 4, 5])
+    )
+    assert work.started == [0, 1, 4, 5]
+
+
+def test_chunked_overall_timeout_cancels_chunks(one_thread_executor):
+    work = Hanging(hang_on=[0])
+    fdict = futures.run_each(inputs, work, pool=one_thread_executor, chunksize=2)
+    harvest = futures.Harvest()
+    list(futures.as_completed_item_result(fdict, timeout=0.2, harvest=harvest))
+    work.released.set()
+    one_thread_executor.shutdown(wait=True)
+
+    assert sorted(harvest.timed_out) == [0, 1]
+    assert sorted(harvest.cancelled) == list(inputs)[2:]
+    assert work.started == [0, 1]
+
+
+def test_chunked_task_timeout_starts_with_the_chunk(small_executor):
+    work = Hanging(hang_on=[0])
+
+    def slow_work(x):
+        time.sleep(0.04)
+        return work(x)
+
+    fdict = futures.run_each(range(12), slow_work, pool=small_executor, chunksize=2)
+    harvest = futures.Harvest()
+    try:
+        results = dict(
+            futures.as_completed_item_result(fdict, task_timeout=0.3, harvest=harvest)
+        )
+    finally:
+        work.released.set()
+
+    # The other chunks take 0.4s in all, but each only 0.08s once started.
+    assert sorted(harvest.timed_out) == [0, 1]
+    assert sorted(results) == list(range(2, 12))
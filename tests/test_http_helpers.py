@@ -2,7 +2,13 @@
 import json
 
 import pytest
-from jgt_common import assert_, http_helpers, generate_random_string, always_true
+from jgt_common import (
+    always_true,
+    assert_,
+    build_classification_rst_string,
+    generate_random_string,
+    http_helpers,
+)
 import requests
 import requests_mock
 
@@ -283,3 +289,11 @@ def dummy_decorated_call(curl_logger=None):
 def test_call_with_custom_logger():
     with http_helpers.call_with_custom_logger(dummy_decorated_call, 3) as call:
         assert call() == "int"
+
+
+def test_module_doc_has_classification_tables():
+    module_doc = vars(http_helpers)["__doc__"]
+    expected = module_doc + build_classification_rst_string(
+        vars(http_helpers), http_helpers.__name__, http_helpers._CATEGORY_NAME_MAPPINGS
+    )
+    assert http_helpers.__doc__ == expected
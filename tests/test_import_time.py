@@ -0,0 +1,121 @@
+"""
+Import time budget tests for the jgt_common modules.
+
+Importing any one piece of jgt_common should not drag in the whole package.
+The budgets here are deliberately generous so that slow CI machines don't fail
+them, while still catching an accidental import of something heavy.
+"""
+
+import importlib
+import os
+import subprocess
+import sys
+
+import pytest
+import jgt_common
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Budgets are for the cumulative cold import time in microseconds,
+# as reported by ``python -X importtime``.
+IMPORT_TIME_BUDGETS_US = {
+    "jgt_common": 20000,
+    "jgt_common.check": 50000,
+    "jgt_common.assert_": 50000,
+    "jgt_common.futures": 100000,
+    "jgt_common.async_futures": 150000,
+    "jgt_common.uuid_replacer": 80000,
+    "jgt_common.uuid_index": 100000,
+    "jgt_common.tag_to_url": 20000,
+}
+
+# Modules that the lightweight modules must not import.
+HEAVY_MODULES = [
+    "jgt_common._environment",
+    "jgt_common._looping",
+    "jgt_common._tickets",
+    "pkg_resources",
+    "wrapt",
+]
+
+
+def run_python(*args):
+    return subprocess.check_output(
+        (sys.executable,) + args,
+        cwd=PROJECT_ROOT,
+        stderr=subprocess.STDOUT,
+        universal_newlines=True,
+    )
+
+
+def cumulative_import_time_us(module_name):
+    """Return the total time ``python -X importtime`` reports for jgt_common."""
+    total = 0
+    for line in run_python(
+        "-X", "importtime", "-c", "import " + module_name
+    ).splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split("|")
+        # Only the top level entries, their children are already in ``cumulative``.
+        if name.startswith(" jgt_common"):
+            total += int(cumulative)
+    return total
+
+
+@pytest.mark.parametrize("module_name", sorted(IMPORT_TIME_BUDGETS_US))
+def test_import_time_budget(module_name):
+    elapsed = cumulative_import_time_us(module_name)
+    budget = IMPORT_TIME_BUDGETS_US[module_name]
+    assert elapsed <= budget, "{} took {}us to import, over its {}us budget".format(
+        module_name, elapsed, budget
+    )
+
+
+@pytest.mark.parametrize("module_name", sorted(IMPORT_TIME_BUDGETS_US))
+def test_no_heavy_imports(module_name):
+    code = "import sys, {}; print('\\n'.join(sorted(sys.modules)))".format(module_name)
+    imported = set(run_python("-c", code).splitlines())
+    assert not imported.intersection(HEAVY_MODULES)
+
+
+def test_lazy_names_resolve():
+    for name in jgt_common._EXPORTED_FROM:
+        getattr(jgt_common, name)
+    assert set(jgt_common.__all__) <= set(dir(jgt_common))
+    with pytest.raises(AttributeError):
+        jgt_common.not_a_real_name
+
+
+def test_lazy_names_are_cached():
+    code = (
+        "import jgt_common; "
+        "assert 'identity' not in vars(jgt_common); "
+        "identity = jgt_common.identity; "
+        "assert vars(jgt_common)['identity'] is identity"
+    )
+    run_python("-c", code)
+
+
+def test_internal_module_items_are_exported():
+    adopted = set()
+    for module_name in jgt_common._SUBMODULE_EXPORTS:
+        module = importlib.import_module(module_name, "jgt_common")
+        adopted.update(
+            name
+            for name, item in vars(module).items()
+            if getattr(item, "__module__", None) == "jgt_common"
+        )
+    assert adopted <= set(jgt_common._EXPORTED_FROM)
+
+
+@pytest.mark.parametrize("module_name", ["jgt_common", "jgt_common.http_helpers"])
+def test_classification_doc_is_built_on_demand(module_name):
+    code = (
+        "import sys, {0}; "
+        "module = sys.modules[{0!r}]; "
+        "assert '_classified_doc' not in vars(module); "
+        "assert module.__doc__.endswith('---------\\n\\n'); "
+        "assert '_classified_doc' in vars(module)"
+    ).format(module_name)
+    run_python("-c", code)
@@ -0,0 +1,147 @@
+"""Unit tests for the jgt_common.uuid_index."""
+
+import os
+import random
+import sys
+import uuid
+
+import pytest
+
+from jgt_common import uuid_index
+from jgt_common.uuid_index import (
+    UUIDIndex,
+    _decode_postings,
+    _encode_postings,
+    main,
+    update_index,
+    uuid_key,
+)
+
+UUID_1 = "2ed9c7a4-9dbf-4b3e-8f44-6e0ae7b36a5c"
+UUID_2 = "0b0c8e3e-7c7c-4a59-9a8e-1cd36c2c2f02"
+
+
+def occurrences(index_path, uuid_string):
+    with UUIDIndex(index_path) as index:
+        return index.occurrences(uuid_string)
+
+
+def test_postings_round_trip():
+    values = [0, 1, 127, 128, 300, 1 << 40, (3 << 40) | 12345]
+    encoded = bytearray()
+    _encode_postings(values, encoded)
+    assert _decode_postings(bytes(encoded)) == values
+
+
+def test_index_finds_every_occurrence(tmpdir):
+    first = tmpdir / "logs" / "first.log"
+    second = tmpdir / "logs" / "deeper" / "second.log"
+    second.dirpath().ensure(dir=True)
+    first.write("a {0}\nb {1} {0}\n".format(UUID_1, UUID_2))
+    second.write("{}\n".format(UUID_1.upper()))
+    index_path = str(tmpdir / "uuids.index")
+
+    update_index(index_path, [str(tmpdir / "logs")])
+
+    assert occurrences(index_path, UUID_1) == [
+        (str(first), 2),
+        (str(first), 2 + 37 + 2 + 37),
+        (str(second), 0),
+    ]
+    assert occurrences(index_path, UUID_2.upper()) == [(str(first), 41)]
+    assert occurrences(index_path, str(uuid.uuid4())) == []
+    with UUIDIndex(index_path) as index:
+        assert len(index) == 2
+
+
+def test_index_update_only_scans_what_was_appended(tmpdir):
+    log = tmpdir / "growing.log"
+    log.write("{}\npartial {}".format(UUID_1, UUID_2))
+    index_path = str(tmpdir / "uuids.index")
+
+    # The incomplete last line is left for later.
+    assert update_index(index_path, [str(log)]) == 37
+    assert occurrences(index_path, UUID_2) == []
+
+    log.write("\n{}\n".format(UUID_1), mode="a")
+    new_file = tmpdir / "new.log"
+    new_file.write("{}\n".format(UUID_2))
+    scanned = update_index(index_path, [str(tmpdir)])
+    assert scanned == os.path.getsize(str(log)) - 37 + os.path.getsize(str(new_file))
+    assert occurrences(index_path, UUID_1) == [(str(log), 0), (str(log), 82)]
+    assert occurrences(index_path, UUID_2) == [(str(log), 45), (str(new_file), 0)]
+
+    # Nothing new, nothing scanned, and the index file itself isn't indexed.
+    assert update_index(index_path, [str(tmpdir)]) == 0
+    with UUIDIndex(index_path) as index:
+        assert index.files == ["growing.log", "new.log"]
+
+
+def test_index_update_drops_replaced_and_removed_files(tmpdir):
+    log = tmpdir / "rotated.log"
+    gone = tmpdir / "gone.log"
+    log.write("x {}\n{}\n".format(UUID_1, UUID_2))
+    gone.write("{}\n".format(UUID_2))
+    index_path = str(tmpdir / "uuids.index")
+    update_index(index_path, [str(gone), str(log)])
+
+    log.write("{}\n".format(UUID_1))
+    gone.remove()
+    update_index(index_path, [])
+
+    assert occurrences(index_path, UUID_1) == [(str(log), 0)]
+    assert occurrences(index_path, UUID_2) == []
+    with UUIDIndex(index_path) as index:
+        assert index.files == ["rotated.log"]
+
+
+def test_not_an_index(tmpdir):
+    not_index = tmpdir / "not.index"
+    not_index.write("just some text, long enough for a header" * 2)
+    with pytest.raises(ValueError):
+        UUIDIndex(str(not_index))
+
+
+def test_incremental_updates_match_indexing_from_scratch(tmpdir):
+    rng = random.Random(0)
+    uuids = [str(uuid.UUID(int=rng.getrandbits(128))) for _ in range(50)]
+    logs = [tmpdir / "{}.log".format(name) for name in "abc"]
+    incremental_path = str(tmpdir / "incremental.index")
+    for _ in range(4):
+        for log in logs:
+            log.write(
+                "".join("{}\n".format(rng.choice(uuids)) for _ in range(20)), mode="a"
+            )
+        update_index(incremental_path, [str(log) for log in logs])
+        # Each time, one of the files is rotated, and so indexed again.
+        rng.choice(logs).write("{}\n".format(rng.choice(uuids)))
+
+    update_index(incremental_path, [])
+    scratch_path = str(tmpdir / "scratch" / "scratch.index")
+    (tmpdir / "scratch").ensure(dir=True)
+    update_index(scratch_path, [str(log) for log in logs])
+    with UUIDIndex(incremental_path) as incremental, UUIDIndex(scratch_path) as scratch:
+        assert list(incremental.items()) == list(scratch.items())
+
+
+def test_offsets_too_large_to_index(tmpdir, monkeypatch):
+    log = tmpdir / "huge.log"
+    log.write("{}\n".format(UUID_1) * 4)
+    monkeypatch.setattr(uuid_index, "OFFSET_MASK", 63)
+    with pytest.raises(ValueError, match="too large"):
+        update_index(str(tmpdir / "uuids.index"), [str(log)])
+
+
+@pytest.mark.parametrize("not_a_uuid", ["not-a-uuid", "abcd", UUID_1 + "00", "\u00e9"])
+def test_uuid_key_rejects_other_strings(not_a_uuid):
+    with pytest.raises(ValueError):
+        uuid_key(not_a_uuid)
+
+
+def test_find_rejects_other_strings(tmpdir, monkeypatch, capsys):
+    monkeypatch.setattr(
+        sys, "argv", ["uuid-index", str(tmpdir / "uuids.index"), "--find", "nope"]
+    )
+    with pytest.raises(SystemExit):
+        main()
+    assert "'nope' is not a UUID" in capsys.readouterr().err
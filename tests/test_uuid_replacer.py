@@ -1,13 +1,49 @@
 """Unit tests for the jgt_common.uuid_replacer."""
+
+import bz2
+import gzip
+import io
+from itertools import islice
+import lzma
 import os
+import re
+import threading
+import time
+import uuid
+
+import pytest
 
+from jgt_common import _tickets
 from jgt_common import get_file_contents
-from jgt_common.uuid_replacer import uuid_replace
+from jgt_common import uuid_replacer
+from jgt_common.uuid_replacer import (
+    UUID_ISOLATED_MATCHER,
+    HashedUUIDLineReplacer,
+    IdentifierReplacer,
+    UUIDHashCollisionException,
+    UUIDLineReplacer,
+    UUIDMappingStore,
+    UUIDRestorer,
+    _line_aligned_ranges,
+    follow_lines,
+    merge_glossaries,
+    open_input,
+    open_output,
+    read_chunks,
+    uuid_replace,
+    uuid_replace_files,
+    uuid_replace_follow,
+    uuid_replace_parallel,
+    uuid_restore,
+)
 
 HERE = os.path.dirname(os.path.abspath(__file__))
 INPUT_FILE = os.path.join(HERE, "uuid-only-lines.input")
 EXPECTED_OUTPUT_FILE = os.path.join(HERE, "uuid-only-lines.output")
 
+UUID_1 = "2ed9c7a4-9dbf-4b3e-8f44-6e0ae7b36a5c"
+UUID_2 = "0b0c8e3e-7c7c-4a59-9a8e-1cd36c2c2f02"
+
 
 def test_uuid_replacer(tmpdir):
     testoutput_filename = tmpdir / "test.output"
@@ -19,3 +55,622 @@ def test_uuid_replacer(tmpdir):
     assert get_file_contents(EXPECTED_OUTPUT_FILE) == get_file_contents(
         str(testoutput_filename)
     )
+
+
+def test_uuid_replacer_binary():
+    testoutput = io.BytesIO()
+    with open(INPUT_FILE, "rb") as testinput:
+        uuid_replace(testinput, testoutput, binary=True)
+
+    expected = get_file_contents(EXPECTED_OUTPUT_FILE).encode()
+    assert expected == testoutput.getvalue()
+
+
+def test_numbered_in_order_found():
+    replacer = UUIDLineReplacer()
+    line = "{} then {} then {}\n".format(UUID_2, UUID_1, UUID_2)
+    assert replacer(line) == ",,UUID-001,, then ,,UUID-002,, then ,,UUID-001,,\n"
+    assert replacer.uuid_map == {UUID_2: ",,UUID-001,,", UUID_1: ",,UUID-002,,"}
+
+
+def test_embedded_occurrences_of_found_uuids_are_replaced():
+    replacer = UUIDLineReplacer()
+    line = "x_{0} {0} x_{1}\n".format(UUID_1, UUID_2)
+    assert replacer(line) == "x_,,UUID-001,, ,,UUID-001,, x_{}\n".format(UUID_2)
+
+
+def test_binary_uuid_mappings():
+    replacer = UUIDLineReplacer(binary=True)
+    assert replacer(UUID_1.encode() + b"\n") == b",,UUID-001,,\n"
+    assert replacer.uuid_mappings() == [b"# ,,UUID-001,, -> " + UUID_1.encode() + b"\n"]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 36, 37, 38, 100, 4096])
+def test_uuid_replacer_chunked(tmpdir, chunk_size):
+    testoutput_filename = tmpdir / "test.output"
+    with testoutput_filename.open("w") as testoutput, open(
+        INPUT_FILE, "r"
+    ) as testinput:
+        uuid_replace(testinput, testoutput, chunk_size=chunk_size)
+
+    assert get_file_contents(EXPECTED_OUTPUT_FILE) == get_file_contents(
+        str(testoutput_filename)
+    )
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 36, 37, 38, 100, 4096])
+def test_uuid_replacer_chunked_binary(chunk_size):
+    testoutput = io.BytesIO()
+    with open(INPUT_FILE, "rb") as testinput:
+        uuid_replace(testinput, testoutput, binary=True, chunk_size=chunk_size)
+
+    expected = get_file_contents(EXPECTED_OUTPUT_FILE).encode()
+    assert expected == testoutput.getvalue()
+
+
+def test_replace_chunks_only_replaces_isolated_uuids():
+    replacer = UUIDLineReplacer()
+    text = "x_{0} {0} {1}\n".format(UUID_1, UUID_2)
+    replaced = "".join(replacer.replace_chunks(text))
+    assert replaced == "x_{} ,,UUID-001,, ,,UUID-002,,\n".format(UUID_1)
+
+
+def test_read_chunks_of_a_pipe():
+    data = b"0123456789"
+    assert list(read_chunks(io.BytesIO(data), 4)) == [b"0123", b"4567", b"89"]
+
+
+@pytest.mark.parametrize("binary", [False, True])
+def test_uuid_replacer_parallel(binary):
+    testoutput = io.BytesIO() if binary else io.StringIO()
+    uuid_replace_parallel(INPUT_FILE, testoutput, 3, binary=binary)
+
+    expected = get_file_contents(EXPECTED_OUTPUT_FILE)
+    if binary:
+        expected = expected.encode()
+    assert expected == testoutput.getvalue()
+
+
+def test_line_aligned_ranges():
+    with open(INPUT_FILE, "rb") as testinput:
+        contents = testinput.read()
+    ranges = _line_aligned_ranges(INPUT_FILE, 10)
+    assert ranges[0][0] == 0
+    assert ranges[-1][1] == len(contents)
+    for (_, end), (start, _) in zip(ranges, ranges[1:]):
+        assert end == start
+        assert contents[end - 1 : end] == b"\n"
+
+
+def test_line_aligned_ranges_are_capped():
+    size = os.path.getsize(INPUT_FILE)
+    ranges = _line_aligned_ranges(INPUT_FILE, 1, max_size=size // 5)
+    assert len(ranges) >= 5
+    assert ranges[-1][1] == size
+    longest_line = max(map(len, open(INPUT_FILE, "rb")))
+    assert all(end - start <= size // 5 + longest_line for start, end in ranges)
+
+
+@pytest.mark.parametrize("replacer_class", [UUIDLineReplacer, HashedUUIDLineReplacer])
+def test_uuid_replacer_parallel_small_ranges(monkeypatch, replacer_class):
+    expected = io.StringIO()
+    with open(INPUT_FILE) as testinput:
+        uuid_replace(testinput, expected, replacer=replacer_class())
+    monkeypatch.setattr(uuid_replacer, "PARALLEL_RANGE_SIZE", 64)
+    testoutput = io.StringIO()
+    uuid_replace_parallel(INPUT_FILE, testoutput, 2, replacer=replacer_class())
+    assert expected.getvalue() == testoutput.getvalue()
+
+
+def test_hashed_markers_do_not_depend_on_order():
+    first = HashedUUIDLineReplacer(key="secret")
+    second = HashedUUIDLineReplacer(key="secret")
+    first(UUID_1)
+    second(UUID_2)
+    assert first(UUID_2) == second(UUID_2)
+    assert second(UUID_1) == first(UUID_1)
+    assert HashedUUIDLineReplacer(key="other")(UUID_1) != first(UUID_1)
+    assert len(first(UUID_1)) == len(",,UUID-,,") + 12
+
+
+def test_hashed_binary_markers_match_text_markers():
+    text = HashedUUIDLineReplacer()(UUID_1)
+    assert HashedUUIDLineReplacer(binary=True)(UUID_1.encode()) == text.encode()
+
+
+def test_hash_collision_is_detected():
+    replacer = HashedUUIDLineReplacer(digits=1)
+    with pytest.raises(UUIDHashCollisionException) as excinfo:
+        for _ in range(17):
+            replacer(str(uuid.uuid4()))
+    assert len(set(excinfo.value.uuids)) == 2
+
+
+def test_merge_glossaries():
+    first = HashedUUIDLineReplacer()
+    second = HashedUUIDLineReplacer()
+    first("{} {}\n".format(UUID_1, UUID_2))
+    second("{}\n".format(UUID_2))
+    merged = merge_glossaries(first.uuid_mappings(), second.uuid_mappings())
+    assert merged == sorted(first.uuid_mappings())
+
+    colliding = ["# {} -> {}\n".format(first(UUID_1), UUID_2)]
+    with pytest.raises(UUIDHashCollisionException):
+        merge_glossaries(first.uuid_mappings(), colliding)
+
+
+def test_hashed_uuid_replacer_parallel():
+    expected = io.StringIO()
+    with open(INPUT_FILE, "r") as testinput:
+        uuid_replace(testinput, expected, replacer=HashedUUIDLineReplacer())
+
+    testoutput = io.StringIO()
+    uuid_replace_parallel(INPUT_FILE, testoutput, 3, replacer=HashedUUIDLineReplacer())
+    assert expected.getvalue() == testoutput.getvalue()
+
+
+def test_prefiltered_search_finds_what_the_regex_finds():
+    with open(INPUT_FILE, "r") as testinput:
+        text = testinput.read()
+    text += "-abcd-abcd- {0}-{1} x{0} {1}-abcd-abcd-{0}\n".format(UUID_1, UUID_2)
+    replacer = UUIDLineReplacer()
+    assert [match.span() for match in replacer._find_uuids(text)] == [
+        match.span() for match in UUID_ISOLATED_MATCHER.finditer(text)
+    ]
+
+
+@pytest.mark.parametrize("binary", [False, True])
+def test_uuid_replacer_with_mapping_store(binary):
+    replacer = UUIDLineReplacer(binary=binary, uuid_map=UUIDMappingStore(binary=binary))
+    testoutput = io.BytesIO() if binary else io.StringIO()
+    with open(INPUT_FILE, "rb" if binary else "r") as testinput:
+        uuid_replace(testinput, testoutput, replacer=replacer)
+
+    expected = get_file_contents(EXPECTED_OUTPUT_FILE)
+    if binary:
+        expected = expected.encode()
+    assert expected == testoutput.getvalue()
+
+
+def test_mapping_store_merges_new_uuids():
+    store = UUIDMappingStore()
+    store.MIN_MERGE_SIZE = 3
+    replacer = UUIDLineReplacer(uuid_map=store)
+    uuids = [str(uuid.uuid4()) for _ in range(50)]
+    markers = [replacer(one_uuid) for one_uuid in uuids]
+    assert len(store._recent) < len(store)
+    assert [replacer(one_uuid) for one_uuid in uuids] == markers
+    assert list(store) == uuids
+    with pytest.raises(KeyError):
+        store[UUID_1]
+    # Other spellings are other UUIDs, as they are in a dict.
+    with pytest.raises(KeyError):
+        store[uuids[7].upper()]
+
+
+def test_mapping_store_only_takes_the_next_replacement():
+    store = UUIDMappingStore()
+    store[UUID_1] = ",,UUID-001,,"
+    store[UUID_1] = ",,UUID-001,,"
+    with pytest.raises(ValueError):
+        store[UUID_2] = ",,UUID-003,,"
+    with pytest.raises(ValueError):
+        store[UUID_1] = ",,UUID-002,,"
+    with pytest.raises(TypeError):
+        del store[UUID_1]
+
+
+def test_mapping_store_save_and_load(tmpdir):
+    store_path = str(tmpdir / "uuids.map")
+    first = UUIDLineReplacer(uuid_map=UUIDMappingStore())
+    first("{} {}\n".format(UUID_1, UUID_2))
+    first.uuid_map.save(store_path)
+
+    second = UUIDLineReplacer(uuid_map=UUIDMappingStore.load(store_path))
+    third_uuid = str(uuid.uuid4())
+    line = "{} {}\n".format(third_uuid, UUID_1)
+    assert second(line) == ",,UUID-003,, ,,UUID-001,,\n"
+    assert second.uuid_mappings() == first.uuid_mappings() + [
+        "# ,,UUID-003,, -> {}\n".format(third_uuid)
+    ]
+
+    with open(store_path, "wb") as store_file:
+        store_file.write(b"not a store")
+    with pytest.raises(ValueError):
+        UUIDMappingStore.load(store_path)
+
+
+@pytest.mark.parametrize("binary", [False, True])
+def test_mapping_store_keeps_the_spelling_of_uuids(tmpdir, binary):
+    store_path = str(tmpdir / "uuids.map")
+    original = "{} {} {}\n{}\n".format(
+        UUID_1.upper(), UUID_1, UUID_2, UUID_2[:9].upper() + UUID_2[9:]
+    )
+    if binary:
+        original = original.encode()
+    first = UUIDLineReplacer(binary=binary, uuid_map=UUIDMappingStore(binary=binary))
+    first(original)
+    first.uuid_map.save(store_path)
+
+    store = UUIDMappingStore.load(store_path, binary=binary)
+    replacer = UUIDLineReplacer(binary=binary, uuid_map=store)
+    replaced = original[:0].join(map(replacer, original.splitlines(True)))
+    expected = ",,UUID-001,, ,,UUID-002,, ,,UUID-003,,\n,,UUID-004,,\n"
+    assert replaced == (expected.encode() if binary else expected)
+    assert list(store) == original.split()
+
+    glossary = io.BytesIO() if binary else io.StringIO()
+    replacer.write_glossary_to(glossary)
+    restored = io.BytesIO() if binary else io.StringIO()
+    glossary.seek(0)
+    source = io.BytesIO(replaced) if binary else io.StringIO(replaced)
+    uuid_restore(source, restored, glossary=glossary, binary=binary)
+    assert restored.getvalue() == original
+
+
+def make_batch_tree(root):
+    """Make a tree of copies of the input file, and return the expected output."""
+    with open(INPUT_FILE, "r") as testinput:
+        contents = testinput.read()
+    for relative_path in ["a.log", "sub/b.log", "sub/deeper/c.log", "z/empty.log"]:
+        path = root / relative_path
+        path.dirpath().ensure(dir=True)
+        path.write("" if "empty" in relative_path else contents)
+
+    replacer = UUIDLineReplacer()
+    replaced = "".join(map(replacer, contents.splitlines(True)))
+    return replaced, replacer.uuid_mappings()
+
+
+@pytest.mark.parametrize("jobs", [None, 2])
+def test_uuid_replace_files_next_to_inputs(tmpdir, jobs):
+    replaced, expected_glossary = make_batch_tree(tmpdir)
+    glossary = io.StringIO()
+    files = uuid_replace_files([str(tmpdir)], glossary=glossary, jobs=jobs)
+
+    assert [os.path.relpath(output_path, str(tmpdir)) for _, output_path in files] == [
+        "a.log.uuids",
+        os.path.join("sub", "b.log.uuids"),
+        os.path.join("sub", "deeper", "c.log.uuids"),
+        os.path.join("z", "empty.log.uuids"),
+    ]
+    for input_path, output_path in files:
+        expected = "" if "empty" in input_path else replaced
+        assert get_file_contents(output_path) == expected
+    assert glossary.getvalue() == "".join(expected_glossary)
+
+    # Outputs from a previous run are not inputs.
+    assert (
+        len(uuid_replace_files([str(tmpdir)], glossary=io.StringIO(), jobs=jobs)) == 4
+    )
+
+
+@pytest.mark.parametrize("jobs", [None, 2])
+def test_uuid_replace_files_into_mirror_tree(tmpdir, jobs):
+    replaced, _ = make_batch_tree(tmpdir / "in")
+    output_dir = tmpdir / "out"
+    uuid_replace_files(
+        [str(tmpdir / "in" / "sub"), str(tmpdir / "in" / "a.log")],
+        output_dir=str(output_dir),
+        glossary=io.StringIO(),
+        jobs=jobs,
+    )
+
+    for relative_path in ["a.log", "b.log", "deeper/c.log"]:
+        assert get_file_contents(str(output_dir / relative_path)) == replaced
+
+
+def test_uuid_replace_files_needs_somewhere_to_keep_the_uuids(tmpdir):
+    make_batch_tree(tmpdir)
+    with pytest.raises(ValueError):
+        uuid_replace_files([str(tmpdir)])
+    assert not (tmpdir / "a.log.uuids").exists()
+
+    replacer = UUIDLineReplacer()
+    uuid_replace_files([str(tmpdir / "a.log")], replacer=replacer)
+    assert replacer.uuid_mappings()
+
+
+def test_uuid_replace_files_refuses_to_overwrite_outputs(tmpdir):
+    make_batch_tree(tmpdir / "in")
+    (tmpdir / "in" / "sub" / "a.log").write("")
+    output_dir = tmpdir / "out"
+    with pytest.raises(ValueError) as error:
+        uuid_replace_files(
+            [str(tmpdir / "in" / "a.log"), str(tmpdir / "in" / "sub")],
+            output_dir=str(output_dir),
+            glossary=io.StringIO(),
+        )
+    assert "a.log" in str(error.value)
+    assert not output_dir.exists()
+
+
+def test_uuid_mappings_are_in_numbering_order():
+    replacer = UUIDLineReplacer()
+    uuids = [str(uuid.uuid4()) for _ in range(1001)]
+    for one_uuid in uuids:
+        replacer(one_uuid)
+    mappings = replacer.uuid_mappings()
+    assert mappings[998:] == [
+        "# ,,UUID-999,, -> {}\n".format(uuids[998]),
+        "# ,,UUID-1000,, -> {}\n".format(uuids[999]),
+        "# ,,UUID-1001,, -> {}\n".format(uuids[1000]),
+    ]
+
+
+def test_glossary_is_written_as_uuids_are_found():
+    replacer = UUIDLineReplacer(uuid_map={UUID_1: ",,UUID-001,,"})
+    glossary = io.StringIO()
+    replacer.write_glossary_to(glossary)
+    assert glossary.getvalue() == "# ,,UUID-001,, -> {}\n".format(UUID_1)
+    replacer("{} {}\n".format(UUID_1, UUID_2))
+    assert glossary.getvalue().splitlines(True) == replacer.uuid_mappings()
+
+
+def test_uuid_replacer_with_glossary_file():
+    testoutput = io.StringIO()
+    glossary = io.StringIO()
+    with open(INPUT_FILE, "r") as testinput:
+        uuid_replace(testinput, testoutput, glossary=glossary)
+
+    expected_output, expected_glossary = get_file_contents(EXPECTED_OUTPUT_FILE).split(
+        "\n##########\n"
+    )
+    assert testoutput.getvalue() == expected_output
+    assert glossary.getvalue() == expected_glossary
+
+
+@pytest.mark.parametrize("binary", [False, True])
+def test_uuid_restore(tmpdir, binary):
+    read_mode, write_mode = ("rb", "wb") if binary else ("r", "w")
+    testoutput = io.BytesIO() if binary else io.StringIO()
+    with open(EXPECTED_OUTPUT_FILE, read_mode) as replaced:
+        uuid_restore(replaced, testoutput, binary=binary)
+
+    with open(INPUT_FILE, read_mode) as testinput:
+        assert testoutput.getvalue() == testinput.read()
+
+
+def test_uuid_restore_with_glossary_file():
+    replaced = io.StringIO()
+    glossary = io.StringIO()
+    with open(INPUT_FILE, "r") as testinput:
+        uuid_replace(testinput, replaced, glossary=glossary)
+        testinput.seek(0)
+        original = testinput.read()
+
+    restored = io.StringIO()
+    replaced.seek(0)
+    glossary.seek(0)
+    uuid_restore(replaced, restored, glossary=glossary)
+    assert restored.getvalue() == original
+
+
+def test_uuid_restore_keeps_a_missing_last_newline():
+    replaced = io.StringIO()
+    uuid_replace(io.StringIO("no newline at the end " + UUID_1), replaced)
+    replaced.seek(0)
+    restored = io.StringIO()
+    uuid_restore(replaced, restored)
+    assert restored.getvalue() == "no newline at the end " + UUID_1
+
+
+@pytest.mark.parametrize(
+    "template", [None, "<{}>", "UUID{}", "{:04d}#"], ids=["default", "a", "b", "c"]
+)
+def test_restorer_only_restores_replacements(template):
+    replacer = UUIDLineReplacer(template=template)
+    uuids = [str(uuid.uuid4()) for _ in range(12)]
+    line = " ".join(uuids) + "\n"
+    replaced = replacer(line)
+    restorer = UUIDRestorer(replacer.uuid_mappings())
+    assert restorer(replaced) == line
+
+    not_replacements = replacer.template.format(13) + replacer.template.format(100)
+    assert restorer(not_replacements) == not_replacements
+
+
+def write_slowly(path, pieces):
+    """Append each of ``pieces`` to ``path``, a little while apart, in a thread."""
+
+    def write():
+        with open(path, "a") as output:
+            for piece in pieces:
+                time.sleep(0.02)
+                output.write(piece)
+                output.flush()
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    return writer
+
+
+def test_follow_lines_waits_for_whole_lines(tmpdir):
+    path = tmpdir / "growing.log"
+    path.write("first\nsec")
+    writer = write_slowly(path, ["ond", "\nthird\n", "fourth\n"])
+    with path.open("r") as src:
+        lines = list(islice(follow_lines(src, poll_interval=0.01), 4))
+    writer.join()
+    assert lines == ["first\n", "second\n", "third\n", "fourth\n"]
+
+
+def wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+@pytest.mark.parametrize("side_glossary", [False, True])
+def test_uuid_replace_follow_flushes_when_idle(tmpdir, side_glossary):
+    read_fd, write_fd = os.pipe()
+    output_path = tmpdir / "followed.output"
+    glossary_path = tmpdir / "followed.glossary"
+    with open(read_fd, "r") as src, output_path.open("w") as dest:
+        glossary = glossary_path.open("w") if side_glossary else None
+        follower = threading.Thread(
+            target=uuid_replace_follow,
+            args=(src, dest),
+            kwargs={"glossary": glossary, "flush_interval": 3600},
+        )
+        follower.start()
+        with open(write_fd, "w") as pipe:
+            for line in ["a " + UUID_1 + "\n", "b\n", "c " + UUID_2 + "\n"]:
+                pipe.write(line)
+                pipe.flush()
+                # Each line is written out before the next one arrives.
+                expected_line = line.replace(UUID_1, ",,UUID-001,,").replace(
+                    UUID_2, ",,UUID-002,,"
+                )
+                wait_for(lambda: output_path.read().endswith(expected_line))
+        follower.join()
+        if glossary:
+            glossary.close()
+
+    glossary_lines = [
+        "# ,,UUID-001,, -> {}\n".format(UUID_1),
+        "# ,,UUID-002,, -> {}\n".format(UUID_2),
+    ]
+    lines = ["a ,,UUID-001,,\n", "b\n", "c ,,UUID-002,,\n"]
+    if side_glossary:
+        assert glossary_path.readlines() == glossary_lines
+    else:
+        lines.insert(0, glossary_lines[0])
+        lines.insert(3, glossary_lines[1])
+    assert output_path.readlines() == lines
+
+
+COMPRESSION_MODULES = {".gz": gzip, ".bz2": bz2, ".xz": lzma}
+
+
+@pytest.mark.parametrize("binary", [False, True])
+@pytest.mark.parametrize("extension", sorted(COMPRESSION_MODULES))
+def test_compressed_input_and_output(tmpdir, extension, binary):
+    module = COMPRESSION_MODULES[extension]
+    read_mode, write_mode = ("rb", "wb") if binary else ("rt", "wt")
+    # Named without the extension, compressed input is recognized by its contents.
+    input_path = str(tmpdir / "compressed.log")
+    output_path = str(tmpdir / ("replaced.log" + extension))
+    with open(INPUT_FILE, read_mode) as testinput, module.open(
+        input_path, write_mode
+    ) as compressed:
+        compressed.write(testinput.read())
+
+    with open_input(input_path, binary=binary) as src, open_output(
+        output_path, binary=binary
+    ) as dest:
+        uuid_replace(src, dest, binary=binary)
+
+    with module.open(output_path, read_mode) as replaced, open(
+        EXPECTED_OUTPUT_FILE, read_mode
+    ) as expected:
+        assert replaced.read() == expected.read()
+
+
+@pytest.mark.parametrize("jobs", [None, 2])
+def test_uuid_replace_files_compressed(tmpdir, jobs):
+    replaced, _ = make_batch_tree(tmpdir)
+    compressed_path = str(tmpdir / "sub" / "b.log.gz")
+    with open(str(tmpdir / "sub" / "b.log"), "rb") as plain, gzip.open(
+        compressed_path, "wb"
+    ) as compressed:
+        compressed.write(plain.read())
+    os.remove(str(tmpdir / "sub" / "b.log"))
+
+    files = dict(uuid_replace_files([str(tmpdir)], glossary=io.StringIO(), jobs=jobs))
+    output_path = str(tmpdir / "sub" / "b.log.uuids.gz")
+    assert files[compressed_path] == output_path
+    with gzip.open(output_path, "rt") as dest:
+        assert dest.read() == replaced
+    assert get_file_contents(files[str(tmpdir / "a.log")]) == replaced
+
+    # Compressed outputs from a previous run are not inputs either.
+    assert (
+        len(uuid_replace_files([str(tmpdir)], glossary=io.StringIO(), jobs=jobs)) == 4
+    )
+
+
+def test_uuid_replace_parallel_compressed(tmpdir):
+    input_path = str(tmpdir / "compressed.log.xz")
+    with open(INPUT_FILE, "rb") as testinput, lzma.open(input_path, "wb") as dest:
+        dest.write(testinput.read())
+    testoutput = io.StringIO()
+    uuid_replace_parallel(input_path, testoutput, 2)
+    assert testoutput.getvalue() == get_file_contents(EXPECTED_OUTPUT_FILE)
+
+
+def test_read_chunks_decompresses(tmpdir):
+    input_path = str(tmpdir / "compressed.gz")
+    with gzip.open(input_path, "wb") as dest:
+        dest.write(b"x" * 100)
+    with open_input(input_path, binary=True) as src:
+        assert b"".join(read_chunks(src, 30)) == b"x" * 100
+
+
+MIXED_LINE = (
+    "2019-05-20T19:28:48Z from 10.0.0.1 for ABC-123 {} on 10.0.0.2 then 10.0.0.1\n"
+).format(UUID_1)
+
+
+def test_identifier_replacer_numbers_each_kind_separately():
+    replacer = IdentifierReplacer.for_names(["uuid", "ipv4", "timestamp", "jira"])
+    assert replacer(MIXED_LINE) == (
+        ",,TIME-001,, from ,,IP-001,, for ,,JIRA-001,, ,,UUID-001,, "
+        "on ,,IP-002,, then ,,IP-001,,\n"
+    )
+    assert replacer.uuid_mappings() == [
+        "## uuid\n",
+        "# ,,UUID-001,, -> {}\n".format(UUID_1),
+        "## ipv4\n",
+        "# ,,IP-001,, -> 10.0.0.1\n",
+        "# ,,IP-002,, -> 10.0.0.2\n",
+        "## timestamp\n",
+        "# ,,TIME-001,, -> 2019-05-20T19:28:48Z\n",
+        "## jira\n",
+        "# ,,JIRA-001,, -> ABC-123\n",
+    ]
+
+
+def test_identifier_replacer_with_own_patterns_in_binary():
+    replacer = IdentifierReplacer(
+        [("port", r"(?<=:)\d+\b", "<port {}>"), ("host", r"\b\w+(?=:)", "<host {}>")],
+        binary=True,
+    )
+    assert replacer(b"a:80 b:80 a:443\n") == (
+        b"<host 1>:<port 1> <host 2>:<port 1> <host 1>:<port 2>\n"
+    )
+    assert replacer.uuid_mappings()[:1] == [b"## port\n"]
+
+
+def test_identifier_replacer_round_trip():
+    replaced = io.StringIO()
+    replacer = IdentifierReplacer.for_names(["timestamp", "ipv4", "jira", "uuid"])
+    uuid_replace(io.StringIO(MIXED_LINE * 3), replaced, replacer=replacer)
+    replaced.seek(0)
+    restored = io.StringIO()
+    uuid_restore(replaced, restored)
+    assert restored.getvalue() == MIXED_LINE * 3
+
+
+@pytest.fixture
+def acme_tickets(monkeypatch):
+    """Register an extra ticketing system, as a ``tag_to_url`` plugin would."""
+    ticket_info = dict(_tickets._ticket_info())
+    ticket_info["Acme"] = {"pattern": re.compile("^acme_[0-9]+$", re.IGNORECASE)}
+    monkeypatch.setattr(_tickets, "_TICKET_INFO_SNAPSHOT", ticket_info)
+
+
+def test_identifier_replacer_for_ticket_plugins(acme_tickets):
+    line = "ABC-123 and ACME_42 and acme_7\n"
+    replacer = IdentifierReplacer.for_names(["acme"])
+    assert replacer(line) == "ABC-123 and ,,ACME-001,, and ,,ACME-002,,\n"
+
+    replacer = IdentifierReplacer.for_names(["uuid", "tickets"])
+    assert sorted(replacer.replacers) == ["acme", "jira", "snow", "uuid", "versionone"]
+    assert replacer(line) == ",,JIRA-001,, and ,,ACME-001,, and ,,ACME-002,,\n"
+
+
+def test_identifier_replacer_for_unknown_names():
+    with pytest.raises(ValueError):
+        IdentifierReplacer.for_names(["uuid", "not-an-identifier"])